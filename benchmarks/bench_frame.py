@@ -0,0 +1,205 @@
+"""Headless frame-budget benchmark for the render-loop subsystems.
+
+Drives TolveraEngine, GhostReplay, IMLManager, AudioAnalyzer and
+SessionNarrativeManager with a scripted touch trace and synthetic Lyria-like
+audio for N frames, timing each stage the way the main loop runs it.
+
+Run from the repository root:
+    python -m benchmarks.bench_frame --frames 1200 --out bench_frame.json
+    python -m benchmarks.bench_frame --no-engine   # without Tolvera / Taichi GUI
+"""
+
+import argparse
+import json
+import platform
+import time
+
+import numpy as np
+
+from src.audio_analyzer import AudioAnalyzer
+from src.config import (
+    AUDIO_CHANNELS,
+    AUDIO_SAMPLE_RATE,
+    NARRATIVE_INTERVAL,
+    SCREEN_H,
+    SCREEN_W,
+    TARGET_FPS,
+)
+from src.ghost_replay import GhostReplay
+from src.iml_manager import IMLManager
+from src.narrative_manager import SessionNarrativeManager
+from src.profiler import FrameProfiler, peak_rss_mb
+from src.touch_bus import TouchEventBus
+
+STAGES = ("input", "iml", "metrics", "capture", "analyzer", "ghost", "narrative", "sim")
+CAPTURE_EVERY = int(1.5 * TARGET_FPS)  # Gemini requests a frame every ~1.5 s
+
+
+def touch_trace(frames: int, seed: int = 0) -> np.ndarray:
+    """Scripted strokes as (frames, 3) rows of (x, y, pressed) in [0, 1]."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(frames) / TARGET_FPS
+    trace = np.empty((frames, 3), dtype=np.float64)
+    # Lissajous wander with per-stroke drift; strokes of 1-3 s separated by pauses
+    drift = np.cumsum(rng.normal(0.0, 0.002, size=(frames, 2)), axis=0)
+    trace[:, 0] = np.clip(0.5 + 0.35 * np.sin(0.7 * t) + drift[:, 0], 0.0, 1.0)
+    trace[:, 1] = np.clip(0.5 + 0.35 * np.sin(1.1 * t + 0.5) + drift[:, 1], 0.0, 1.0)
+    pressed = np.zeros(frames, dtype=bool)
+    i = 0
+    while i < frames:
+        stroke = int(rng.uniform(1.0, 3.0) * TARGET_FPS)
+        pause = int(rng.uniform(0.3, 1.5) * TARGET_FPS)
+        pressed[i : i + stroke] = True
+        i += stroke + pause
+    trace[:, 2] = pressed
+    return trace
+
+
+def synthetic_audio(seconds: float, seed: int = 0) -> bytes:
+    """Loopable stereo int16 PCM: a slow chord with tremolo plus soft noise."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * AUDIO_SAMPLE_RATE)
+    t = np.arange(n) / AUDIO_SAMPLE_RATE
+    chord = sum(np.sin(2 * np.pi * f * t) for f in (110.0, 164.8, 220.0, 329.6))
+    tremolo = 0.6 + 0.4 * np.sin(2 * np.pi * 0.5 * t)
+    mono = 0.15 * chord * tremolo + 0.02 * rng.standard_normal(n)
+    stereo = np.repeat((mono * 32767 / 4).astype(np.int16)[:, None], AUDIO_CHANNELS, 1)
+    return stereo.tobytes()
+
+
+def run(frames: int, use_engine: bool, seed: int, warmup: int) -> dict:
+    engine = None
+    if use_engine:
+        from src.tolvera_engine import TolveraEngine
+
+        engine = TolveraEngine()  # VERIFY: Tolvera may need a headless flag here
+    iml = IMLManager(seed=seed)
+
+    ghost = GhostReplay()
+    analyzer = AudioAnalyzer()
+    narrative = SessionNarrativeManager()
+    touch_bus = TouchEventBus()
+    narrative_cursor = touch_bus.subscribe("narrative")
+    profiler = FrameProfiler(STAGES, capacity=frames)
+
+    trace = touch_trace(warmup + frames, seed)
+    audio = synthetic_audio(2.0, seed)
+    chunk_bytes = AUDIO_SAMPLE_RATE // TARGET_FPS * AUDIO_CHANNELS * 2
+    n_chunks = len(audio) // chunk_bytes
+    narrative_every = int(NARRATIVE_INTERVAL * TARGET_FPS)
+    clock = time.perf_counter
+
+    for frame in range(warmup + frames):
+        if frame == warmup:
+            profiler = FrameProfiler(STAGES, capacity=frames)
+        cx, cy, pressed = trace[frame]
+        pressed = bool(pressed)
+        now = frame / TARGET_FPS
+        profiler.start_frame()
+
+        velocity = dwell = 0.0
+        if engine is not None:
+            engine.update_cursor(cx, cy, pressed)
+            if pressed:
+                engine.on_touch(cx, cy)
+            velocity = engine.get_cursor_velocity()
+            dwell = engine.get_dwell()
+        if pressed:
+            touch_bus.publish(cx, cy, now, velocity)
+        profiler.lap("input")
+
+        if pressed:
+            t0 = clock()
+            iml.update([cx, cy, velocity, dwell])
+            if engine is not None:
+                iml.apply(engine)
+            else:
+                iml.predict()
+            profiler.record("iml", clock() - t0)
+
+        if engine is not None:
+            t0 = clock()
+            engine.update_metrics()
+            profiler.record("metrics", clock() - t0)
+            if frame % CAPTURE_EVERY == 0:
+                t0 = clock()
+                engine.capture_frame_pixels()
+                profiler.record("capture", clock() - t0)
+
+        t0 = clock()
+        k = frame % n_chunks
+        analyzer.feed(audio[k * chunk_bytes : (k + 1) * chunk_bytes])
+        if analyzer.update():
+            features = analyzer.analyze()
+            if engine is not None:
+                engine.apply_audio_feedback(features)
+        profiler.record("analyzer", clock() - t0)
+
+        t0 = clock()
+        if pressed:
+            ghost.record_touch(int(cx * SCREEN_W), int(cy * SCREEN_H))
+        ghost_state, ghost_value = ghost.tick()
+        segments = ghost.take_segments(force=ghost_state == "ACTIVE")
+        if engine is not None:
+            if segments is not None:
+                engine.stamp_ghost_paths(segments)
+            if ghost_state == "ACTIVE" and ghost_value is not None:
+                engine.set_brightness_multiplier(ghost_value)
+            else:
+                engine.set_brightness_multiplier(1.0)
+        profiler.record("ghost", clock() - t0)
+
+        # Runs on the async thread in the app; timed here for its cost only
+        if frame % narrative_every == 0:
+            t0 = clock()
+            narrative.record_touches(narrative_cursor.read())
+            narrative.update(iml.get_n_pairs())
+            profiler.record("narrative", clock() - t0)
+
+        if engine is not None:
+            t0 = clock()
+            engine.render_frame()
+            profiler.record("sim", clock() - t0)
+        profiler.end_frame()
+
+    return {
+        "frames": frames,
+        "warmup": warmup,
+        "seed": seed,
+        "engine": use_engine,
+        "frame_budget_ms": 1000.0 / TARGET_FPS,
+        "stages": profiler.summary(),
+        "peak_rss_mb": peak_rss_mb(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=1200)
+    parser.add_argument("--warmup", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-engine", action="store_true", help="Skip Tolvera stages")
+    parser.add_argument("--out", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    result = run(args.frames, not args.no_engine, args.seed, args.warmup)
+
+    print(f"{'stage':>10} {'count':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for stage, s in result["stages"].items():
+        if s["count"]:
+            print(
+                f"{stage:>10} {s['count']:7d} {s['p50_ms']:8.3f} "
+                f"{s['p95_ms']:8.3f} {s['p99_ms']:8.3f}"
+            )
+    print(f"frame budget {result['frame_budget_ms']:.1f} ms, ", end="")
+    print(f"peak RSS {result['peak_rss_mb']:.1f} MiB")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
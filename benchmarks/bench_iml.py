@@ -0,0 +1,95 @@
+"""Per-call cost of IMLRegressor add and predict against training-set size.
+
+For each size the regressor is filled to capacity with random 4D→3D pairs,
+then timed for ``add`` (which evicts the oldest pair and updates the cached
+distances) and single-input ``predict`` under each interpolation. An RBF
+predict right after an add includes the kernel re-solve, so it is reported
+separately as ``rbf_refit``.
+
+Run from the repository root:
+    python -m benchmarks.bench_iml --sizes 50 100 250 500 1000 --out bench_iml.json
+"""
+
+import argparse
+import json
+import platform
+import time
+
+import numpy as np
+
+from src.iml_regressor import INTERPOLATIONS, IMLRegressor
+
+
+def _per_call_us(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def run(sizes: list[int], calls: int, seed: int) -> dict:
+    rng = np.random.default_rng(seed)
+    queries = rng.random((calls, 4))
+    results = {}
+    for n in sizes:
+        reg = IMLRegressor(4, 3, capacity=n, rng=rng)
+        for x in rng.random((n, 4)):
+            reg.add(x)
+        row = {"add_us": _per_call_us(lambda: reg.add(rng.random(4)), calls)}
+
+        for name in INTERPOLATIONS:
+            reg.interpolation = name
+            reg.predict(queries[0])  # RBF: solve once outside the timing
+            it = iter(queries)
+            row[f"{name.lower()}_us"] = _per_call_us(
+                lambda: reg.predict(next(it)), calls
+            )
+
+        refit_calls = max(1, calls // 10)
+
+        def refit():
+            reg.add(rng.random(4))
+            reg.predict(queries[0])
+
+        row["rbf_refit_us"] = _per_call_us(refit, refit_calls)
+        results[n] = row
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[50, 100, 250, 500, 1000]
+    )
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.calls, args.seed)
+
+    columns = (
+        ["add_us"] + [f"{n.lower()}_us" for n in INTERPOLATIONS] + ["rbf_refit_us"]
+    )
+    print(f"{'pairs':>6} " + " ".join(f"{c[:-3]:>10}" for c in columns) + "  (µs/call)")
+    for n, row in results.items():
+        print(f"{n:6d} " + " ".join(f"{row[c]:10.1f}" for c in columns))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(
+                {
+                    "calls": args.calls,
+                    "seed": args.seed,
+                    "results": results,
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "platform": platform.platform(),
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
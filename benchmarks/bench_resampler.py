@@ -0,0 +1,44 @@
+"""Microbenchmark for PolyphaseResampler (48 kHz stereo int16 → 16 kHz mono).
+
+Run from the repository root:  python -m benchmarks.bench_resampler
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.config import AUDIO_CHANNELS, AUDIO_SAMPLE_RATE, GEMINI_AUDIO_RATE
+from src.resampler import PolyphaseResampler
+
+
+def bench(chunk_frames: int, repeats: int) -> tuple[float, float]:
+    """Return (median µs per chunk, realtime factor) for one chunk size."""
+    rng = np.random.default_rng(0)
+    pcm = (rng.standard_normal(chunk_frames * AUDIO_CHANNELS) * 8000).astype(np.int16)
+    raw = pcm.tobytes()
+    r = PolyphaseResampler(AUDIO_SAMPLE_RATE, GEMINI_AUDIO_RATE, AUDIO_CHANNELS)
+    r.process(raw)  # warm up
+
+    times = np.empty(repeats)
+    for i in range(repeats):
+        t0 = time.perf_counter()
+        r.process(raw)
+        times[i] = time.perf_counter() - t0
+    median = float(np.median(times))
+    return median * 1e6, (chunk_frames / AUDIO_SAMPLE_RATE) / median
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'chunk':>10} {'µs/chunk':>10} {'x realtime':>12}")
+    for frames in (480, 4800, 48000, 168000):
+        us, rt = bench(frames, args.repeats)
+        print(f"{frames / AUDIO_SAMPLE_RATE * 1000:8.0f}ms {us:10.1f} {rt:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
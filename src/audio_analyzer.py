@@ -1,63 +1,150 @@
 import numpy as np
-from src.config import AUDIO_SAMPLE_RATE, FLUX_THRESHOLD, SPEED_SCALE, DIST_SCALE
+from src.config import (
+    AUDIO_CHANNELS,
+    AUDIO_SAMPLE_RATE,
+    FLUX_THRESHOLD,
+    SPEED_SCALE,
+    DIST_SCALE,
+)
 
 
 class AudioAnalyzer:
-    """Real-time audio feature extraction using numpy. Replaces Meyda.js."""
+    """Real-time audio feature extraction using numpy. Replaces Meyda.js.
+
+    Incoming PCM is written into a preallocated circular buffer. One Hann-windowed
+    spectrum is computed per hop (``hop_size`` new frames) and every feature is
+    derived from it; calls made without enough new audio return cached features.
+    """
 
     def __init__(
-        self, sample_rate: int = AUDIO_SAMPLE_RATE, buffer_size: int = 2048
+        self,
+        sample_rate: int = AUDIO_SAMPLE_RATE,
+        buffer_size: int = 2048,
+        hop_size: int | None = None,
+        channels: int = AUDIO_CHANNELS,
     ) -> None:
         self.sample_rate = sample_rate
         self.buffer_size = buffer_size
-        self._buffer = np.zeros(buffer_size, dtype=np.float32)
-        self._prev_spectrum: np.ndarray | None = None
-
-    def feed(self, pcm_data: bytes) -> None:
-        """Add new PCM chunk to buffer. Expects 16-bit signed integer PCM, stereo."""
-        samples = np.frombuffer(pcm_data, dtype=np.int16).astype(np.float32) / 32768.0
-        # Mix stereo to mono
-        if len(samples) >= 2:
-            samples = samples[::2] * 0.5 + samples[1::2] * 0.5  # simple stereo→mono
-        # Shift buffer and append new samples
-        n = min(len(samples), self.buffer_size)
-        self._buffer = np.roll(self._buffer, -n)
-        self._buffer[-n:] = samples[-n:]
+        self.hop_size = hop_size if hop_size is not None else buffer_size // 2
+        self.channels = channels
+
+        # Circular buffer of mono samples; _write_pos is the oldest sample
+        self._ring = np.zeros(buffer_size, dtype=np.float32)
+        self._write_pos = 0
+        self._pending = 0  # frames fed since the last spectrum
+
+        # Cached analysis constants and scratch buffers
+        self._window = np.hanning(buffer_size).astype(np.float32)
+        self._freqs = np.fft.rfftfreq(buffer_size, 1.0 / sample_rate).astype(np.float32)
+        self._frame = np.empty(buffer_size, dtype=np.float32)
+        n_bins = buffer_size // 2 + 1
+        self._spectrum = np.zeros(n_bins, dtype=np.float32)
+        self._prev_spectrum = np.zeros(n_bins, dtype=np.float32)
+        self._diff = np.empty(n_bins, dtype=np.float32)
+        self._has_prev = False
+
+        self._rms = 0.0
+        self._centroid = 0.0
+        self._flux = 0.0
+
+    @property
+    def pending_frames(self) -> int:
+        """Frames fed since the last spectrum was computed."""
+        return self._pending
+
+    def feed(self, pcm_data: bytes) -> int:
+        """Add new PCM chunk to buffer. Expects 16-bit signed integer PCM, stereo.
+
+        Returns the number of new frames written.
+        """
+        samples = np.frombuffer(pcm_data, dtype=np.int16)
+        n_frames = len(samples) // self.channels
+        if n_frames == 0:
+            return 0
+        frames = samples[: n_frames * self.channels].reshape(n_frames, self.channels)
+        # Only the newest buffer_size frames can survive in the ring
+        tail = frames[-self.buffer_size :]
+        n = tail.shape[0]
+
+        pos = self._write_pos
+        first = min(n, self.buffer_size - pos)
+        self._mix_into(tail[:first], self._ring[pos : pos + first])
+        if first < n:
+            self._mix_into(tail[first:], self._ring[: n - first])
+        self._write_pos = (pos + n) % self.buffer_size
+        self._pending += n_frames
+        return n_frames
+
+    def _mix_into(self, frames: np.ndarray, out: np.ndarray) -> None:
+        """Mix int16 frames down to mono float32 in [-1, 1], writing into ``out``."""
+        if self.channels == 1:
+            np.multiply(frames[:, 0], 1.0 / 32768.0, out=out, dtype=np.float32)
+            return
+        np.add(frames[:, 0], frames[:, 1], out=out, dtype=np.float32)
+        for c in range(2, self.channels):
+            out += frames[:, c]
+        out *= 1.0 / (32768.0 * self.channels)
+
+    def update(self) -> bool:
+        """Compute a new spectrum if a hop's worth of audio has arrived.
+
+        Returns True when features were refreshed.
+        """
+        if self._pending < self.hop_size and (self._has_prev or self._pending == 0):
+            return False
+        self._pending = 0
+
+        # Unroll the ring into time order while applying the window
+        pos = self._write_pos
+        split = self.buffer_size - pos
+        np.multiply(self._ring[pos:], self._window[:split], out=self._frame[:split])
+        np.multiply(self._ring[:pos], self._window[split:], out=self._frame[split:])
+
+        self._prev_spectrum, self._spectrum = self._spectrum, self._prev_spectrum
+        np.abs(np.fft.rfft(self._frame), out=self._spectrum)
+
+        rms = float(np.sqrt(np.dot(self._ring, self._ring) / self.buffer_size))
+        self._rms = min(rms * 4.0, 1.0)  # scale up, ambient music is quiet
+
+        total = float(self._spectrum.sum())
+        if total < 1e-10:
+            self._centroid = 0.0
+        else:
+            centroid = float(np.dot(self._freqs, self._spectrum)) / total
+            self._centroid = min(centroid / (self.sample_rate / 2.0), 1.0)
+
+        if self._has_prev:
+            np.subtract(self._spectrum, self._prev_spectrum, out=self._diff)
+            np.maximum(self._diff, 0.0, out=self._diff)
+            flux = float(self._diff.sum())
+            self._flux = min(flux / (total + 1e-10), 1.0)
+        else:
+            self._flux = 0.0
+            self._has_prev = True
+        return True
 
     def get_rms(self) -> float:
         """Root Mean Square energy, normalized to ~0-1."""
-        rms = float(np.sqrt(np.mean(self._buffer**2)))
-        return min(rms * 4.0, 1.0)  # scale up, ambient music is quiet
+        self.update()
+        return self._rms
 
     def get_spectral_centroid(self) -> float:
         """Spectral centroid, normalized to 0-1."""
-        spectrum = np.abs(np.fft.rfft(self._buffer * np.hanning(len(self._buffer))))
-        if spectrum.sum() < 1e-10:
-            return 0.0
-        freqs = np.fft.rfftfreq(len(self._buffer), 1.0 / self.sample_rate)
-        centroid = float(np.sum(freqs * spectrum) / np.sum(spectrum))
-        nyquist = self.sample_rate / 2.0
-        return min(centroid / nyquist, 1.0)
+        self.update()
+        return self._centroid
 
     def get_spectral_flux(self) -> float:
-        """Spectral flux: rate of spectral change."""
-        spectrum = np.abs(np.fft.rfft(self._buffer * np.hanning(len(self._buffer))))
-        if self._prev_spectrum is None:
-            self._prev_spectrum = spectrum.copy()
-            return 0.0
-        diff = spectrum - self._prev_spectrum
-        flux = float(np.sum(np.maximum(diff, 0.0)))
-        self._prev_spectrum = spectrum.copy()
-        # Normalize
-        norm = float(np.sum(spectrum)) + 1e-10
-        return min(flux / norm, 1.0)
+        """Spectral flux: rate of spectral change between consecutive hops."""
+        self.update()
+        return self._flux
 
     def analyze(self) -> dict:
         """Return all audio features."""
+        self.update()
         return {
-            "rms": self.get_rms(),
-            "spectral_centroid": self.get_spectral_centroid(),
-            "spectral_flux": self.get_spectral_flux(),
+            "rms": self._rms,
+            "spectral_centroid": self._centroid,
+            "spectral_flux": self._flux,
         }
 
 
@@ -1,7 +1,5 @@
 import logging
-import queue
 
-import numpy as np
 import sounddevice as sd
 
 from src.config import (
@@ -9,21 +7,33 @@ from src.config import (
     AUDIO_CHANNELS,
     AUDIO_BLOCK_SIZE,
     AUDIO_PREFILL_BLOCKS,
+    AUDIO_TARGET_LATENCY_MS,
+    LYRIA_CROSSFADE_MS,
 )
-from src.shared_state import SharedState
+from src.audio_ring import JitterBuffer, RingCrossfader
+from src.shared_state import AudioBufferStats, SharedState
 
 logger = logging.getLogger(__name__)
 
 
 class AudioBridge:
-    """Routes PCM audio from shared_state.audio_queue to a sounddevice output stream."""
+    """Routes PCM audio from shared_state.audio_ring to a sounddevice output stream."""
 
-    def __init__(self, shared_state: SharedState):
+    def __init__(
+        self,
+        shared_state: SharedState,
+        target_latency_ms: float | None = AUDIO_TARGET_LATENCY_MS,
+    ):
         self.shared_state = shared_state
+        # Adaptive mode when target_latency_ms is set; otherwise fixed prefill latency
+        self.jitter = JitterBuffer(AUDIO_BLOCK_SIZE, target_latency_ms)
+        # Lyria session rotation swaps in a new ring; the old one is faded out
+        self._ring = shared_state.audio_ring
+        self.crossfade = RingCrossfader(
+            AUDIO_BLOCK_SIZE, int(LYRIA_CROSSFADE_MS * AUDIO_SAMPLE_RATE / 1000)
+        )
 
-        silence = np.zeros((AUDIO_BLOCK_SIZE, AUDIO_CHANNELS), dtype=np.float32)
-        for _ in range(AUDIO_PREFILL_BLOCKS):
-            shared_state.audio_queue.put(silence)
+        shared_state.audio_ring.write_silence(AUDIO_PREFILL_BLOCKS * AUDIO_BLOCK_SIZE)
 
         self.stream = sd.OutputStream(
             samplerate=AUDIO_SAMPLE_RATE,
@@ -34,18 +44,27 @@ class AudioBridge:
         )
 
     def _audio_callback(self, outdata, frames, time_info, status):
-        """Non-blocking audio callback — fills outdata from queue or outputs silence."""
+        """Non-blocking audio callback — fills exactly ``frames`` from the ring."""
         if status:
             logger.debug("Audio stream status: %s", status)
-        try:
-            data = self.shared_state.audio_queue.get_nowait()
-            if data.shape[0] < frames:
-                outdata[: data.shape[0]] = data
-                outdata[data.shape[0] :] = 0
-            else:
-                outdata[:] = data[:frames]
-        except queue.Empty:
-            outdata[:] = 0
+        ring = self.shared_state.audio_ring
+        if ring is not self._ring:
+            self.crossfade.start(self._ring)
+            self._ring = ring
+        if self.jitter.read_into(ring, outdata):
+            self._publish_stats(ring)
+        self.crossfade.mix_into(outdata)
+
+    def _publish_stats(self, ring) -> None:
+        # Single reference swap — readers never see a partially updated record
+        self.shared_state.audio_buffer_stats = AudioBufferStats(
+            latency_ms=ring.latency_ms,
+            target_ms=self.jitter.current_target_ms,
+            jitter_ms=ring.jitter_ms,
+            stretch_ratio=self.jitter.ratio,
+            underruns=ring.underruns,
+            overruns=ring.overruns,
+        )
 
     def start(self):
         """Start the audio output stream."""
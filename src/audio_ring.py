@@ -0,0 +1,352 @@
+import time
+
+import numpy as np
+
+from src.config import (
+    AUDIO_CHANNELS,
+    AUDIO_CORRECTION_SECONDS,
+    AUDIO_JITTER_MARGIN,
+    AUDIO_MAX_LATENCY_MS,
+    AUDIO_MAX_STRETCH,
+    AUDIO_SAMPLE_RATE,
+)
+
+
+class AudioRingBuffer:
+    """Preallocated single-producer / single-consumer ring of float32 audio frames.
+
+    The producer (Lyria receiver on the asyncio thread) only advances ``_write``
+    and the consumer (PortAudio callback) only advances ``_read``. Both are
+    monotonically increasing frame counts and each side publishes its counter
+    after touching the data, so no lock is needed.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        channels: int = AUDIO_CHANNELS,
+        sample_rate: int = AUDIO_SAMPLE_RATE,
+    ) -> None:
+        self.capacity = capacity
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self._buf = np.zeros((capacity, channels), dtype=np.float32)
+        self._write = 0
+        self._read = 0
+
+        # Producer-side counters
+        self.overruns = 0
+        self.overrun_frames = 0
+        # Consumer-side counters
+        self.underruns = 0
+        self.underrun_frames = 0
+
+        # Arrival statistics (producer side), smoothed like RFC 3550 jitter
+        self.jitter_s = 0.0
+        self._last_arrival: float | None = None
+        self._last_arrival_frames = 0
+
+    @property
+    def available(self) -> int:
+        """Frames ready to be read."""
+        return self._write - self._read
+
+    @property
+    def frames_written(self) -> int:
+        """Total frames ever written (monotonic)."""
+        return self._write
+
+    @property
+    def free(self) -> int:
+        """Frames that can be written without overrun."""
+        return self.capacity - (self._write - self._read)
+
+    @property
+    def latency_ms(self) -> float:
+        """Duration of the buffered audio in milliseconds."""
+        return self.available * 1000.0 / self.sample_rate
+
+    @property
+    def jitter_ms(self) -> float:
+        """Smoothed deviation of chunk arrival times from their audio duration."""
+        return self.jitter_s * 1000.0
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def write_pcm16(self, raw: bytes) -> int:
+        """Convert interleaved int16 PCM straight into the ring. Returns frames written."""
+        samples = np.frombuffer(raw, dtype=np.int16)
+        n = len(samples) // self.channels
+        frames = samples[: n * self.channels].reshape(n, self.channels)
+        self._note_arrival(n)
+        return self._write_frames(frames, 1.0 / 32768.0)
+
+    def write(self, frames: np.ndarray) -> int:
+        """Append float32 frames of shape (n, channels). Returns frames written."""
+        self._note_arrival(frames.shape[0])
+        return self._write_frames(frames, 1.0)
+
+    def _note_arrival(self, n: int) -> None:
+        now = time.monotonic()
+        if self._last_arrival is not None:
+            expected = self._last_arrival_frames / self.sample_rate
+            deviation = abs((now - self._last_arrival) - expected)
+            self.jitter_s += (deviation - self.jitter_s) / 16.0
+        self._last_arrival = now
+        self._last_arrival_frames = n
+
+    def write_silence(self, n: int) -> int:
+        n = min(n, self.free)
+        pos = self._write % self.capacity
+        first = min(n, self.capacity - pos)
+        self._buf[pos : pos + first] = 0.0
+        self._buf[: n - first] = 0.0
+        self._write += n
+        return n
+
+    def _write_frames(self, frames: np.ndarray, scale: float) -> int:
+        n = frames.shape[0]
+        free = self.capacity - (self._write - self._read)
+        if n > free:
+            # Ring full: keep what is buffered and drop the excess of this chunk
+            self.overruns += 1
+            self.overrun_frames += n - free
+            n = free
+        if n == 0:
+            return 0
+
+        pos = self._write % self.capacity
+        first = min(n, self.capacity - pos)
+        np.multiply(
+            frames[:first], scale, out=self._buf[pos : pos + first], dtype=np.float32
+        )
+        if first < n:
+            np.multiply(
+                frames[first:n], scale, out=self._buf[: n - first], dtype=np.float32
+            )
+        self._write += n
+        return n
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+
+    def read_into(self, out: np.ndarray) -> int:
+        """Fill ``out`` (frames, channels) exactly, zero-padding on underrun.
+
+        Returns the number of buffered frames consumed.
+        """
+        frames = out.shape[0]
+        n = min(frames, self._write - self._read)
+        pos = self._read % self.capacity
+        first = min(n, self.capacity - pos)
+        out[:first] = self._buf[pos : pos + first]
+        if first < n:
+            out[first:n] = self._buf[: n - first]
+        if n < frames:
+            out[n:] = 0.0
+            self.underruns += 1
+            self.underrun_frames += frames - n
+        self._read += n
+        return n
+
+
+class JitterBuffer:
+    """Consumer-side latency controller for an ``AudioRingBuffer``.
+
+    Tracks the lowest buffer level seen over each adaptation period and nudges
+    the playback rate by at most ``max_stretch`` so that level converges on the
+    target. The target latency grows with the ring's measured arrival jitter.
+    Corrections are applied by linear-interpolation resampling of each block, so
+    the buffer never has to drop a block to shed latency. With
+    ``target_latency_ms=None`` the rate stays at 1.0 and only stats are kept.
+    """
+
+    def __init__(
+        self,
+        block_size: int,
+        target_latency_ms: float | None,
+        channels: int = AUDIO_CHANNELS,
+        sample_rate: int = AUDIO_SAMPLE_RATE,
+        max_stretch: float = AUDIO_MAX_STRETCH,
+        adapt_blocks: int = 10,
+    ) -> None:
+        self.block_size = block_size
+        self.target_latency_ms = target_latency_ms
+        self.sample_rate = sample_rate
+        self.max_stretch = max_stretch
+        self.adapt_blocks = adapt_blocks
+        self.ratio = 1.0
+        self.current_target_ms = target_latency_ms or 0.0
+
+        self._low_water = float("inf")
+        self._blocks = 0
+
+        # Scratch for stretched reads: slot 0 holds the previous block's last frame
+        max_in = int(block_size * (1.0 + max_stretch)) + 2
+        self._ext = np.zeros((max_in + 1, channels), dtype=np.float32)
+        self._steps = np.arange(1, block_size + 1, dtype=np.float64)
+        self._pos = np.empty(block_size, dtype=np.float64)
+        self._idx = np.empty(block_size, dtype=np.intp)
+        self._idx_next = np.empty(block_size, dtype=np.intp)
+        self._frac = np.empty((block_size, 1), dtype=np.float32)
+        self._a = np.empty((block_size, channels), dtype=np.float32)
+        self._b = np.empty((block_size, channels), dtype=np.float32)
+
+    @property
+    def adaptive(self) -> bool:
+        return self.target_latency_ms is not None
+
+    def read_into(self, ring: AudioRingBuffer, out: np.ndarray) -> bool:
+        """Fill ``out`` from ``ring``. Returns True once per adaptation period."""
+        frames = out.shape[0]
+        self._low_water = min(self._low_water, ring.available)
+
+        n_in = int(round(frames * self.ratio))
+        if n_in == frames or frames != self.block_size or ring.available < n_in:
+            ring.read_into(out)
+        else:
+            self._stretch_read(ring, out, n_in)
+        self._ext[0] = out[-1]
+
+        self._blocks += 1
+        if self._blocks < self.adapt_blocks:
+            return False
+        self._adapt(ring)
+        return True
+
+    def _stretch_read(self, ring: AudioRingBuffer, out: np.ndarray, n_in: int) -> None:
+        ext = self._ext
+        ring.read_into(ext[1 : n_in + 1])
+        # Output frame k samples the input at position (k + 1) * n_in / frames
+        np.multiply(self._steps, n_in / self.block_size, out=self._pos)
+        self._idx[:] = self._pos
+        np.minimum(self._idx, n_in - 1, out=self._idx)
+        np.subtract(self._pos, self._idx, out=self._frac[:, 0], casting="unsafe")
+        np.add(self._idx, 1, out=self._idx_next)
+        np.take(ext, self._idx, axis=0, out=self._a)
+        np.take(ext, self._idx_next, axis=0, out=self._b)
+        np.subtract(self._b, self._a, out=self._b)
+        self._b *= self._frac
+        np.add(self._a, self._b, out=out)
+
+    def _adapt(self, ring: AudioRingBuffer) -> None:
+        low_water, self._low_water = self._low_water, float("inf")
+        self._blocks = 0
+        if not self.adaptive:
+            return
+
+        target_ms = max(self.target_latency_ms, AUDIO_JITTER_MARGIN * ring.jitter_ms)
+        target_ms = min(target_ms, AUDIO_MAX_LATENCY_MS)
+        self.current_target_ms = target_ms
+        target = target_ms * self.sample_rate / 1000.0
+
+        error = low_water - target
+        if abs(error) < 0.1 * target:
+            self.ratio = 1.0
+            return
+        # Spread the correction over AUDIO_CORRECTION_SECONDS of playback
+        ratio = 1.0 + error / (self.sample_rate * AUDIO_CORRECTION_SECONDS)
+        self.ratio = min(max(ratio, 1.0 - self.max_stretch), 1.0 + self.max_stretch)
+
+
+class RingCrossfader:
+    """Fades a retired ring out underneath the block just read from its successor.
+
+    Used on the consumer side when the producer switches to a new ring: the
+    old ring keeps draining for ``fade_frames`` with an equal-power cos/sin
+    ramp against the new stream, then is released.
+    """
+
+    def __init__(
+        self, block_size: int, fade_frames: int, channels: int = AUDIO_CHANNELS
+    ) -> None:
+        self.fade_frames = max(1, fade_frames)
+        t = (np.arange(self.fade_frames, dtype=np.float64) + 0.5) / self.fade_frames
+        self._gain_in = np.sin(0.5 * np.pi * t).astype(np.float32)[:, None]
+        self._gain_out = np.cos(0.5 * np.pi * t).astype(np.float32)[:, None]
+        self._scratch = np.zeros((block_size, channels), dtype=np.float32)
+        self._ring: AudioRingBuffer | None = None
+        self._pos = 0
+        self.fades = 0
+
+    @property
+    def active(self) -> bool:
+        return self._ring is not None
+
+    def start(self, old_ring: AudioRingBuffer) -> None:
+        self._ring = old_ring
+        self._pos = 0
+        self.fades += 1
+
+    def mix_into(self, out: np.ndarray) -> None:
+        """Blend the old ring into ``out`` (already holding the new stream)."""
+        ring = self._ring
+        if ring is None:
+            return
+        n = out.shape[0]
+        if n > self._scratch.shape[0]:
+            self._scratch = np.zeros((n, out.shape[1]), dtype=np.float32)
+        pos = self._pos
+        k = min(n, self.fade_frames - pos)
+        old = self._scratch[:k]
+        ring.read_into(old)
+        out[:k] *= self._gain_in[pos : pos + k]
+        old *= self._gain_out[pos : pos + k]
+        out[:k] += old
+        self._pos = pos + k
+        if self._pos >= self.fade_frames:
+            self._ring = None
+
+
+class AudioHistory:
+    """Bounded int16 history of the most recent audio, readable as one contiguous block.
+
+    Every frame is written twice, at ``i`` and ``i + capacity``, so the newest
+    ``capacity`` frames always sit contiguously in the buffer and any trailing
+    window can be handed out as a zero-copy memoryview.
+    """
+
+    def __init__(
+        self,
+        seconds: float,
+        channels: int = AUDIO_CHANNELS,
+        sample_rate: int = AUDIO_SAMPLE_RATE,
+    ) -> None:
+        self.capacity = int(seconds * sample_rate)
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self._buf = np.zeros((2 * self.capacity, channels), dtype=np.int16)
+        self._pos = 0  # next write slot == oldest frame once full
+        self.filled = 0
+
+    def write_pcm16(self, raw: bytes) -> None:
+        samples = np.frombuffer(raw, dtype=np.int16)
+        n = len(samples) // self.channels
+        frames = samples[: n * self.channels].reshape(n, self.channels)
+        frames = frames[-self.capacity :]
+        n = frames.shape[0]
+        if n == 0:
+            return
+
+        cap = self.capacity
+        pos = self._pos
+        first = min(n, cap - pos)
+        self._buf[pos : pos + first] = frames[:first]
+        self._buf[cap + pos : cap + pos + first] = frames[:first]
+        rest = n - first
+        if rest:
+            self._buf[:rest] = frames[first:]
+            self._buf[cap : cap + rest] = frames[first:]
+        self._pos = (pos + n) % cap
+        self.filled = min(cap, self.filled + n)
+
+    def window(self, seconds: float) -> memoryview:
+        """Last ``seconds`` of interleaved int16 PCM as bytes, valid until the next write."""
+        n = min(int(seconds * self.sample_rate), self.filled)
+        if n == 0:
+            return memoryview(b"")
+        end = self._pos + self.capacity
+        return memoryview(self._buf[end - n : end]).cast("B")
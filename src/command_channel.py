@@ -0,0 +1,60 @@
+import asyncio
+import logging
+import threading
+
+from src.config import LYRIA_MAX_DISPATCH_HZ
+
+logger = logging.getLogger(__name__)
+
+
+class LyriaCommandChannel:
+    """Thread-safe, rate-limited path for render-thread parameter changes to Lyria.
+
+    ``post()`` is O(1): it writes each parameter into a last-write-wins slot and
+    wakes the event loop only when the slots go from empty to pending. ``run()``
+    drains the slots on the event loop at most ``max_rate_hz`` times per second
+    and hands them to the Lyria client as one staged update and flush. Whether
+    a value actually changes anything is left to the client's ConfigCoalescer,
+    which compares against the config last sent to the session, whoever sent it.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        lyria,
+        max_rate_hz: float = LYRIA_MAX_DISPATCH_HZ,
+    ) -> None:
+        self._loop = loop
+        self._lyria = lyria
+        self._min_interval = 1.0 / max_rate_hz
+        self._lock = threading.Lock()
+        self._slots: dict = {}
+        self._wake = asyncio.Event()
+
+        self.posted = 0
+        self.dispatched = 0
+
+    def post(self, **params) -> None:
+        """Queue parameter changes from any thread. Never blocks on the event loop."""
+        with self._lock:
+            self.posted += 1
+            was_empty = not self._slots
+            self._slots.update(params)
+        if was_empty and params:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def run(self) -> None:
+        """Dispatch pending slots to Lyria, at most ``max_rate_hz`` times per second."""
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                params, self._slots = self._slots, {}
+            if params:
+                try:
+                    self._lyria.stage_params(**params)
+                    await self._lyria.flush()
+                    self.dispatched += 1
+                except Exception as e:
+                    logger.warning("Lyria command dispatch failed: %s", e)
+            await asyncio.sleep(self._min_interval)
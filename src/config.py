@@ -22,6 +22,15 @@ DEFAULT_BRIGHTNESS = 0.3
 DEFAULT_TEMPERATURE = 1.1
 DEFAULT_GUIDANCE = 4.0
 LYRIA_SESSION_TIMEOUT = 540  # 9 min (reconnect before 10 min limit)
+LYRIA_PARAM_EPSILON = 0.005  # smaller config changes are not re-sent
+LYRIA_MAX_DISPATCH_HZ = 4.0  # max rate of render-thread commands into Lyria
+LYRIA_HISTORY_SECONDS = 10.0  # rolling audio kept for Gemini observations
+LYRIA_ROTATION_MODE = (
+    "rotate"  # "rotate" = warm standby + crossfade, "restart" = close then connect
+)
+LYRIA_PREBUFFER_MS = 500.0  # standby audio buffered before switching streams
+LYRIA_CROSSFADE_MS = 1500.0
+LYRIA_STANDBY_TIMEOUT = 15.0  # give up on a standby session that yields no audio
 
 # Feedback Loop
 FEEDBACK_INTERVAL = 2.5
@@ -30,26 +39,87 @@ FEEDBACK_MAX_DELTA = 0.1
 
 # Gemini
 GEMINI_LOOP_INTERVAL = 3.5
+GEMINI_AUDIO_WINDOW = 3.5  # seconds of recent music sent with each observation
+GEMINI_PIPELINED = True  # concurrent send/receive with latency-adaptive cadence
+GEMINI_MIN_INTERVAL = 1.5
+GEMINI_MAX_INTERVAL = 6.0
+GEMINI_LATENCY_HEADROOM = 1.2  # send interval = measured latency x headroom
+GEMINI_MAX_INFLIGHT = 2
+GEMINI_RESPONSE_TIMEOUT = 15.0
+GEMINI_CONTEXT_INTERVAL = 30.0  # resend session narrative this often
+GEMINI_MAX_CONSECUTIVE_ERRORS = 5  # observation loop gives up and reports disconnected
+
+# Connection supervisor (Lyria / Gemini reconnects)
+SUPERVISOR_CHECK_INTERVAL = 2.0
+SUPERVISOR_BACKOFF_BASE = 1.0  # first retry delay (s), doubled per failure
+SUPERVISOR_BACKOFF_MAX = 60.0
+SUPERVISOR_BACKOFF_JITTER = (
+    0.5  # each delay is randomly shortened by up to this fraction
+)
+SUPERVISOR_FAILURE_THRESHOLD = 5  # consecutive failures before the circuit opens
+SUPERVISOR_OPEN_SECONDS = 300.0  # circuit-open cool-down before a half-open trial
+SUPERVISOR_MIN_UPTIME = 30.0  # healthy this long before a connect counts as success
+
+# Frame capture (Gemini observation frames)
+CAPTURE_W = 480
+CAPTURE_H = 270
+CAPTURE_JPEG_QUALITY = 60
+CAPTURE_TIMEOUT = 0.5  # max wait for a requested frame before using the last one
+FRAME_SIGNATURE_GRID = (9, 16)  # luminance grid (rows, cols) for change detection
+FRAME_DIFF_THRESHOLD = 0.02  # mean abs luminance change below which a frame is skipped
+FRAME_MAX_STALENESS = 10.0  # always upload a frame at least this often (s)
 
 # Ghost Replay
 GHOST_DURATION = 20
 GHOST_PEAK_BRIGHTNESS = 2.5
 GHOST_IMMINENT_THRESHOLD = 15
 GHOST_IMMINENT_DURATION = 10
+GHOST_PATH_CAPACITY = 8192  # simplified path points kept; oldest strokes drop first
+GHOST_KEYFRAME_INTERVAL = 32  # absolute point every N delta-encoded points
+GHOST_SIMPLIFY_PX = 6  # drop touches closer than this to the last kept point
+GHOST_STROKE_GAP = 0.15  # seconds without touches that end a stroke
+GHOST_RASTER_BATCH = 16  # pending points before they are stamped into the mask
+GHOST_MASK_SCALE = 4  # screen pixels per mask cell
+GHOST_MASK_RADIUS = 24  # stamp radius in screen pixels
+GHOST_MASK_DECAY = 120.0  # seconds for a path's ghost glow to fall to 1/e
+
+# Touch event bus
+TOUCH_BUS_CAPACITY = 4096  # ~68 s of 60 Hz samples before a stalled consumer drops
+
+# Session narrative
+NARRATIVE_WINDOW = 300.0  # seconds of touch history behind the narrative statistics
+NARRATIVE_HISTORY_CAPACITY = 20000  # > 60 Hz x NARRATIVE_WINDOW
+NARRATIVE_INTERVAL = 5.0  # seconds between narrative refreshes
 
 # IML
 IML_INTERVAL = 0.5
 IML_DELTA_THRESHOLD = 0.05
 IML_MAX_PAIRS = 50
+IML_RIPPLE_DEPTH = 0.5  # Ripple weight modulation, < 1 keeps weights positive
+IML_RBF_REGULARIZATION = 1e-3  # ridge term on the RBF kernel diagonal
+IML_CACHE_SIZE = 256  # memoized predictions (LRU), cleared when training changes
+IML_CACHE_QUANTUM = 0.01  # touch-vector grid step for prediction cache keys
+IML_SETTLE = 1e-4  # smoothed outputs this close to the target snap to it
 
 # Audio
 AUDIO_SAMPLE_RATE = 48000
 GEMINI_AUDIO_RATE = 16000
 AUDIO_CHANNELS = 2
 AUDIO_BLOCK_SIZE = 4800  # 100ms at 48kHz
-AUDIO_QUEUE_MAXSIZE = 50
+AUDIO_RING_FRAMES = AUDIO_BLOCK_SIZE * 50  # 5 s of buffered Lyria output
 AUDIO_PREFILL_BLOCKS = 5
 
+# Adaptive jitter buffer (AudioBridge)
+AUDIO_TARGET_LATENCY_MS = 250.0  # buffer headroom target; None = fixed prefill only
+AUDIO_MAX_LATENCY_MS = 2000.0
+AUDIO_JITTER_MARGIN = 3.0  # target at least this many times the arrival jitter
+AUDIO_MAX_STRETCH = 0.02  # max playback-rate correction (±2%)
+AUDIO_CORRECTION_SECONDS = 5.0  # time over which a latency error is corrected
+
+# Visual metrics (feedback loop reads them every FEEDBACK_INTERVAL)
+METRICS_INTERVAL = 0.1  # 10 Hz
+METRICS_TRAIL_STRIDE = 4  # sample every 4th trail pixel in each axis
+
 # Physarum params
 SENSE_ANGLE = 45.0
 SENSE_DIST = 0.05
@@ -64,3 +134,9 @@ COHESION = 0.5
 FLUX_THRESHOLD = 0.3
 SPEED_SCALE = 2.0
 DIST_SCALE = 0.1
+
+# Frame profiling
+TARGET_FPS = 60
+PROFILER_WINDOW = 600  # frames of per-stage timings kept for percentiles (~10 s)
+PROFILE_LOG_INTERVAL = 5.0  # --profile: seconds between frame-time log lines
+PROFILE_HUD_INTERVAL = 0.5  # --profile-hud: seconds between overlay text refreshes
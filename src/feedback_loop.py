@@ -8,6 +8,8 @@ from src.config import (
     FEEDBACK_INTERVAL,
     FEEDBACK_GAIN,
     FEEDBACK_MAX_DELTA,
+    GEMINI_PIPELINED,
+    NARRATIVE_INTERVAL,
 )
 from src.shared_state import SharedState
 from src.prompts import get_system_prompt
@@ -27,8 +29,9 @@ class FeedbackLoop:
         self.narrative = narrative
         self._current_density = DEFAULT_DENSITY
         self._current_brightness = DEFAULT_BRIGHTNESS
+        self._gemini_task: asyncio.Task | None = None
 
-    async def update_lyria_from_tolvera(self):
+    def update_lyria_from_tolvera(self):
         boids_density, physarum_conn, _ = self.shared_state.get_visual_metrics()
 
         raw_density = self._current_density + (boids_density - 0.5) * FEEDBACK_GAIN
@@ -50,7 +53,7 @@ class FeedbackLoop:
         self._current_density = new_density
         self._current_brightness = new_brightness
 
-        await self.lyria.set_params(density=new_density, brightness=new_brightness)
+        self.lyria.stage_params(density=new_density, brightness=new_brightness)
 
     def update_prompts_from_state(self) -> list[dict]:
         boids_density, physarum_conn, _ = self.shared_state.get_visual_metrics()
@@ -69,57 +72,95 @@ class FeedbackLoop:
 
         return prompts[:3]
 
-    async def update_mute_from_activity(self):
+    def update_mute_from_activity(self):
         _, _, activity = self.shared_state.get_visual_metrics()
 
         if activity < 0.2:
-            await self.lyria.set_params(mute_drums=True, mute_bass=True)
+            self.lyria.stage_params(mute_drums=True, mute_bass=True)
         elif activity < 0.5:
-            await self.lyria.set_params(mute_drums=True, mute_bass=False)
+            self.lyria.stage_params(mute_drums=True, mute_bass=False)
         else:
-            await self.lyria.set_params(mute_drums=False, mute_bass=False)
+            self.lyria.stage_params(mute_drums=False, mute_bass=False)
 
-    async def _apply_gemini_actions(self):
+    def _apply_gemini_actions(self) -> bool:
+        """Stage the next Gemini action. Returns True if it staged prompts."""
         try:
             action = self.shared_state.gemini_action.get_nowait()
         except queue.Empty:
-            return
-
-        if "lyria_prompts" in action:
-            await self.lyria.set_prompts(action["lyria_prompts"])
-        if "density" in action:
-            await self.lyria.set_params(density=action["density"])
-        if "brightness" in action:
-            await self.lyria.set_params(brightness=action["brightness"])
+            return False
+
+        staged_prompts = "lyria_prompts" in action
+        if staged_prompts:
+            self.lyria.stage_prompts(action["lyria_prompts"])
+        self.lyria.stage_params(
+            density=action.get("density"), brightness=action.get("brightness")
+        )
         if "reasoning" in action:
             logger.info(f"Gemini reasoning: {action['reasoning']}")
+        return staged_prompts
+
+    async def step(self):
+        """Stage every update for this tick, then send at most one config write
+        and one prompt write. Gemini's prompts take priority over the state ones."""
+        self.update_lyria_from_tolvera()
+        self.update_mute_from_activity()
+        if not self._apply_gemini_actions():
+            self.lyria.stage_prompts(self.update_prompts_from_state())
+        await self.lyria.flush()
 
     async def run(self):
         while True:
             try:
-                await self.update_lyria_from_tolvera()
-                await self.update_mute_from_activity()
-                await self._apply_gemini_actions()
-
-                prompts = self.update_prompts_from_state()
-                await self.lyria.set_prompts(prompts)
+                await self.step()
             except Exception as e:
                 logger.warning(f"Feedback loop error: {e}")
 
             await asyncio.sleep(FEEDBACK_INTERVAL)
 
     async def run_narrative_updater(self):
+        """Drain the narrative's touch-bus cursor and refresh the narrative."""
+        cursor = self.shared_state.touch_bus.subscribe("narrative")
         while True:
-            await asyncio.sleep(30)
+            await asyncio.sleep(NARRATIVE_INTERVAL)
             try:
-                n_pairs = self.shared_state.iml_n_pairs
-                self.narrative.update(n_pairs=n_pairs)
+                self.update_narrative(cursor)
             except Exception as e:
                 logger.warning(f"Narrative update error: {e}")
 
+    def update_narrative(self, cursor) -> None:
+        """One narrative tick on the updater's thread: apply a pending reset,
+        record new touches from ``cursor`` and refresh the narrative."""
+        if self.narrative.take_reset():
+            # Touches published before the reset belong to the old session
+            cursor.skip()
+        dropped = cursor.dropped
+        self.narrative.record_touches(cursor.read())
+        if cursor.dropped > dropped:
+            logger.warning(
+                "Narrative fell behind the touch bus: %d events dropped",
+                cursor.dropped - dropped,
+            )
+        n_pairs = self.shared_state.iml_n_pairs
+        self.narrative.update(n_pairs=n_pairs)
+
     async def start_gemini(self):
+        """(Re)connect Gemini and start its observation loop. Raises on failure."""
+        if self._gemini_task is not None:
+            self._gemini_task.cancel()
+            self._gemini_task = None
+        if self.gemini.session is not None:
+            await self.gemini.close()
         system_prompt = get_system_prompt(self.narrative.get())
         await self.gemini.connect(system_prompt)
-        asyncio.create_task(
-            self.gemini.gemini_loop(self.narrative, self.lyria.get_latest_audio_chunk)
+        loop = (
+            self.gemini.gemini_pipelined_loop
+            if GEMINI_PIPELINED
+            else self.gemini.gemini_loop
         )
+        self._gemini_task = asyncio.create_task(
+            loop(self.narrative, self.lyria.get_audio_window)
+        )
+
+    def gemini_healthy(self) -> bool:
+        task = self._gemini_task
+        return self.gemini.connected and task is not None and not task.done()
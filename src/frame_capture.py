@@ -0,0 +1,148 @@
+import io
+import logging
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from src.config import (
+    CAPTURE_JPEG_QUALITY,
+    FRAME_DIFF_THRESHOLD,
+    FRAME_MAX_STALENESS,
+    FRAME_SIGNATURE_GRID,
+)
+from src.shared_state import SharedState
+
+logger = logging.getLogger(__name__)
+
+
+def encode_jpeg(pixels: np.ndarray, quality: int = CAPTURE_JPEG_QUALITY) -> bytes:
+    """Encode a float RGB(A) array in [0, 1], shape (H, W, C), as JPEG bytes."""
+    img_array = (np.clip(pixels, 0.0, 1.0) * 255).astype(np.uint8)
+
+    # Drop alpha channel if present
+    if img_array.ndim == 3 and img_array.shape[2] == 4:
+        img_array = img_array[:, :, :3]
+
+    buf = io.BytesIO()
+    Image.fromarray(img_array).save(buf, format="JPEG", quality=quality)
+    return buf.getvalue()
+
+
+def frame_signature(
+    pixels: np.ndarray, grid: tuple[int, int] = FRAME_SIGNATURE_GRID
+) -> np.ndarray:
+    """Block-averaged luminance of a float RGB(A) frame, shape ``grid`` (rows, cols)."""
+    h, w = pixels.shape[:2]
+    rows, cols = min(grid[0], h), min(grid[1], w)
+    bh, bw = h // rows, w // cols
+    rgb = pixels[: rows * bh, : cols * bw, :3]
+    luma = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    return luma.reshape(rows, bh, cols, bw).mean(axis=(1, 3), dtype=np.float32)
+
+
+class FrameChangeGate:
+    """Decides whether a frame differs enough from the last one sent to upload it.
+
+    Frames are compared by the mean absolute difference of their luminance
+    signatures. A frame is always sent when there is no previous signature, the
+    shapes differ, or ``max_staleness`` seconds have passed since the last send.
+    """
+
+    def __init__(
+        self,
+        threshold: float = FRAME_DIFF_THRESHOLD,
+        max_staleness: float = FRAME_MAX_STALENESS,
+    ) -> None:
+        self.threshold = threshold
+        self.max_staleness = max_staleness
+        self._last: np.ndarray | None = None
+        self._last_sent = float("-inf")
+        self.last_diff = 0.0
+        self.checked = 0
+        self.skipped = 0
+
+    @property
+    def skip_rate(self) -> float:
+        return self.skipped / self.checked if self.checked else 0.0
+
+    def should_send(
+        self, signature: np.ndarray | None, now: float | None = None
+    ) -> bool:
+        """Return True (and remember the frame) if it should be uploaded."""
+        now = time.monotonic() if now is None else now
+        self.checked += 1
+        if (
+            signature is not None
+            and self._last is not None
+            and signature.shape == self._last.shape
+            and now - self._last_sent < self.max_staleness
+        ):
+            self.last_diff = float(np.abs(signature - self._last).mean())
+            if self.last_diff < self.threshold:
+                self.skipped += 1
+                return False
+        self._last = signature
+        self._last_sent = now
+        return True
+
+
+class FrameEncoder:
+    """Encodes downscaled frames to JPEG on a worker thread.
+
+    The render thread hands over pixels with ``submit()``, which never blocks:
+    a frame still waiting to be encoded is replaced by the newer one. Encoded
+    frames are published to ``SharedState`` with their luminance signature for
+    the Gemini loop.
+    """
+
+    def __init__(self, shared_state: SharedState) -> None:
+        self.shared_state = shared_state
+        self._pending: np.ndarray | None = None
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread: threading.Thread | None = None
+        self.frames_encoded = 0
+        self.frames_replaced = 0
+
+    def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="frame-encoder", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def submit(self, pixels: np.ndarray) -> None:
+        """Queue pixels for encoding, replacing any frame not yet picked up."""
+        with self._cond:
+            if self._pending is not None:
+                self.frames_replaced += 1
+            self._pending = pixels
+            self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and self._pending is None:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                pixels, self._pending = self._pending, None
+            try:
+                self.shared_state.publish_jpeg_frame(
+                    encode_jpeg(pixels), frame_signature(pixels)
+                )
+                self.frames_encoded += 1
+            except Exception:
+                logger.debug("FrameEncoder: encode failed", exc_info=True)
@@ -1,16 +1,28 @@
 import asyncio
-import json
 import logging
-import re
-
-import numpy as np
+import time
+from collections import deque
 
 from src.config import (
+    AUDIO_CHANNELS,
+    AUDIO_SAMPLE_RATE,
+    CAPTURE_TIMEOUT,
     GEMINI_AUDIO_RATE,
+    GEMINI_AUDIO_WINDOW,
+    GEMINI_CONTEXT_INTERVAL,
+    GEMINI_LATENCY_HEADROOM,
     GEMINI_LOOP_INTERVAL,
+    GEMINI_MAX_CONSECUTIVE_ERRORS,
+    GEMINI_MAX_INFLIGHT,
+    GEMINI_MAX_INTERVAL,
+    GEMINI_MIN_INTERVAL,
     GEMINI_MODEL,
+    GEMINI_RESPONSE_TIMEOUT,
     GOOGLE_API_KEY,
 )
+from src.frame_capture import FrameChangeGate
+from src.json_stream import StreamingJSONParser
+from src.resampler import PolyphaseResampler
 from src.shared_state import SharedState
 
 logger = logging.getLogger(__name__)
@@ -19,16 +31,40 @@ logger = logging.getLogger(__name__)
 class GeminiClient:
     """Gemini Live API client for visual + audio observation and JSON action output."""
 
-    def __init__(self, shared_state: SharedState):
-        import google.genai as genai
-        from google.genai import types
+    def __init__(self, shared_state: SharedState, client=None, types=None):
+        """``client`` / ``types`` replace google.genai (e.g. mock_services)."""
+        if client is None:
+            import google.genai as genai
+
+            client = genai.Client(api_key=GOOGLE_API_KEY)
+        if types is None:
+            from google.genai import types
 
-        self._genai = genai
         self._types = types
-        self.client = genai.Client(api_key=GOOGLE_API_KEY)
+        self.client = client
         self.session = None
         self.connected = False
         self.shared_state = shared_state
+        # Pipelined observation state
+        self._sent_seq = 0
+        self._inflight: deque[tuple[int, float]] = deque()
+        self._latency_ewma = GEMINI_LOOP_INTERVAL
+        self.pipeline_stats = {
+            "sent": 0,
+            "delivered": 0,
+            "stale": 0,
+            "empty": 0,
+            "timed_out": 0,
+        }
+
+        self._parser = StreamingJSONParser()
+        self._frame_gate = FrameChangeGate()
+        self._resampler = PolyphaseResampler(
+            AUDIO_SAMPLE_RATE,
+            GEMINI_AUDIO_RATE,
+            channels=AUDIO_CHANNELS,
+            max_chunk_frames=int(GEMINI_AUDIO_WINDOW * AUDIO_SAMPLE_RATE),
+        )
 
     async def connect(self, system_prompt: str):
         types = self._types
@@ -39,6 +75,8 @@ class GeminiClient:
         self.session = await self.client.aio.live.connect(
             model=GEMINI_MODEL, config=config
         ).__aenter__()
+        # Observations still in flight belong to the previous session
+        self._reset_pipeline()
         self.connected = True
         self.shared_state.gemini_connected = True
         logger.info("Gemini session connected.")
@@ -49,62 +87,58 @@ class GeminiClient:
             media=types.Blob(data=jpeg_bytes, mime_type="image/jpeg")
         )
 
-    async def send_audio(self, pcm_48k: bytes):
+    async def send_audio(self, pcm_48k: bytes | memoryview):
         types = self._types
-        samples = np.frombuffer(pcm_48k, dtype=np.int16)
-        downsampled = samples[::3]  # 48000/3 = 16000 Hz
-        pcm_16k = downsampled.tobytes()
+        # Anti-aliased 48 kHz stereo → 16 kHz mono
+        pcm_16k = self._resampler.process(pcm_48k)
         await self.session.send_realtime_input(
             media=types.Blob(
                 data=pcm_16k, mime_type=f"audio/pcm;rate={GEMINI_AUDIO_RATE}"
             )
         )
 
-    async def receive_action(self) -> dict | None:
-        try:
-            response = await self.session.receive()
-            text = None
-            if hasattr(response, "text") and response.text:
-                text = response.text
-            elif (
-                hasattr(response, "server_content")
-                and response.server_content
-                and hasattr(response.server_content, "model_turn")
-                and response.server_content.model_turn
-            ):
-                parts = response.server_content.model_turn.parts
-                if parts:
-                    text = parts[0].text
-            if not text:
-                return None
-
-            # PRIMARY: direct json.loads
-            try:
-                parsed = json.loads(text)
-            except json.JSONDecodeError:
-                # FALLBACK: regex extract first {...} block
-                match = re.search(r"\{.*\}", text, re.DOTALL)
-                if match:
-                    try:
-                        parsed = json.loads(match.group())
-                    except json.JSONDecodeError:
-                        logger.warning("Gemini: JSON regex fallback failed.")
-                        return None
-                else:
-                    logger.warning("Gemini: no JSON found in response.")
-                    return None
-
-            # Validate expected keys
-            expected = {"lyria_prompts", "density", "brightness", "reasoning"}
-            if not expected.issubset(parsed.keys()):
-                logger.warning(f"Gemini: missing keys in response: {parsed.keys()}")
-                return None
-
-            return parsed
-
-        except Exception as e:
-            logger.warning(f"Gemini receive_action error: {e}")
-            return None
+    async def receive_action(self, on_action=None) -> dict | None:
+        """Read one model turn and return its first schema-valid JSON action.
+
+        Text from every message of the turn is fed to the streaming parser, and
+        ``on_action`` is called the moment the object closes rather than when
+        the turn ends. Returns None if the turn held no valid action; transport
+        errors, a closed session and a stream that ends without any message
+        raise instead, so callers can back off.
+        """
+        session = self.session
+        if session is None:
+            raise ConnectionError("Gemini session is closed")
+        parser = self._parser
+        parser.reset()
+        action = None
+        messages = 0
+        async for response in session.receive():
+            messages += 1
+            text = _response_text(response)
+            if text and action is None:
+                action = parser.feed(text)
+                if action is not None and on_action is not None:
+                    on_action(action)
+            content = getattr(response, "server_content", None)
+            if content is not None and getattr(content, "turn_complete", False):
+                break
+        if messages == 0:
+            raise ConnectionError("Gemini receive stream ended without a message")
+
+        if action is None and parser.fragments:
+            logger.warning(
+                "Gemini: no valid action in %d fragments (rejected: %s)",
+                parser.fragments,
+                ", ".join(parser.turn_rejections) or "incomplete",
+            )
+        elif action is not None:
+            logger.debug(
+                "Gemini: parsed action from %d fragments in %.3f ms",
+                parser.fragments,
+                parser.parse_time * 1000.0,
+            )
+        return action
 
     async def send_text(self, text: str):
         types = self._types
@@ -112,56 +146,227 @@ class GeminiClient:
             turns=[types.Content(parts=[types.Part(text=text)])]
         )
 
-    async def gemini_loop(self, narrative_manager, get_latest_audio_fn):
+    async def fetch_frame(self, timeout: float = CAPTURE_TIMEOUT) -> tuple:
+        """Request a fresh frame from the render thread and wait briefly for it.
+
+        Returns ``(jpeg, signature)``, falling back to the last published frame
+        if none arrives within ``timeout``.
+        """
+        version = self.shared_state.request_frame()
+        deadline = time.monotonic() + timeout
+        while (
+            self.shared_state.frame_version == version and time.monotonic() < deadline
+        ):
+            await asyncio.sleep(1 / 60)
+        return self.shared_state.latest_frame()
+
+    async def _send_observation(
+        self, narrative_manager, get_audio_window_fn, send_context: bool
+    ) -> None:
+        """Send frame, audio window, optional session context and the JSON prompt."""
         types = self._types
-        iteration = 0
-        while True:
+        frame, signature = await self.fetch_frame()
+        # Skip uploads while the organism has barely changed
+        if frame:
+            gate = self._frame_gate
+            if gate.should_send(signature):
+                await self.send_frame(frame)
+            else:
+                logger.debug(
+                    "Gemini: frame unchanged (diff %.4f), skip rate %.0f%%",
+                    gate.last_diff,
+                    gate.skip_rate * 100.0,
+                )
+
+        # Everything that played since the last observation, as one window
+        audio = get_audio_window_fn(GEMINI_AUDIO_WINDOW)
+        if audio:
+            self._resampler.reset()
+            await self.send_audio(audio)
+
+        if send_context:
             try:
-                frame = self.shared_state.latest_jpeg_frame
-                if frame:
-                    await self.send_frame(frame)
+                ghost_state, _, ghost_elapsed = self.shared_state.get_ghost_info()
+                context = narrative_manager.get(
+                    ghost_state=ghost_state, ghost_value=ghost_elapsed
+                )
+                await self.send_text(f"Updated session context:\n{context}")
+            except Exception as e:
+                logger.debug(f"Narrative update to Gemini failed: {e}")
 
-                audio = get_latest_audio_fn()
-                if audio:
-                    await self.send_audio(audio)
+        await self.session.send_client_content(
+            turns=[
+                types.Content(parts=[types.Part(text="Observe and respond with JSON.")])
+            ]
+        )
 
+    async def gemini_loop(self, narrative_manager, get_audio_window_fn):
+        """Sequential loop: observe, wait for the action, sleep a fixed interval."""
+        iteration = 0
+        errors = 0
+        while True:
+            try:
                 # Update narrative context every ~30s (every 8 iterations at 3.5s)
                 iteration += 1
-                if iteration % 8 == 0:
-                    try:
-                        ghost_state, _, ghost_elapsed = (
-                            self.shared_state.get_ghost_info()
-                        )
-                        context = narrative_manager.get(
-                            ghost_state=ghost_state, ghost_value=ghost_elapsed
-                        )
-                        await self.send_text(f"Updated session context:\n{context}")
-                    except Exception as e:
-                        logger.debug(f"Narrative update to Gemini failed: {e}")
-
-                await self.session.send_client_content(
-                    turns=[
-                        types.Content(
-                            parts=[types.Part(text="Observe and respond with JSON.")]
-                        )
-                    ]
+                await self._send_observation(
+                    narrative_manager, get_audio_window_fn, iteration % 8 == 0
                 )
-                action = await self.receive_action()
-
-                if action:
-                    self.shared_state.gemini_action.put_nowait(action)
-
+                await self.receive_action(
+                    on_action=self.shared_state.gemini_action.put_nowait
+                )
+                errors = 0
             except Exception as e:
                 logger.warning(f"Gemini loop error: {e}")
+                errors += 1
+                if errors >= GEMINI_MAX_CONSECUTIVE_ERRORS:
+                    self._give_up()
+                    return
 
             await asyncio.sleep(GEMINI_LOOP_INTERVAL)
 
+    async def gemini_pipelined_loop(self, narrative_manager, get_audio_window_fn):
+        """Pipelined loop: a receiver task consumes responses while sends run on a
+        deadline cadence that tracks measured model latency.
+
+        Responses arrive in turn order, so each is matched to the oldest
+        in-flight observation sequence number. An action whose observation has
+        already been superseded by a newer send is dropped as stale. The loop
+        ends once the receiver gives up on a failing response stream.
+        """
+        receiver = asyncio.create_task(self._receive_loop())
+        last_context = time.monotonic()
+        deadline = time.monotonic()
+        errors = 0
+        try:
+            while True:
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    # Wakes early if the receiver gives up
+                    await asyncio.wait({receiver}, timeout=delay)
+                if receiver.done():
+                    return
+                now = time.monotonic()
+                self._expire_inflight(now)
+                if len(self._inflight) >= GEMINI_MAX_INFLIGHT:
+                    deadline = now + GEMINI_MIN_INTERVAL
+                    continue
+
+                try:
+                    send_context = now - last_context >= GEMINI_CONTEXT_INTERVAL
+                    if send_context:
+                        last_context = now
+                    await self._send_observation(
+                        narrative_manager, get_audio_window_fn, send_context
+                    )
+                    # No await between the prompt going out and registering it
+                    self._sent_seq += 1
+                    self._inflight.append((self._sent_seq, time.monotonic()))
+                    self.pipeline_stats["sent"] += 1
+                    errors = 0
+                except Exception as e:
+                    logger.warning(f"Gemini loop error: {e}")
+                    errors += 1
+                    if errors >= GEMINI_MAX_CONSECUTIVE_ERRORS:
+                        self._give_up()
+                        return
+
+                deadline = max(deadline + self.observation_interval(), time.monotonic())
+        finally:
+            receiver.cancel()
+
+    def _give_up(self) -> None:
+        """Stop observing and report the session as down so it gets reconnected."""
+        logger.error(
+            "Gemini: %d consecutive errors — marking session disconnected",
+            GEMINI_MAX_CONSECUTIVE_ERRORS,
+        )
+        self.connected = False
+        self.shared_state.gemini_connected = False
+
+    def observation_interval(self) -> float:
+        """Next send spacing: measured latency plus headroom, clamped."""
+        interval = self._latency_ewma * GEMINI_LATENCY_HEADROOM
+        return min(max(interval, GEMINI_MIN_INTERVAL), GEMINI_MAX_INTERVAL)
+
+    async def _receive_loop(self):
+        """Consume response turns until the session closes; back off on errors.
+
+        GEMINI_MAX_CONSECUTIVE_ERRORS failed receives in a row mark the session
+        down, like send errors do, so the supervisor reconnects it.
+        """
+        failures = 0
+        while self.session is not None:
+            try:
+                # Deliver as soon as the JSON closes; the rest of the turn is drained
+                action = await self.receive_action(
+                    on_action=lambda a: self._complete_observation(a, time.monotonic())
+                )
+            except Exception as e:
+                failures += 1
+                if failures >= GEMINI_MAX_CONSECUTIVE_ERRORS:
+                    logger.warning(f"Gemini receive error: {e}")
+                    self._give_up()
+                    return
+                delay = min(
+                    GEMINI_MIN_INTERVAL * 2.0 ** (failures - 1), GEMINI_MAX_INTERVAL
+                )
+                logger.warning(
+                    "Gemini receive error (%d in a row): %s; retry in %.1fs",
+                    failures,
+                    e,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+                continue
+            failures = 0
+            if action is None:
+                self._complete_observation(None, time.monotonic())
+
+    def _complete_observation(self, action: dict | None, now: float) -> None:
+        """Match a finished response turn to its observation and deliver or drop it."""
+        if self._inflight:
+            seq, sent_at = self._inflight.popleft()
+            latency = now - sent_at
+            self._latency_ewma += 0.2 * (latency - self._latency_ewma)
+        else:
+            seq = self._sent_seq  # unsolicited turn: treat as answering the latest
+
+        if action is None:
+            self.pipeline_stats["empty"] += 1
+            return
+        if seq < self._sent_seq:
+            self.pipeline_stats["stale"] += 1
+            logger.debug("Gemini: dropping stale action for observation %d", seq)
+            return
+        self.pipeline_stats["delivered"] += 1
+        self.shared_state.gemini_action.put_nowait(action)
+
+    def _reset_pipeline(self) -> None:
+        self._inflight.clear()
+        self._sent_seq = 0
+        self._latency_ewma = GEMINI_LOOP_INTERVAL
+
+    def _expire_inflight(self, now: float) -> None:
+        while self._inflight and now - self._inflight[0][1] > GEMINI_RESPONSE_TIMEOUT:
+            self._inflight.popleft()
+            self.pipeline_stats["timed_out"] += 1
+
     async def close(self):
         if self.session:
             try:
                 await self.session.__aexit__(None, None, None)
             except Exception as e:
                 logger.warning(f"Gemini close error: {e}")
+            self.session = None
         self.connected = False
         self.shared_state.gemini_connected = False
         logger.info("Gemini session closed.")
+
+
+def _response_text(response) -> str:
+    """Concatenate the text parts of one Live API server message."""
+    content = getattr(response, "server_content", None)
+    turn = getattr(content, "model_turn", None) if content is not None else None
+    if turn is not None and turn.parts:
+        return "".join(part.text for part in turn.parts if getattr(part, "text", None))
+    return getattr(response, "text", None) or ""
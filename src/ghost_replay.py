@@ -1,12 +1,149 @@
 import time
+
+import numpy as np
+
 from src.config import (
     GHOST_DURATION,
     GHOST_PEAK_BRIGHTNESS,
     GHOST_IMMINENT_THRESHOLD,
     GHOST_IMMINENT_DURATION,
+    GHOST_KEYFRAME_INTERVAL,
+    GHOST_PATH_CAPACITY,
+    GHOST_RASTER_BATCH,
+    GHOST_SIMPLIFY_PX,
+    GHOST_STROKE_GAP,
 )
 
 
+class GhostPathStore:
+    """Touch strokes in screen pixels, simplified online and delta-encoded.
+
+    Touches closer than ``min_distance`` to the last kept point are dropped.
+    Kept points go into a fixed ring of int16 (dx, dy) pairs; stroke starts
+    and every ``keyframe_interval``-th point are keyframes holding absolute
+    coordinates instead, so any run starting at a keyframe decodes with one
+    cumulative sum. When the ring is full the oldest keyframe block is
+    dropped. Each entry is also written one ring length further on, so the
+    live window is always a contiguous slice.
+
+    ``take_segments()`` returns the points added since the previous call as
+    line segments for rasterizing into the ghost mask.
+    """
+
+    KEY = 1
+    STROKE = 2
+
+    def __init__(
+        self,
+        capacity: int = GHOST_PATH_CAPACITY,
+        keyframe_interval: int = GHOST_KEYFRAME_INTERVAL,
+        min_distance: float = GHOST_SIMPLIFY_PX,
+        stroke_gap: float = GHOST_STROKE_GAP,
+    ) -> None:
+        self.capacity = capacity
+        self.keyframe_interval = keyframe_interval
+        self.min_distance = min_distance
+        self.stroke_gap = stroke_gap
+        self._xy = np.zeros((2 * capacity, 2), dtype=np.int16)
+        self._flags = np.zeros(2 * capacity, dtype=np.uint8)
+        self.clear()
+
+    def __len__(self) -> int:
+        return self._tail - self._head
+
+    @property
+    def pending(self) -> int:
+        """Points not yet returned by take_segments()."""
+        return self._tail - max(self._drawn, self._head)
+
+    def in_stroke(self, now: float) -> bool:
+        return now - self._last_time <= self.stroke_gap
+
+    def add(self, x: int, y: int, now: float) -> bool:
+        """Offer a touch at time ``now``. Returns whether the point was kept."""
+        self.received += 1
+        new_stroke = self._last is None or not self.in_stroke(now)
+        self._last_time = now
+        if not new_stroke:
+            lx, ly = self._last
+            if (x - lx) ** 2 + (y - ly) ** 2 < self.min_distance**2:
+                return False
+
+        if self._tail - self._head == self.capacity:
+            self._drop_block()
+        if new_stroke or self._since_key == self.keyframe_interval:
+            flags = self.KEY | self.STROKE if new_stroke else self.KEY
+            value = (x, y)
+            self._since_key = 0
+        else:
+            flags = 0
+            value = (x - self._last[0], y - self._last[1])
+        self._since_key += 1
+        self._last = (x, y)
+
+        pos = self._tail % self.capacity
+        for i in (pos, pos + self.capacity):
+            self._xy[i] = value
+            self._flags[i] = flags
+        self._tail += 1
+        return True
+
+    def points(self) -> tuple[np.ndarray, np.ndarray]:
+        """All stored points as (n, 2) absolute pixels, plus a stroke-start mask."""
+        pts, flags = self._decode(self._head, self._tail)
+        return pts, (flags & self.STROKE).astype(bool)
+
+    def take_segments(self) -> np.ndarray:
+        """(n, 4) segments x0, y0, x1, y1 ending at each point added since the last call.
+
+        A stroke's first point is returned as a zero-length segment (a dot).
+        """
+        start = max(self._drawn, self._head)
+        self._drawn = self._tail
+        if start == self._tail:
+            return np.empty((0, 4), dtype=np.int32)
+        # Decode from the keyframe at or before the previous point
+        key = start - 1 if start > self._head else start
+        while not self._flags[key % self.capacity] & self.KEY:
+            key -= 1
+        pts, flags = self._decode(key, self._tail)
+        prev = np.empty_like(pts)
+        prev[1:] = pts[:-1]
+        starts = (flags & self.STROKE).astype(bool)
+        starts[0] = True
+        prev[starts] = pts[starts]
+        return np.hstack([prev, pts])[start - key :]
+
+    def clear(self) -> None:
+        self._head = 0  # monotonic index of the oldest point (always a keyframe)
+        self._tail = 0  # monotonic index of the next write
+        self._drawn = 0  # monotonic index of the next point to rasterize
+        self._last: tuple[int, int] | None = None
+        self._last_time = float("-inf")
+        self._since_key = 0
+        self.received = 0
+
+    def _drop_block(self) -> None:
+        self._head += 1
+        while self._head < self._tail and not (
+            self._flags[self._head % self.capacity] & self.KEY
+        ):
+            self._head += 1
+
+    def _decode(self, start: int, end: int) -> tuple[np.ndarray, np.ndarray]:
+        # ``start`` must be a keyframe. Cumulative sums restart at each keyframe
+        # by subtracting the sum of everything before it.
+        s = start % self.capacity
+        values = self._xy[s : s + (end - start)].astype(np.int32)
+        flags = self._flags[s : s + (end - start)].copy()
+        if len(values) == 0:
+            return values, flags
+        csum = np.cumsum(values, axis=0)
+        key = (flags & self.KEY).astype(bool)
+        base = (csum - values)[key]
+        return csum - base[np.cumsum(key) - 1], flags
+
+
 class GhostReplay:
     """Ghost Replay state machine.
 
@@ -28,16 +165,33 @@ class GhostReplay:
         self.imminent_start_time: float = 0.0
         self.duration: float = GHOST_DURATION
         self.touch_count: int = 0
-        self.touch_paths: list[tuple[int, int]] = []
+        self.paths = GhostPathStore()
 
     def record_touch(self, x: int, y: int, radius: int = 5) -> None:
-        """Record touch position for evaporate_mask and track touch count."""
-        self.touch_paths.append((x, y))
+        """Record touch position (screen pixels) for the ghost mask and track touch count."""
+        self.paths.add(x, y, time.monotonic())
         self.touch_count += 1
         if self.touch_count >= GHOST_IMMINENT_THRESHOLD and self.state == "IDLE":
             self.state = "IMMINENT"
             self.imminent_start_time = time.time()
 
+    def take_segments(self, force: bool = False) -> np.ndarray | None:
+        """Path segments due for rasterizing into the ghost mask, or None.
+
+        Batches GHOST_RASTER_BATCH points, and flushes when a stroke ends or
+        ``force`` is set (during ACTIVE replay).
+        """
+        paths = self.paths
+        if paths.pending == 0:
+            return None
+        if (
+            force
+            or paths.pending >= GHOST_RASTER_BATCH
+            or not paths.in_stroke(time.monotonic())
+        ):
+            return paths.take_segments()
+        return None
+
     def trigger(self) -> None:
         """Force transition to ACTIVE (G key or auto-trigger from IMMINENT)."""
         self.state = "ACTIVE"
@@ -88,8 +242,8 @@ class GhostReplay:
         self.start_time = 0.0
         self.imminent_start_time = 0.0
         self.touch_count = 0
-        self.touch_paths.clear()
+        self.paths.clear()
 
     @property
     def has_paths(self) -> bool:
-        return len(self.touch_paths) > 0
+        return len(self.paths) > 0
@@ -1,94 +1,150 @@
+import functools
+import math
 import time
 import logging
 
-from src.config import IML_INTERVAL, IML_DELTA_THRESHOLD, IML_MAX_PAIRS
-
-logger = logging.getLogger(__name__)
+import numpy as np
 
+from src.config import (
+    IML_CACHE_QUANTUM,
+    IML_CACHE_SIZE,
+    IML_INTERVAL,
+    IML_DELTA_THRESHOLD,
+    IML_MAX_PAIRS,
+    IML_SETTLE,
+    TARGET_FPS,
+)
+from src.iml_regressor import IMLRegressor
 
-def _l2_distance(a: list[float], b: list[float]) -> float:
-    return sum((x - y) ** 2 for x, y in zip(a, b)) ** 0.5
+logger = logging.getLogger(__name__)
 
 
 class IMLManager:
-    def __init__(self, tolvera_engine):
-        self.tv = tolvera_engine.tv
+    """Interactive ML: touch (x, y, velocity, dwell) → Boids and Physarum parameters.
+
+    Two mappings, each given a random output per training touch:
+      touch2boids: (separation, alignment, cohesion)
+      touch2physarum: (sense_angle, sense_dist, move_dist)
+    Both always train on the same touches, so they share one IMLRegressor
+    whose six outputs are the two mappings side by side.
+
+    Predictions are memoized per input quantized to IML_CACHE_QUANTUM (LRU,
+    cleared whenever the training set or interpolation changes), so a held or
+    slow touch costs no inference. Outputs then follow the cached targets
+    through an exponential smoother: a mapping's ``lag`` is the fraction of
+    the remaining distance kept per frame at TARGET_FPS, scaled to the real
+    frame time. Once settled on the target, apply() stops re-sending
+    unchanged parameters.
+    """
+
+    LAGS = {"touch2boids": 0.4, "touch2physarum": 0.5}
+
+    def __init__(self, capacity: int = IML_MAX_PAIRS, seed: int | None = None):
+        self._model = IMLRegressor(
+            4, 3 * len(self.LAGS), capacity=capacity, rng=np.random.default_rng(seed)
+        )
+        self._lags = np.repeat(list(self.LAGS.values()), 3)
+        self._targets_for = functools.lru_cache(maxsize=IML_CACHE_SIZE)(
+            self._model_predict
+        )
+        self._cache_version: int | None = None
+        self._output: np.ndarray | None = None
+        self._pushed: np.ndarray | None = None
+        self._last_predict: float | None = None
+        self._input: list[float] | None = None
         self._last_add_time: float = 0.0
         self._last_touch_vec: list[float] | None = None
-        self._n_pairs: int = 0
         self._interpolation: str = "Ripple"
-
-        try:
-            # VERIFY: Tolvera IML API — exact syntax may differ
-            # touch2boids: 4D input (x, y, velocity, dwell) → 3D output (separation, alignment, cohesion)
-            self.tv.iml.map("touch2boids", size=(4, 3), randomise=True, lag=0.4)
-            # touch2physarum: 4D input → 3D output (sense_angle, sense_dist, move_dist)
-            self.tv.iml.map("touch2physarum", size=(4, 3), randomise=True, lag=0.5)
-            logger.info("IML mappings created: touch2boids, touch2physarum")
-        except Exception as e:
-            logger.warning(f"IML setup failed (expected if Tolvera API differs): {e}")
+        logger.info("IML mappings created: %s", ", ".join(self.LAGS))
 
     def update(self, touch_vec: list[float]):
+        self._input = touch_vec
+
         # Check interval
         if time.monotonic() - self._last_add_time < IML_INTERVAL:
             return
 
         # Check delta
         if self._last_touch_vec is not None:
-            if _l2_distance(touch_vec, self._last_touch_vec) < IML_DELTA_THRESHOLD:
+            if math.dist(touch_vec, self._last_touch_vec) < IML_DELTA_THRESHOLD:
                 return
 
-        try:
-            # VERIFY: exact Tolvera IML API for adding training pairs
-            self.tv.iml.add("touch2boids", input=touch_vec)
-            self.tv.iml.add("touch2physarum", input=touch_vec)
-            self._n_pairs += 1
-            self._last_add_time = time.monotonic()
-            self._last_touch_vec = touch_vec[:]
-
-            # Sliding window: remove oldest pairs when exceeding max
-            if self._n_pairs > IML_MAX_PAIRS:
-                self.tv.iml.remove_oldest("touch2boids", count=5)  # VERIFY
-                self.tv.iml.remove_oldest("touch2physarum", count=5)  # VERIFY
-                self._n_pairs -= 5
-
-            # Switch interpolation strategy at 20 pairs
-            if self._n_pairs >= 20 and self._interpolation == "Ripple":
-                self._interpolation = "Softmax"
-                self.tv.iml.set_interpolation("touch2boids", "Softmax")  # VERIFY
-                self.tv.iml.set_interpolation("touch2physarum", "Softmax")  # VERIFY
-                logger.info(
-                    "IML interpolation switched to Softmax at %d pairs", self._n_pairs
-                )
-
-        except Exception as e:
-            logger.debug(f"IML update failed: {e}")
+        # Adding beyond capacity evicts the oldest pair
+        self._model.add(touch_vec)
+        self._last_add_time = time.monotonic()
+        self._last_touch_vec = touch_vec[:]
+
+        # Switch interpolation strategy at 20 pairs
+        n_pairs = self.get_n_pairs()
+        if n_pairs >= 20 and self._interpolation == "Ripple":
+            self.set_interpolation("Softmax")
+            logger.info("IML interpolation switched to Softmax at %d pairs", n_pairs)
+
+    def targets(self) -> np.ndarray | None:
+        """Cached (unsmoothed) six outputs for the latest touch, or None if untrained."""
+        if self._input is None or self.get_n_pairs() == 0:
+            return None
+        if self._model.version != self._cache_version:
+            self._targets_for.cache_clear()
+            self._cache_version = self._model.version
+        return self._targets_for(
+            tuple(round(v / IML_CACHE_QUANTUM) for v in self._input)
+        )
+
+    def cache_info(self):
+        return self._targets_for.cache_info()
+
+    def predict(self, dt: float | None = None) -> dict[str, np.ndarray] | None:
+        """Advance the smoothed outputs by ``dt`` seconds (default: since the last call)."""
+        target = self.targets()
+        if target is None:
+            return None
+        now = time.monotonic()
+        if dt is None:
+            last = self._last_predict
+            dt = 1.0 / TARGET_FPS if last is None else min(now - last, 0.25)
+        self._last_predict = now
+
+        prev = self._output
+        self._output = target
+        if prev is not None and prev is not target:
+            delta = self._lags ** (dt * TARGET_FPS) * (prev - target)
+            if np.abs(delta).max() >= IML_SETTLE:
+                self._output = target + delta
+        return self._split(self._output)
 
     def apply(self, tolvera_engine):
-        try:
-            # VERIFY: how to read IML output
-            boids_out = self.tv.iml.get(
-                "touch2boids"
-            )  # VERIFY: returns [separation, alignment, cohesion]?
-            if boids_out is not None:
-                tolvera_engine.set_boids_params(*boids_out[:3])
-
-            physarum_out = self.tv.iml.get("touch2physarum")  # VERIFY
-            if physarum_out is not None:
-                tolvera_engine.set_physarum_params(*physarum_out[:3])
-        except Exception as e:
-            logger.debug(f"IML apply failed: {e}")
+        outputs = self.predict()
+        if outputs is None:
+            return
+        # A settled output is the cached target array itself: skip re-sending it
+        if self._output is self._pushed:
+            return
+        self._pushed = self._output
+        tolvera_engine.set_boids_params(*outputs["touch2boids"].tolist())
+        tolvera_engine.set_physarum_params(*outputs["touch2physarum"].tolist())
+
+    def set_interpolation(self, name: str) -> None:
+        """One of "Ripple", "Softmax" or "RBF", for both mappings."""
+        self._model.interpolation = name
+        self._interpolation = name
+        self._targets_for.cache_clear()
 
     def get_n_pairs(self) -> int:
-        return self._n_pairs
+        return len(self._model)
 
     def clear(self):
-        try:
-            self.tv.iml.clear("touch2boids")  # VERIFY
-            self.tv.iml.clear("touch2physarum")  # VERIFY
-        except Exception:
-            pass
-        self._n_pairs = 0
+        self._model.clear()
+        self._output = None
+        self._pushed = None
+        self._last_predict = None
+        self._input = None
         self._last_touch_vec = None
-        self._interpolation = "Ripple"
+        self.set_interpolation("Ripple")
         logger.info("IML cleared")
+
+    def _model_predict(self, key: tuple) -> np.ndarray:
+        return self._model.predict(np.array(key, dtype=np.float64) * IML_CACHE_QUANTUM)
+
+    def _split(self, output: np.ndarray) -> dict[str, np.ndarray]:
+        return {name: output[3 * i : 3 * i + 3] for i, name in enumerate(self.LAGS)}
@@ -0,0 +1,180 @@
+import numpy as np
+
+from src.config import IML_MAX_PAIRS, IML_RBF_REGULARIZATION, IML_RIPPLE_DEPTH
+
+INTERPOLATIONS = ("Ripple", "Softmax", "RBF")
+
+
+class IMLRegressor:
+    """Interactive-ML mapping from ``n_in``-D inputs to ``n_out``-D outputs in [0, 1].
+
+    Training pairs live packed in the first ``n`` rows of fixed arrays of
+    ``capacity`` rows. Adding a pair when full evicts the oldest one; removal
+    moves the last pair into the hole. The pairwise input-distance matrix is
+    cached and updated one row and column at a time on add and evict, along
+    with each pair's nearest neighbour. They give the bandwidth ``scale`` (mean
+    nearest-neighbour distance) that makes every interpolation independent of
+    how tightly the pairs cluster, and the kernel matrix for RBF.
+
+    Interpolations, each one vectorized expression over all pairs:
+
+    - ``Ripple``: inverse-square-distance weights modulated by a cosine of the
+      distance, so influence rises and falls in rings around each pair.
+    - ``Softmax``: softmax of negative scaled distances.
+    - ``RBF``: Gaussian radial-basis interpolation. Its weights are re-solved
+      lazily on the first prediction after the training set changes.
+    """
+
+    def __init__(
+        self,
+        n_in: int,
+        n_out: int,
+        capacity: int = IML_MAX_PAIRS,
+        interpolation: str = "Ripple",
+        rng: np.random.Generator | None = None,
+    ) -> None:
+        self.n_in = n_in
+        self.n_out = n_out
+        self.capacity = capacity
+        self.interpolation = interpolation
+        self._rng = rng if rng is not None else np.random.default_rng()
+        self._inputs = np.zeros((capacity, n_in), dtype=np.float64)
+        self._outputs = np.zeros((capacity, n_out), dtype=np.float64)
+        self._age = np.zeros(capacity, dtype=np.int64)
+        self._dist = np.zeros((capacity, capacity), dtype=np.float64)
+        self._nn_dist = np.zeros(capacity, dtype=np.float64)
+        self._nn_idx = np.zeros(capacity, dtype=np.int64)
+        self._version = 0
+        self.clear()
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def interpolation(self) -> str:
+        return self._interpolation
+
+    @interpolation.setter
+    def interpolation(self, name: str) -> None:
+        if name not in INTERPOLATIONS:
+            raise ValueError(f"unknown interpolation {name!r}")
+        self._interpolation = name
+
+    @property
+    def version(self) -> int:
+        """Incremented whenever the training set changes."""
+        return self._version
+
+    @property
+    def scale(self) -> float:
+        """Mean nearest-neighbour distance between training inputs."""
+        n = self._n
+        if n < 2:
+            return 1.0
+        return max(float(self._nn_dist[:n].mean()), 1e-6)
+
+    def add(self, x, y=None) -> None:
+        """Add a training pair. Without ``y`` the output is random, as with
+        Tolvera's ``randomise=True`` maps."""
+        if self._n == self.capacity:
+            self.remove_oldest()
+        n = self._n
+        x = np.asarray(x, dtype=np.float64)
+        self._inputs[n] = x
+        self._outputs[n] = self._rng.random(self.n_out) if y is None else y
+        self._age[n] = self._added
+        row = np.sqrt(((self._inputs[:n] - x) ** 2).sum(axis=1))
+        self._dist[n, :n] = row
+        self._dist[:n, n] = row
+        self._dist[n, n] = 0.0
+        self._nn_dist[n] = np.inf
+        if n:
+            nearest = int(np.argmin(row))
+            self._nn_dist[n] = row[nearest]
+            self._nn_idx[n] = nearest
+            closer = row < self._nn_dist[:n]
+            self._nn_dist[:n][closer] = row[closer]
+            self._nn_idx[:n][closer] = n
+        self._n = n + 1
+        self._added += 1
+        self._changed()
+
+    def remove_oldest(self, count: int = 1) -> None:
+        for _ in range(min(count, self._n)):
+            self._remove(int(np.argmin(self._age[: self._n])))
+
+    def predict(self, x) -> np.ndarray | None:
+        """Output for one input (n_in,) or a batch (m, n_in). None if untrained."""
+        n = self._n
+        if n == 0:
+            return None
+        x = np.asarray(x, dtype=np.float64)
+        scale = self._scale if self._scale is not None else self._cache_scale()
+        diff = self._inputs[:n] - x[..., None, :]
+        r = np.sqrt((diff * diff).sum(axis=-1)) / scale  # (..., n)
+        outputs = self._outputs[:n]
+
+        if self._interpolation == "RBF":
+            alpha, mean = self._rbf_weights()
+            out = np.exp(-0.5 * r * r) @ alpha + mean
+        else:
+            if self._interpolation == "Softmax":
+                w = np.exp(r.min(axis=-1, keepdims=True) - r)
+            else:  # Ripple
+                w = (1.0 + IML_RIPPLE_DEPTH * np.cos(2.0 * np.pi * r)) / (r * r + 1e-9)
+            out = (w @ outputs) / w.sum(axis=-1, keepdims=True)
+        return np.clip(out, 0.0, 1.0)
+
+    def clear(self) -> None:
+        self._n = 0
+        self._added = 0  # monotonic insertion counter, ages the pairs
+        self._changed()
+
+    def _remove(self, i: int) -> None:
+        last = self._n - 1
+        nn_idx = self._nn_idx
+        orphans = np.flatnonzero(nn_idx[:last] == i)
+        if i != last:
+            self._inputs[i] = self._inputs[last]
+            self._outputs[i] = self._outputs[last]
+            self._age[i] = self._age[last]
+            self._dist[i, :last] = self._dist[last, :last]
+            self._dist[:last, i] = self._dist[:last, last]
+            self._dist[i, i] = 0.0
+            self._nn_dist[i] = self._nn_dist[last]
+            nn_idx[i] = nn_idx[last]
+            nn_idx[:last][nn_idx[:last] == last] = i
+            orphans = orphans[orphans != i]
+            if nn_idx[i] == i:  # the moved pair's neighbour was the removed one
+                orphans = np.append(orphans, i)
+        self._n = last
+        # Pairs whose nearest neighbour was removed rescan their row
+        if last == 1:
+            self._nn_dist[0] = np.inf
+        else:
+            for j in orphans:
+                row = self._dist[j, :last].copy()
+                row[j] = np.inf
+                nn_idx[j] = int(np.argmin(row))
+                self._nn_dist[j] = row[nn_idx[j]]
+        self._changed()
+
+    def _changed(self) -> None:
+        self._version += 1
+        self._scale = None
+        self._rbf = None
+
+    def _cache_scale(self) -> float:
+        self._scale = self.scale
+        return self._scale
+
+    def _rbf_weights(self) -> tuple[np.ndarray, np.ndarray]:
+        if self._rbf is None:
+            n = self._n
+            r = self._dist[:n, :n] / self._cache_scale()
+            kernel = np.exp(-0.5 * r * r)
+            kernel[np.diag_indices(n)] += IML_RBF_REGULARIZATION
+            mean = self._outputs[:n].mean(axis=0)
+            alpha = np.linalg.solve(kernel, self._outputs[:n] - mean)
+            self._rbf = (alpha, mean)
+        return self._rbf
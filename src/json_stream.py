@@ -0,0 +1,166 @@
+import json
+import re
+import time
+
+from src.prompts import RESPONSE_SCHEMA
+
+# Characters that can change the scanner state
+_SPECIAL = re.compile(r'[{}"\\]')
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "number": (int, float),
+    "integer": int,
+    "boolean": bool,
+}
+
+
+def validate_schema(value, schema: dict, path: str = "$") -> str | None:
+    """Check ``value`` against the JSON-schema subset used in prompts.RESPONSE_SCHEMA.
+
+    Supports type, properties, required, items, maxItems, minimum and maximum.
+    Returns None when valid, otherwise a short rejection reason.
+    """
+    expected = schema.get("type")
+    if expected is not None:
+        if isinstance(value, bool) and expected in ("number", "integer"):
+            return f"type:{path}"
+        if not isinstance(value, _TYPES[expected]):
+            return f"type:{path}"
+
+    if isinstance(value, dict):
+        for key in schema.get("required", ()):
+            if key not in value:
+                return f"missing:{path}.{key}"
+        for key, sub in schema.get("properties", {}).items():
+            if key in value:
+                reason = validate_schema(value[key], sub, f"{path}.{key}")
+                if reason:
+                    return reason
+    elif isinstance(value, list):
+        if "maxItems" in schema and len(value) > schema["maxItems"]:
+            return f"max_items:{path}"
+        item_schema = schema.get("items")
+        if item_schema:
+            for i, item in enumerate(value):
+                reason = validate_schema(item, item_schema, f"{path}[{i}]")
+                if reason:
+                    return reason
+    elif isinstance(value, (int, float)):
+        if "minimum" in schema and value < schema["minimum"]:
+            return f"range:{path}"
+        if "maximum" in schema and value > schema["maximum"]:
+            return f"range:{path}"
+    return None
+
+
+class StreamingJSONParser:
+    """Finds the first complete, schema-valid JSON object in text that arrives in pieces.
+
+    ``feed()`` resumes scanning where the previous fragment stopped, tracking
+    brace depth and string/escape state, so each character is examined once.
+    As soon as a top-level object closes it is decoded and validated; the
+    first valid one is returned and later text in the turn is ignored. Invalid
+    candidates are counted by rejection reason and scanning continues.
+    """
+
+    def __init__(self, schema: dict = RESPONSE_SCHEMA) -> None:
+        self.schema = schema
+        # Cumulative statistics across turns
+        self.accepted = 0
+        self.rejections: dict[str, int] = {}
+        self.total_fragments = 0
+        self.total_parse_time = 0.0
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a new turn."""
+        self._buf = ""
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.result: dict | None = None
+        self.fragments = 0
+        self.parse_time = 0.0
+        self.turn_rejections: list[str] = []
+
+    def feed(self, text: str) -> dict | None:
+        """Add a text fragment. Returns the action the moment it completes, else None."""
+        self.fragments += 1
+        self.total_fragments += 1
+        if self.result is not None:
+            return None
+        t0 = time.perf_counter()
+        self._buf += text
+        result = self._scan()
+        elapsed = time.perf_counter() - t0
+        self.parse_time += elapsed
+        self.total_parse_time += elapsed
+        return result
+
+    def _scan(self) -> dict | None:
+        buf = self._buf
+        pos = self._pos
+        while True:
+            if self._start < 0:
+                pos = buf.find("{", pos)
+                if pos < 0:
+                    self._pos = len(buf)
+                    return None
+                self._start = pos
+                self._depth = 0
+                self._in_string = False
+                self._escaped = False
+
+            if self._escaped:
+                # Escape fell on a fragment boundary: skip the escaped char
+                if pos >= len(buf):
+                    self._pos = pos
+                    return None
+                self._escaped = False
+                pos += 1
+
+            match = _SPECIAL.search(buf, pos)
+            if match is None:
+                self._pos = len(buf)
+                return None
+            ch = match.group()
+            pos = match.end()
+
+            if self._in_string:
+                if ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    candidate = buf[self._start : pos]
+                    self._start = -1
+                    result = self._accept(candidate)
+                    if result is not None:
+                        self._pos = pos
+                        return result
+
+    def _accept(self, candidate: str) -> dict | None:
+        try:
+            value = json.loads(candidate)
+        except json.JSONDecodeError:
+            reason = "json_error"
+        else:
+            reason = validate_schema(value, self.schema)
+            if reason is None:
+                self.result = value
+                self.accepted += 1
+                return value
+        self.turn_rejections.append(reason)
+        self.rejections[reason] = self.rejections.get(reason, 0) + 1
+        return None
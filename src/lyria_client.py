@@ -1,75 +1,189 @@
 import asyncio
 import logging
-import queue
 import time
 
-import numpy as np
-
 from src.config import (
+    AUDIO_RING_FRAMES,
+    AUDIO_SAMPLE_RATE,
     GOOGLE_API_KEY,
     LYRIA_MODEL,
     DEFAULT_DENSITY,
     DEFAULT_BRIGHTNESS,
     DEFAULT_TEMPERATURE,
     DEFAULT_GUIDANCE,
+    LYRIA_HISTORY_SECONDS,
+    LYRIA_PARAM_EPSILON,
+    LYRIA_CROSSFADE_MS,
+    LYRIA_PREBUFFER_MS,
+    LYRIA_ROTATION_MODE,
     LYRIA_SESSION_TIMEOUT,
-    AUDIO_CHANNELS,
+    LYRIA_STANDBY_TIMEOUT,
 )
+from src.audio_ring import AudioHistory, AudioRingBuffer
 from src.shared_state import SharedState
 
 logger = logging.getLogger(__name__)
 
 
+class ConfigCoalescer:
+    """Merges staged Lyria updates and decides which writes are actually needed.
+
+    Callers stage parameter and prompt changes freely; at flush time the
+    client asks for the config / prompts to send. A config write is suppressed
+    when every value is within ``epsilon`` (floats) or equal (flags) to what was
+    last sent, and a prompt write when the list is identical to the last one.
+    """
+
+    def __init__(
+        self, config: dict, prompts: list[dict], epsilon: float = LYRIA_PARAM_EPSILON
+    ) -> None:
+        self.epsilon = epsilon
+        self.config = dict(config)
+        self.prompts = list(prompts)
+        self._sent_config: dict | None = None
+        self._sent_prompts: list[dict] | None = None
+        self._config_dirty = False
+        self._prompts_dirty = False
+
+        self.config_sent = 0
+        self.config_suppressed = 0
+        self.prompts_sent = 0
+        self.prompts_suppressed = 0
+
+    def stage(self, **params) -> None:
+        for key, value in params.items():
+            if value is not None:
+                self.config[key] = value
+        self._config_dirty = True
+
+    def stage_prompts(self, prompts: list[dict]) -> None:
+        self.prompts = list(prompts)
+        self._prompts_dirty = True
+
+    def invalidate(self) -> None:
+        """Forget what was sent (new session): the next flush sends everything."""
+        self._sent_config = None
+        self._sent_prompts = None
+
+    def config_to_send(self) -> dict | None:
+        """Config to write now, or None if nothing meaningful changed.
+
+        A returned config must be followed by mark_config_sent() or, if the
+        write fails, mark_config_unsent() so the next flush retries it.
+        """
+        if self._sent_config is None:
+            self._config_dirty = False
+            return dict(self.config)
+        if not self._config_dirty:
+            return None
+        self._config_dirty = False
+        if self._config_changed():
+            return dict(self.config)
+        self.config_suppressed += 1
+        return None
+
+    def prompts_to_send(self) -> list[dict] | None:
+        if self._sent_prompts is None:
+            self._prompts_dirty = False
+            return list(self.prompts)
+        if not self._prompts_dirty:
+            return None
+        self._prompts_dirty = False
+        if self.prompts != self._sent_prompts:
+            return list(self.prompts)
+        self.prompts_suppressed += 1
+        return None
+
+    def mark_config_sent(self, config: dict) -> None:
+        # Leaves the dirty flag alone: changes staged during the write still count
+        self._sent_config = config
+        self.config_sent += 1
+
+    def mark_prompts_sent(self, prompts: list[dict]) -> None:
+        self._sent_prompts = prompts
+        self.prompts_sent += 1
+
+    def mark_config_unsent(self) -> None:
+        """The write failed: keep the staged config pending for the next flush."""
+        self._config_dirty = True
+
+    def mark_prompts_unsent(self) -> None:
+        self._prompts_dirty = True
+
+    def _config_changed(self) -> bool:
+        for key, value in self.config.items():
+            sent = self._sent_config.get(key)
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                if value != sent:
+                    return True
+            elif sent is None or abs(value - sent) > self.epsilon:
+                return True
+        return False
+
+    def stats(self) -> dict:
+        return {
+            "config_sent": self.config_sent,
+            "config_suppressed": self.config_suppressed,
+            "prompts_sent": self.prompts_sent,
+            "prompts_suppressed": self.prompts_suppressed,
+        }
+
+
 class LyriaClient:
     """Manages a persistent Lyria RealTime music generation session."""
 
-    def __init__(self, shared_state: SharedState):
-        import google.genai as genai
-        from google.genai import types
+    def __init__(self, shared_state: SharedState, client=None, types=None):
+        """``client`` / ``types`` replace google.genai (e.g. mock_services)."""
+        if client is None:
+            import google.genai as genai
+
+            client = genai.Client(
+                api_key=GOOGLE_API_KEY,
+                http_options={"api_version": "v1alpha"},
+            )
+        if types is None:
+            from google.genai import types
 
         self._types = types
-        self.client = genai.Client(
-            api_key=GOOGLE_API_KEY,
-            http_options={"api_version": "v1alpha"},
-        )
+        self.client = client
         self.session = None
         self.connected = False
         self.session_start_time = None
         self.shared_state = shared_state
         self._latest_audio_chunk: bytes = b""
+        self._history = AudioHistory(LYRIA_HISTORY_SECONDS)
+        self._receive_task: asyncio.Future | None = None
+        self._rotating = False
+        self._refreshing = False
+        self.rotation_stats = {
+            "rotations": 0,
+            "failures": 0,
+            "last_handshake_ms": 0.0,
+            "last_ready_ms": 0.0,
+            "last_gap_ms": 0.0,
+        }
 
-        # Track current config — must send ALL fields every time
-        self._density = DEFAULT_DENSITY
-        self._brightness = DEFAULT_BRIGHTNESS
-        self._temperature = DEFAULT_TEMPERATURE
-        self._guidance = DEFAULT_GUIDANCE
-        self._mute_drums = True
-        self._mute_bass = True
-
-        # Track current prompts for reconnect
-        self._current_prompts = [{"text": "Ethereal Ambience", "weight": 1.0}]
+        # Current config and prompts — Lyria needs ALL config fields on every write,
+        # and the prompts again after a reconnect
+        self._state = ConfigCoalescer(
+            config={
+                "density": DEFAULT_DENSITY,
+                "brightness": DEFAULT_BRIGHTNESS,
+                "temperature": DEFAULT_TEMPERATURE,
+                "guidance": DEFAULT_GUIDANCE,
+                "mute_drums": True,
+                "mute_bass": True,
+            },
+            prompts=[{"text": "Ethereal Ambience", "weight": 1.0}],
+        )
 
     async def connect(self):
-        """Establish Lyria session and start playback."""
+        """Establish Lyria session, start playback and the receive task."""
         try:
-            self.session = await self.client.aio.live.music.connect(
-                model=LYRIA_MODEL
-            ).__aenter__()
-            await self.session.set_weighted_prompts(
-                prompts=[
-                    self._types.WeightedPrompt(text=p["text"], weight=p["weight"])
-                    for p in self._current_prompts
-                ]
+            self.session = await self._open_session()
+            self._receive_task = asyncio.ensure_future(
+                self._receive_audio(self.session, self.shared_state.audio_ring)
             )
-            await self.session.set_music_generation_config(
-                density=self._density,
-                brightness=self._brightness,
-                temperature=self._temperature,
-                guidance=self._guidance,
-                mute_drums=self._mute_drums,
-                mute_bass=self._mute_bass,
-            )
-            await self.session.play()
             self.session_start_time = time.monotonic()
             self.connected = True
             self.shared_state.lyria_connected = True
@@ -80,43 +194,62 @@ class LyriaClient:
             self.shared_state.lyria_connected = False
             raise
 
-    async def receive_audio(self):
-        """Background task — receive PCM chunks from Lyria and enqueue them."""
+    async def restart(self):
+        """Tear down any current session and connect a new one. Raises on failure."""
+        if self.session is not None:
+            await self.close()
+        await self.connect()
+
+    def is_healthy(self) -> bool:
+        """True while connected with a live receive task, or mid-refresh."""
+        if self._refreshing:
+            return True
+        task = self._receive_task
+        return self.connected and task is not None and not task.done()
+
+    async def _open_session(self):
+        """Open a session primed with the current prompts and config, and play."""
+        session = await self.client.aio.live.music.connect(
+            model=LYRIA_MODEL
+        ).__aenter__()
+        try:
+            self._state.invalidate()
+            await self._send_prompts(self._state.prompts_to_send(), session)
+            await self._send_config(self._state.config_to_send(), session)
+            await session.play()
+        except BaseException:
+            # Nothing else holds this session yet: exit it before giving up
+            await _close_session(session)
+            raise
+        return session
+
+    async def _receive_audio(self, session, ring: AudioRingBuffer):
+        """Receive PCM chunks from ``session`` into ``ring``.
+
+        Only the current session feeds the history and connection state, so a
+        standby or retiring session can run alongside it during rotation.
+        """
         try:
-            async for message in self.session.receive():
+            async for message in session.receive():
                 try:
                     chunks = message.server_content.audio_chunks
                     if chunks:
                         for chunk in chunks:
                             raw = chunk.data if hasattr(chunk, "data") else chunk
-                            self._latest_audio_chunk = raw
-                            # Convert raw PCM int16 bytes to float32 interleaved array
-                            pcm = (
-                                np.frombuffer(raw, dtype=np.int16).astype(np.float32)
-                                / 32768.0
-                            )
-                            # Reshape to (frames, channels); pad if needed
-                            total_samples = pcm.shape[0]
-                            frames = total_samples // AUDIO_CHANNELS
-                            pcm = pcm[: frames * AUDIO_CHANNELS].reshape(
-                                frames, AUDIO_CHANNELS
-                            )
-                            try:
-                                self.shared_state.audio_queue.put_nowait(pcm)
-                            except queue.Full:
-                                try:
-                                    self.shared_state.audio_queue.get_nowait()
-                                except queue.Empty:
-                                    pass
-                                self.shared_state.audio_queue.put_nowait(pcm)
+                            # Convert int16 PCM straight into the output ring
+                            ring.write_pcm16(raw)
+                            if session is self.session:
+                                self._latest_audio_chunk = raw
+                                self._history.write_pcm16(raw)
                 except Exception as e:
                     logger.warning("Error processing audio message: %s", e)
         except Exception as e:
             logger.error("receive_audio loop terminated: %s", e)
-            self.connected = False
-            self.shared_state.lyria_connected = False
+            if session is self.session:
+                self.connected = False
+                self.shared_state.lyria_connected = False
 
-    async def set_params(
+    def stage_params(
         self,
         density=None,
         brightness=None,
@@ -124,85 +257,243 @@ class LyriaClient:
         mute_bass=None,
         temperature=None,
         guidance=None,
-    ):
-        """Update music generation config. Always sends all params to avoid API resets."""
-        if density is not None:
-            self._density = density
-        if brightness is not None:
-            self._brightness = brightness
-        if temperature is not None:
-            self._temperature = temperature
-        if guidance is not None:
-            self._guidance = guidance
-        if mute_drums is not None:
-            self._mute_drums = mute_drums
-        if mute_bass is not None:
-            self._mute_bass = mute_bass
+    ) -> None:
+        """Record config changes without sending; the next flush() writes them once."""
+        self._state.stage(
+            density=density,
+            brightness=brightness,
+            mute_drums=mute_drums,
+            mute_bass=mute_bass,
+            temperature=temperature,
+            guidance=guidance,
+        )
 
+    def stage_prompts(self, prompts: list[dict]) -> None:
+        """Record a prompt change without sending. Requires at least 1 prompt."""
+        if not prompts:
+            logger.warning("stage_prompts called with empty list — ignoring.")
+            return
+        self._state.stage_prompts(prompts)
+
+    async def flush(self) -> None:
+        """Send staged prompts and config, skipping writes that change nothing."""
+        if self.session is None or self._rotating:
+            # A rotation re-sends the full state to the new session when it lands
+            return
         try:
-            await self.session.set_music_generation_config(
-                density=self._density,
-                brightness=self._brightness,
-                temperature=self._temperature,
-                guidance=self._guidance,
-                mute_drums=self._mute_drums,
-                mute_bass=self._mute_bass,
-            )
+            await self._send_prompts(self._state.prompts_to_send())
+        except Exception as e:
+            logger.error("set_prompts failed: %s", e)
+        try:
+            await self._send_config(self._state.config_to_send())
         except Exception as e:
             logger.error("set_params failed: %s", e)
 
+    async def set_params(
+        self,
+        density=None,
+        brightness=None,
+        mute_drums=None,
+        mute_bass=None,
+        temperature=None,
+        guidance=None,
+    ):
+        """Update music generation config now. Always sends all params to avoid API resets."""
+        self.stage_params(
+            density=density,
+            brightness=brightness,
+            mute_drums=mute_drums,
+            mute_bass=mute_bass,
+            temperature=temperature,
+            guidance=guidance,
+        )
+        await self.flush()
+
     async def set_prompts(self, prompts: list[dict]):
-        """Update weighted prompts. Requires at least 1 prompt."""
-        if not prompts:
-            logger.warning("set_prompts called with empty list — ignoring.")
+        """Update weighted prompts now. Requires at least 1 prompt."""
+        self.stage_prompts(prompts)
+        await self.flush()
+
+    async def _send_config(self, config: dict | None, session=None) -> None:
+        if config is None:
             return
-        self._current_prompts = prompts
         try:
-            await self.session.set_weighted_prompts(
+            await (session or self.session).set_music_generation_config(**config)
+        except BaseException:
+            self._state.mark_config_unsent()
+            raise
+        self._state.mark_config_sent(config)
+
+    async def _send_prompts(self, prompts: list[dict] | None, session=None) -> None:
+        if prompts is None:
+            return
+        try:
+            await (session or self.session).set_weighted_prompts(
                 prompts=[
                     self._types.WeightedPrompt(text=p["text"], weight=p["weight"])
                     for p in prompts
                 ]
             )
-        except Exception as e:
-            logger.error("set_prompts failed: %s", e)
+        except BaseException:
+            self._state.mark_prompts_unsent()
+            raise
+        self._state.mark_prompts_sent(prompts)
+
+    def get_message_stats(self) -> dict:
+        """Counts of config / prompt writes sent and suppressed as redundant."""
+        return self._state.stats()
 
     async def reconnect_watchdog(self):
-        """Periodically checks session age and reconnects before timeout."""
+        """Periodically checks session age and refreshes it before timeout."""
         while True:
             await asyncio.sleep(30)
             if self.connected and self.session_start_time is not None:
                 elapsed = time.monotonic() - self.session_start_time
                 if elapsed > LYRIA_SESSION_TIMEOUT:
                     logger.info(
-                        "Session timeout approaching (%.0fs) — reconnecting.", elapsed
+                        "Session timeout approaching (%.0fs) — refreshing.", elapsed
                     )
-                    await self._reconnect()
+                    await self.refresh_session()
+
+    async def refresh_session(self):
+        """Replace the session using LYRIA_ROTATION_MODE ("rotate" or "restart")."""
+        self._refreshing = True
+        try:
+            if LYRIA_ROTATION_MODE == "rotate" and self.session is not None:
+                if await self.rotate():
+                    return
+            await self._reconnect()
+        finally:
+            self._refreshing = False
+
+    async def rotate(self) -> bool:
+        """Swap in a new session without a gap in the music.
+
+        The standby session is opened with the current prompts and config and
+        receives into its own ring. Once LYRIA_PREBUFFER_MS of audio is buffered
+        the ring is published to SharedState, where the audio callback
+        crossfades from the old ring; the old session is closed after the fade.
+        Playback gaps are measured as underrun time on both rings. Returns
+        False if the standby session could not be brought up.
+        """
+        if self._rotating:
+            return True
+        self._rotating = True
+        t0 = time.monotonic()
+        old_session, old_task = self.session, self._receive_task
+        old_ring = self.shared_state.audio_ring
+        old_underruns = old_ring.underrun_frames
+        ring = AudioRingBuffer(AUDIO_RING_FRAMES)
+        session = task = None
+        try:
+            session = await self._open_session()
+            handshake = time.monotonic() - t0
+            task = asyncio.ensure_future(self._receive_audio(session, ring))
+            prebuffer = int(LYRIA_PREBUFFER_MS * AUDIO_SAMPLE_RATE / 1000)
+            if not await _wait_for_audio(ring, prebuffer, LYRIA_STANDBY_TIMEOUT):
+                raise TimeoutError("standby session produced no audio")
+            ready = time.monotonic() - t0
+
+            # Switch: from here on the new session is current
+            self.session, self._receive_task = session, task
+            self.session_start_time = time.monotonic()
+            self.shared_state.audio_ring = ring
+            self.connected = True
+            self.shared_state.lyria_connected = True
+        except Exception as e:
+            logger.error("Lyria rotation failed, keeping current session: %s", e)
+            self.rotation_stats["failures"] += 1
+            self._state.invalidate()  # the old session may have missed updates
+            if task is not None:
+                task.cancel()
+            await _close_session(session)
+            return False
+        finally:
+            self._rotating = False
+
+        # Anything staged while the standby was opening goes to the new session
+        await self.flush()
+        await asyncio.sleep(LYRIA_CROSSFADE_MS / 1000.0 + 0.5)
+        if old_task is not None:
+            old_task.cancel()
+        await _close_session(old_session)
+
+        gap_frames = old_ring.underrun_frames - old_underruns + ring.underrun_frames
+        self._record_rotation(handshake, ready, gap_frames)
+        return True
 
     async def _reconnect(self):
         """Close and re-establish the session with the same params and prompts."""
+        ring = self.shared_state.audio_ring
+        underruns = ring.underrun_frames
+        t0 = time.monotonic()
         try:
             await self.close()
         except Exception as e:
             logger.warning("Error closing session during reconnect: %s", e)
         try:
             await self.connect()
+            handshake = time.monotonic() - t0
+            await _wait_for_audio(ring, 1, LYRIA_STANDBY_TIMEOUT)
+            ready = time.monotonic() - t0
             logger.info("Lyria reconnected successfully.")
         except Exception as e:
             logger.error("Reconnect failed: %s", e)
+            return
+        self._record_rotation(handshake, ready, ring.underrun_frames - underruns)
+
+    def _record_rotation(self, handshake: float, ready: float, gap_frames: int):
+        stats = self.rotation_stats
+        stats["rotations"] += 1
+        stats["last_handshake_ms"] = handshake * 1000.0
+        stats["last_ready_ms"] = ready * 1000.0
+        stats["last_gap_ms"] = gap_frames * 1000.0 / AUDIO_SAMPLE_RATE
+        logger.info(
+            "Lyria session replaced: handshake %.0f ms, audio after %.0f ms, "
+            "playback gap %.0f ms",
+            stats["last_handshake_ms"],
+            stats["last_ready_ms"],
+            stats["last_gap_ms"],
+        )
 
     def get_latest_audio_chunk(self) -> bytes:
         """Return the most recent raw PCM bytes received from Lyria."""
         return self._latest_audio_chunk
 
+    def get_audio_window(self, seconds: float) -> memoryview:
+        """Return the last ``seconds`` of played PCM as one zero-copy memoryview.
+
+        The view aliases the history buffer: consume it before the next await.
+        """
+        return self._history.window(seconds)
+
     async def close(self):
         """Gracefully close the Lyria session."""
         self.connected = False
         self.shared_state.lyria_connected = False
-        if self.session is not None:
-            try:
-                await self.session.__aexit__(None, None, None)
-            except Exception as e:
-                logger.warning("Error closing Lyria session: %s", e)
-            self.session = None
+        if self._receive_task is not None:
+            self._receive_task.cancel()
+            self._receive_task = None
+        session, self.session = self.session, None
+        await _close_session(session)
         logger.info("Lyria session closed.")
+
+
+async def _close_session(session) -> None:
+    if session is None:
+        return
+    try:
+        await session.__aexit__(None, None, None)
+    except Exception as e:
+        logger.warning("Error closing Lyria session: %s", e)
+
+
+async def _wait_for_audio(ring: AudioRingBuffer, frames: int, timeout: float) -> bool:
+    """Wait until ``ring`` has received ``frames`` frames since the call. False on timeout."""
+    target = ring.frames_written + frames
+    deadline = time.monotonic() + timeout
+    while ring.frames_written < target:
+        if time.monotonic() >= deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
@@ -6,52 +6,96 @@ import time
 
 import taichi as ti
 
-from src.config import SCREEN_W, SCREEN_H, GHOST_DURATION, GHOST_IMMINENT_DURATION
+from src.config import (
+    SCREEN_W,
+    SCREEN_H,
+    GHOST_DURATION,
+    GHOST_IMMINENT_DURATION,
+    PROFILE_HUD_INTERVAL,
+    PROFILE_LOG_INTERVAL,
+)
 from src.shared_state import SharedState
 from src.tolvera_engine import TolveraEngine
 from src.lyria_client import LyriaClient
 from src.gemini_client import GeminiClient
 from src.audio_bridge import AudioBridge
 from src.audio_analyzer import AudioAnalyzer
+from src.command_channel import LyriaCommandChannel
 from src.feedback_loop import FeedbackLoop
+from src.frame_capture import FrameEncoder
 from src.ghost_replay import GhostReplay
 from src.iml_manager import IMLManager
 from src.narrative_manager import SessionNarrativeManager
+from src.profiler import FrameProfiler
+from src.supervisor import ConnectionSupervisor
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(name)s] %(message)s")
 logger = logging.getLogger(__name__)
 
+# Render-loop stages timed by the frame profiler, in loop order
+LOOP_STAGES = (
+    "keyboard",
+    "mouse",
+    "metrics",
+    "capture",
+    "audio",
+    "ghost",
+    "render",
+    "hud",
+    "show",
+)
+
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Self-Evolution Interactive Art")
     parser.add_argument("--no-lyria", action="store_true", help="Run without Lyria")
     parser.add_argument("--no-gemini", action="store_true", help="Run without Gemini")
     parser.add_argument("--smoke-test", action="store_true", help="Run 10s then exit")
+    parser.add_argument(
+        "--profile", action="store_true", help="Log per-stage frame times periodically"
+    )
+    parser.add_argument(
+        "--profile-hud", action="store_true", help="Show frame times on screen"
+    )
+    parser.add_argument(
+        "--mock",
+        action="store_true",
+        help="Use offline mock Lyria/Gemini services instead of the Google API",
+    )
+    parser.add_argument(
+        "--mock-seed", type=int, default=0, help="Seed for --mock timing and responses"
+    )
     return parser.parse_args()
 
 
 async def _start_async_subsystems(
-    loop, shared, lyria, gemini, feedback, narrative, args
+    loop, shared, lyria, gemini, feedback, narrative, lyria_commands, args
 ):
-    """Initialize and start all async subsystems."""
+    """Initialize and start all async subsystems.
+
+    Lyria and Gemini connect through the supervisor, which also reconnects
+    them with backoff whenever they drop or fail to start.
+    """
+    supervisor = ConnectionSupervisor(shared)
     if not args.no_lyria:
-        try:
-            await lyria.connect()
-            asyncio.ensure_future(lyria.receive_audio())
-            asyncio.ensure_future(lyria.reconnect_watchdog())
-            logger.info("Lyria subsystem started")
-        except Exception as e:
-            logger.error(f"Lyria failed to start: {e}")
+        asyncio.ensure_future(lyria_commands.run())
+        supervisor.register("lyria", lyria.restart, lyria.is_healthy)
+        asyncio.ensure_future(lyria.reconnect_watchdog())
 
     asyncio.ensure_future(feedback.run())
     asyncio.ensure_future(feedback.run_narrative_updater())
 
     if not args.no_gemini:
-        try:
-            await feedback.start_gemini()
-            logger.info("Gemini subsystem started")
-        except Exception as e:
-            logger.error(f"Gemini failed to start: {e}")
+        supervisor.register("gemini", feedback.start_gemini, feedback.gemini_healthy)
+
+    asyncio.ensure_future(supervisor.run())
+
+
+def _draw_profile_hud(window, text: str) -> None:
+    # VERIFY: GGUI overlay API — ti.ui.Window.get_gui() sub_window / text
+    gui = window.get_gui()
+    with gui.sub_window("Profile", 0.01, 0.01, 0.5, 0.06) as w:
+        w.text(text)
 
 
 def main():
@@ -63,7 +107,7 @@ def main():
     # 2. Initialize Tolvera (MUST be on main thread for macOS GGUI)
     engine = TolveraEngine()
     ghost = GhostReplay()
-    iml = IMLManager(engine)
+    iml = IMLManager()
     analyzer = AudioAnalyzer()
     narrative = SessionNarrativeManager()
 
@@ -78,9 +122,17 @@ def main():
     async_thread.start()
 
     # 4. Create async clients
-    lyria = LyriaClient(shared)
-    gemini = GeminiClient(shared)
+    client = types = None
+    if args.mock:
+        from src.mock_services import MockGenaiClient, MockProfile, mock_types
+
+        client = MockGenaiClient(MockProfile(seed=args.mock_seed))
+        types = mock_types
+        logger.info("Using mock Lyria/Gemini services (seed %d)", args.mock_seed)
+    lyria = LyriaClient(shared, client=client, types=types)
+    gemini = GeminiClient(shared, client=client, types=types)
     feedback = FeedbackLoop(shared, lyria, gemini, narrative)
+    lyria_commands = LyriaCommandChannel(loop, lyria)
 
     # 5. Start audio bridge
     audio_bridge = None
@@ -91,19 +143,30 @@ def main():
         except Exception as e:
             logger.warning(f"AudioBridge failed to start: {e}")
 
+    frame_encoder = FrameEncoder(shared)
+    frame_encoder.start()
+
     # 6. Schedule async subsystem initialization
     asyncio.run_coroutine_threadsafe(
-        _start_async_subsystems(loop, shared, lyria, gemini, feedback, narrative, args),
+        _start_async_subsystems(
+            loop, shared, lyria, gemini, feedback, narrative, lyria_commands, args
+        ),
         loop,
     )
 
     # 7. Main thread: GGUI render loop
     window = engine.get_window()
     start_time = time.monotonic()
-    frame_skip_counter = 0
+    last_audio_chunk = b""
+    # Always on (~10 µs per frame, <0.1% of the budget); reporting is opt-in
+    profiler = FrameProfiler(LOOP_STAGES)
+    next_profile_log = start_time + PROFILE_LOG_INTERVAL
+    next_hud_update = start_time
+    hud_text = ""
 
     try:
         while window.running:
+            profiler.start_frame()
             # Smoke test: exit after 10 seconds
             if args.smoke_test and (time.monotonic() - start_time) > 10:
                 logger.info("Smoke test complete — exiting")
@@ -115,21 +178,20 @@ def main():
                     key = window.event.key
                     if key == "g":
                         ghost.trigger()
-                        asyncio.run_coroutine_threadsafe(
-                            lyria.set_params(mute_drums=False), loop
-                        )
+                        lyria_commands.post(mute_drums=False)
                         logger.info("Ghost Replay triggered (G key)")
                     elif key == "r":
                         ghost.reset()
                         engine.reset()
                         iml.clear()
                         narrative.reset()
-                        asyncio.run_coroutine_threadsafe(lyria._reconnect(), loop)
+                        asyncio.run_coroutine_threadsafe(lyria.refresh_session(), loop)
                         logger.info("Full reset (R key)")
                     elif key == ti.GUI.ESCAPE:
                         break
             except Exception:
-                pass  # GGUI event API may differ
+                profiler.error("keyboard")  # GGUI event API may differ
+            profiler.lap("keyboard")
 
             # Handle mouse
             try:
@@ -143,48 +205,53 @@ def main():
                     touch_vec = engine.get_touch_vec()
                     iml.update(touch_vec)
                     iml.apply(engine)
-                    narrative.record_touch(
-                        cx, cy, time.time(), engine.get_cursor_velocity()
-                    )
-                    shared.touch_events.put_nowait(
-                        (cx, cy, engine.get_cursor_velocity(), engine.get_dwell())
+                    shared.touch_bus.publish(
+                        cx,
+                        cy,
+                        time.time(),
+                        engine.get_cursor_velocity(),
+                        engine.get_dwell(),
                     )
             except Exception:
-                pass  # GGUI mouse API may differ
+                profiler.error("mouse")  # GGUI mouse API may differ
+            profiler.lap("mouse")
 
-            # Update visual metrics in shared state
-            shared.update_visual_metrics(
-                engine.get_boids_density(),
-                engine.get_physarum_connectivity(),
-                engine.get_agent_activity(),
-            )
+            # Update visual metrics in shared state (rate-limited inside the engine)
+            if engine.update_metrics():
+                shared.update_visual_metrics(*engine.get_visual_metrics())
+            profiler.lap("metrics")
 
-            # Capture frame for Gemini (every 4th frame to reduce overhead)
-            frame_skip_counter += 1
-            if frame_skip_counter >= 4:
-                frame_skip_counter = 0
+            # Capture frame for Gemini only when one was requested; encoding is off-thread
+            if shared.take_frame_request():
                 try:
-                    shared.latest_jpeg_frame = engine.capture_frame_jpeg()
+                    frame_encoder.submit(engine.capture_frame_pixels())
                 except Exception:
-                    pass
+                    profiler.error("capture")
+            profiler.lap("capture")
 
-            # Apply audio feedback from Lyria
+            # Apply audio feedback from Lyria (only when a new chunk arrived)
             try:
                 audio_chunk = lyria.get_latest_audio_chunk()
-                if audio_chunk:
+                if audio_chunk and audio_chunk is not last_audio_chunk:
+                    last_audio_chunk = audio_chunk
                     analyzer.feed(audio_chunk)
-                    features = analyzer.analyze()
-                    engine.apply_audio_feedback(features)
-                    shared.update_audio_features(
-                        features["rms"],
-                        features["spectral_centroid"],
-                        features["spectral_flux"],
-                    )
+                    if analyzer.update():
+                        features = analyzer.analyze()
+                        engine.apply_audio_feedback(features)
+                        shared.update_audio_features(
+                            features["rms"],
+                            features["spectral_centroid"],
+                            features["spectral_flux"],
+                        )
             except Exception:
-                pass
+                profiler.error("audio")
+            profiler.lap("audio")
 
             # Update ghost state — call tick() ONCE and store result
             ghost_state, ghost_value = ghost.tick()
+            segments = ghost.take_segments(force=ghost_state == "ACTIVE")
+            if segments is not None:
+                engine.stamp_ghost_paths(segments)
             # For narrative: pass remaining time (GHOST_DURATION - elapsed), not brightness
             ghost_elapsed = 0.0
             if ghost_state == "ACTIVE" and hasattr(ghost, "start_time"):
@@ -206,15 +273,33 @@ def main():
             if ghost_state == "ACTIVE" and ghost_value is not None:
                 engine.set_brightness_multiplier(ghost_value)
             elif ghost_state == "IMMINENT":
-                asyncio.run_coroutine_threadsafe(
-                    lyria.set_params(mute_drums=True), loop
-                )
+                lyria_commands.post(mute_drums=True)
             else:
                 engine.set_brightness_multiplier(1.0)
+            profiler.lap("ghost")
 
             # Render frame
             engine.render_frame()
+            profiler.lap("render")
+
+            if args.profile_hud:
+                now = time.monotonic()
+                if now >= next_hud_update:
+                    hud_text = profiler.status_line()
+                    next_hud_update = now + PROFILE_HUD_INTERVAL
+                try:
+                    _draw_profile_hud(window, hud_text)
+                except Exception:
+                    profiler.error("hud")
+            profiler.lap("hud")
+
             window.show()
+            profiler.lap("show")
+            profiler.end_frame()
+
+            if args.profile and time.monotonic() >= next_profile_log:
+                logger.info("Frame profile: %s", profiler.status_line())
+                next_profile_log += PROFILE_LOG_INTERVAL
 
     except KeyboardInterrupt:
         logger.info("Interrupted by user")
@@ -223,6 +308,7 @@ def main():
     logger.info("Shutting down...")
     if audio_bridge:
         audio_bridge.stop()
+    frame_encoder.stop()
     asyncio.run_coroutine_threadsafe(lyria.close(), loop)
     asyncio.run_coroutine_threadsafe(gemini.close(), loop)
     loop.call_soon_threadsafe(loop.stop)
@@ -0,0 +1,252 @@
+"""In-process stand-ins for the Lyria RealTime and Gemini Live APIs.
+
+``MockGenaiClient`` exposes the subset of ``google.genai.Client`` used by
+LyriaClient and GeminiClient (``aio.live.connect`` and
+``aio.live.music.connect``) and ``mock_types`` replaces ``google.genai.types``.
+Timing, chunking, fragmentation and failures are driven by a seeded
+``MockProfile`` so throughput and latency runs are reproducible offline.
+"""
+
+import asyncio
+import json
+import random
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.config import AUDIO_CHANNELS, AUDIO_SAMPLE_RATE
+
+
+@dataclass
+class MockProfile:
+    """Behaviour of the mock services. Times are in milliseconds."""
+
+    seed: int = 0
+    connect_latency_ms: float = 50.0
+    connect_failure_rate: float = 0.0
+
+    # Lyria
+    lyria_chunk_ms: float = 100.0
+    lyria_jitter_ms: float = 10.0  # max deviation of each chunk's arrival time
+    lyria_realtime: bool = (
+        True  # pace chunks at playback speed; False = as fast as possible
+    )
+    lyria_drop_after_s: float | None = None  # stream fails after this long
+
+    # Gemini
+    gemini_latency_ms: float = 800.0  # prompt → first fragment
+    gemini_jitter_ms: float = 200.0
+    gemini_fragments: int = 4  # messages per response turn
+    gemini_fragment_interval_ms: float = 30.0
+    gemini_invalid_rate: float = 0.0  # chance a turn starts with an invalid candidate
+    gemini_failure_rate: float = 0.0  # chance a send raises
+
+
+class _Record:
+    """Keyword-argument record standing in for a google.genai.types class."""
+
+    def __init__(self, **kwargs) -> None:
+        self.__dict__.update(kwargs)
+
+
+mock_types = SimpleNamespace(
+    WeightedPrompt=_Record,
+    LiveConnectConfig=_Record,
+    Blob=_Record,
+    Content=_Record,
+    Part=_Record,
+)
+
+
+class _MockSession:
+    closed = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+    async def __aexit__(self, *exc) -> None:
+        # The clients close sessions through the context-manager exit
+        await self.close()
+
+
+class MockLyriaSession(_MockSession):
+    """Music session that streams a stereo tone shaped by the current config."""
+
+    def __init__(self, profile: MockProfile, rng: random.Random) -> None:
+        self.profile = profile
+        self._rng = rng
+        self.prompts: list = []
+        self.config: dict = {}
+        self.playing = False
+        self.closed = False
+        self.chunks_sent = 0
+        self._phase = 0.0
+        n = int(profile.lyria_chunk_ms * AUDIO_SAMPLE_RATE / 1000)
+        self._t = np.arange(n, dtype=np.float64) / AUDIO_SAMPLE_RATE
+        self._chunk = np.empty((n, AUDIO_CHANNELS), dtype=np.int16)
+
+    async def set_weighted_prompts(self, prompts) -> None:
+        self.prompts = list(prompts)
+
+    async def set_music_generation_config(self, **config) -> None:
+        self.config = dict(config)
+
+    async def play(self) -> None:
+        self.playing = True
+
+    def _next_chunk(self) -> bytes:
+        freq = 110.0 + 330.0 * self.config.get("brightness", 0.3)
+        amp = 2000.0 + 8000.0 * self.config.get("density", 0.2)
+        omega = 2.0 * np.pi * freq
+        wave = amp * np.sin(self._phase + omega * self._t)
+        self._phase = (self._phase + omega * len(self._t) / AUDIO_SAMPLE_RATE) % (
+            2.0 * np.pi
+        )
+        self._chunk[:] = wave[:, None]
+        return self._chunk.tobytes()
+
+    async def receive(self):
+        profile = self.profile
+        loop = asyncio.get_running_loop()
+        chunk_s = profile.lyria_chunk_ms / 1000.0
+        while not self.playing and not self.closed:
+            await asyncio.sleep(0.01)
+        start = loop.time()
+        while not self.closed:
+            if profile.lyria_realtime:
+                jitter = self._rng.uniform(-1.0, 1.0) * profile.lyria_jitter_ms / 1000
+                due = start + (self.chunks_sent + 1) * chunk_s + jitter
+                await asyncio.sleep(max(0.0, due - loop.time()))
+            else:
+                await asyncio.sleep(0)
+            if (
+                profile.lyria_drop_after_s is not None
+                and loop.time() - start >= profile.lyria_drop_after_s
+            ):
+                raise ConnectionError("mock Lyria stream dropped")
+            if self.closed:
+                return
+            self.chunks_sent += 1
+            chunk = SimpleNamespace(data=self._next_chunk())
+            yield SimpleNamespace(server_content=SimpleNamespace(audio_chunks=[chunk]))
+
+
+class MockGeminiSession(_MockSession):
+    """Live session that answers each JSON prompt with a fragmented action turn."""
+
+    PROMPTS = ["Ethereal Ambience", "Warm Drone", "Glassy Pads", "Slow Pulse"]
+
+    def __init__(self, profile: MockProfile, rng: random.Random) -> None:
+        self.profile = profile
+        self._rng = rng
+        self._pending: asyncio.Queue = asyncio.Queue()
+        self.closed = False
+        self.bytes_received: dict[str, int] = {}
+        self.turns_requested = 0
+
+    def _maybe_fail(self) -> None:
+        if self._rng.random() < self.profile.gemini_failure_rate:
+            raise ConnectionError("mock Gemini send failed")
+
+    async def send_realtime_input(self, media) -> None:
+        self._maybe_fail()
+        kind = media.mime_type.split(";")[0]
+        self.bytes_received[kind] = self.bytes_received.get(kind, 0) + len(media.data)
+
+    async def send_client_content(self, turns) -> None:
+        self._maybe_fail()
+        text = "".join(part.text for turn in turns for part in turn.parts)
+        if "JSON" in text:
+            self.turns_requested += 1
+            self._pending.put_nowait(self._response_text())
+
+    def _response_text(self) -> str:
+        rng = self._rng
+        action = {
+            "lyria_prompts": [
+                {"text": rng.choice(self.PROMPTS), "weight": round(rng.random(), 2)}
+            ],
+            "density": round(rng.random(), 3),
+            "brightness": round(rng.random(), 3),
+            "reasoning": "mock observation",
+        }
+        text = "```json\n" + json.dumps(action) + "\n```"
+        if rng.random() < self.profile.gemini_invalid_rate:
+            text = json.dumps(dict(action, density=1.5)) + "\n" + text
+        return text
+
+    async def receive(self):
+        """Yield one response turn, split into fragments, then end."""
+        profile = self.profile
+        text = await self._pending.get()
+        jitter = self._rng.uniform(-1.0, 1.0) * profile.gemini_jitter_ms
+        await asyncio.sleep(max(0.0, profile.gemini_latency_ms + jitter) / 1000.0)
+
+        n = max(1, profile.gemini_fragments)
+        cuts = sorted(self._rng.sample(range(1, len(text)), min(n - 1, len(text) - 1)))
+        bounds = [0, *cuts, len(text)]
+        for i in range(len(bounds) - 1):
+            if i:
+                await asyncio.sleep(profile.gemini_fragment_interval_ms / 1000.0)
+            part = SimpleNamespace(text=text[bounds[i] : bounds[i + 1]])
+            yield SimpleNamespace(
+                text=None,
+                server_content=SimpleNamespace(
+                    model_turn=SimpleNamespace(parts=[part]),
+                    turn_complete=i == len(bounds) - 2,
+                ),
+            )
+
+
+class _SessionContext:
+    def __init__(self, profile: MockProfile, rng: random.Random, factory) -> None:
+        self._profile = profile
+        self._rng = rng
+        self._factory = factory
+        self.session = None
+
+    async def __aenter__(self):
+        profile = self._profile
+        await asyncio.sleep(profile.connect_latency_ms / 1000.0)
+        if self._rng.random() < profile.connect_failure_rate:
+            raise ConnectionError("mock connect refused")
+        self.session = self._factory(profile, self._rng)
+        return self.session
+
+    async def __aexit__(self, *exc) -> None:
+        if self.session is not None:
+            await self.session.close()
+
+
+class _MockLive:
+    def __init__(self, client: "MockGenaiClient") -> None:
+        self._client = client
+        self.music = SimpleNamespace(connect=self._connect_music)
+
+    def connect(self, model=None, config=None) -> _SessionContext:
+        return self._client._open(MockGeminiSession)
+
+    def _connect_music(self, model=None) -> _SessionContext:
+        return self._client._open(MockLyriaSession)
+
+
+class MockGenaiClient:
+    """Drop-in for ``google.genai.Client`` backed by the mock sessions."""
+
+    def __init__(self, profile: MockProfile | None = None) -> None:
+        self.profile = profile or MockProfile()
+        self._rng = random.Random(self.profile.seed)
+        self.sessions: list = []
+        self.aio = SimpleNamespace(live=_MockLive(self))
+
+    def _open(self, factory) -> _SessionContext:
+        # Each session gets its own stream derived from the client seed
+        rng = random.Random(self._rng.getrandbits(32))
+
+        def create(profile, rng):
+            session = factory(profile, rng)
+            self.sessions.append(session)
+            return session
+
+        return _SessionContext(self.profile, rng, create)
@@ -1,14 +1,138 @@
+import math
 import time
 import threading
 from dataclasses import dataclass
 
+import numpy as np
 
-@dataclass
-class TouchEvent:
-    x: float
-    y: float
-    t: float
-    velocity: float
+from src.config import NARRATIVE_HISTORY_CAPACITY, NARRATIVE_WINDOW
+
+REGION_NAMES = tuple(
+    f"{ry}-{rx}" if ry != "center" or rx != "center" else "center"
+    for ry in ("lower", "center", "upper")
+    for rx in ("left", "center", "right")
+)
+
+
+def region_index(x: float, y: float) -> int:
+    """Index into REGION_NAMES of the 3x3 screen cell containing (x, y)."""
+    return 3 * ((y >= 0.33) + (y > 0.66)) + (x >= 0.33) + (x > 0.66)
+
+
+class TouchHistory:
+    """Time-windowed touch history with streaming aggregates.
+
+    Rows x, y, t, velocity and turn live in one preallocated array. Every
+    sample is written at ``i`` and ``i + capacity``, so the live window is
+    always one contiguous slice that NumPy can reduce without copying.
+
+    The velocity sum, heading-change sum and per-region counts are updated as
+    samples enter and leave the window, so reading them is O(1). ``turn`` is
+    the wrapped heading change a sample made (NaN when it did not move or had
+    no previous heading). Sums are recomputed from the window once every
+    ``capacity`` appends so floating-point drift cannot accumulate.
+    """
+
+    X, Y, T, V, TURN = range(5)
+
+    def __init__(
+        self,
+        window: float = NARRATIVE_WINDOW,
+        capacity: int = NARRATIVE_HISTORY_CAPACITY,
+    ) -> None:
+        self.window = window
+        self.capacity = capacity
+        self._data = np.zeros((5, 2 * capacity), dtype=np.float64)
+        self.clear()
+
+    def __len__(self) -> int:
+        return self._tail - self._head
+
+    @property
+    def mean_velocity(self) -> float:
+        n = self._tail - self._head
+        return self.sum_velocity / n if n else 0.0
+
+    @property
+    def mean_turn(self) -> float:
+        """Mean heading change per moving sample, in radians."""
+        return self.sum_turn / self.n_turns if self.n_turns else 0.0
+
+    @property
+    def dominant_region(self) -> str:
+        if self._tail == self._head:
+            return "none"
+        counts = self.region_counts
+        return REGION_NAMES[max(range(9), key=counts.__getitem__)]
+
+    def append(self, x: float, y: float, t: float, velocity: float) -> None:
+        if self._tail - self._head == self.capacity:
+            self._pop()
+        turn = math.nan
+        if self._last is not None:
+            dx, dy = x - self._last[0], y - self._last[1]
+            if dx or dy:
+                heading = math.atan2(dy, dx)
+                if self._heading is not None:
+                    turn = (heading - self._heading + math.pi) % math.tau - math.pi
+                    self.sum_turn += turn
+                    self.n_turns += 1
+                self._heading = heading
+        self._last = (x, y)
+
+        pos = self._tail % self.capacity
+        sample = (x, y, t, velocity, turn)
+        self._data[:, pos] = sample
+        self._data[:, pos + self.capacity] = sample
+        self._tail += 1
+        self.sum_velocity += velocity
+        self.region_counts[region_index(x, y)] += 1
+
+        self.evict_before(t - self.window)
+        if self._tail % self.capacity == 0:
+            self._resync()
+
+    def evict_before(self, cutoff: float) -> None:
+        """Drop samples with ``t <= cutoff`` (timestamps are non-decreasing)."""
+        times = self._data[self.T]
+        cap = self.capacity
+        while self._head < self._tail and times[self._head % cap] <= cutoff:
+            self._pop()
+
+    def columns(self) -> np.ndarray:
+        """(5, n) view of x, y, t, velocity, turn for the live window, oldest first."""
+        head, tail = self._head, self._tail
+        start = head % self.capacity
+        return self._data[:, start : start + (tail - head)]
+
+    def clear(self) -> None:
+        self._head = 0  # monotonic index of the oldest sample
+        self._tail = 0  # monotonic index of the next write
+        self._last: tuple[float, float] | None = None
+        self._heading: float | None = None
+        self.sum_velocity = 0.0
+        self.sum_turn = 0.0
+        self.n_turns = 0
+        self.region_counts = [0] * 9
+
+    def _pop(self) -> None:
+        x, y, _, velocity, turn = self._data[:, self._head % self.capacity].tolist()
+        self._head += 1
+        self.sum_velocity -= velocity
+        if not math.isnan(turn):
+            self.sum_turn -= turn
+            self.n_turns -= 1
+        self.region_counts[region_index(x, y)] -= 1
+
+    def _resync(self) -> None:
+        xs, ys, _, speeds, turns = self.columns()
+        moving = ~np.isnan(turns)
+        self.sum_velocity = float(speeds.sum())
+        self.sum_turn = float(turns[moving].sum())
+        self.n_turns = int(moving.sum())
+        cells = 3 * ((ys >= 0.33).astype(np.int64) + (ys > 0.66))
+        cells += (xs >= 0.33).astype(np.int64) + (xs > 0.66)
+        self.region_counts = np.bincount(cells, minlength=9).tolist()
 
 
 @dataclass
@@ -30,8 +154,10 @@ class SessionNarrativeManager:
     def __init__(self) -> None:
         self._cache: str = self._initial_narrative()
         self._lock = threading.Lock()
-        self._touch_history: list[TouchEvent] = []
+        self._touch_history = TouchHistory()
         self._session_start: float = time.time()
+        self._reset_requested = 0
+        self._reset_applied = 0
 
     def get(self, ghost_state: str = "IDLE", ghost_value: float | None = None) -> str:
         """Get current narrative with optional ghost overlay."""
@@ -42,84 +168,70 @@ class SessionNarrativeManager:
             return self._cache
 
     def update(self, n_pairs: int = 0) -> None:
-        """Recompute narrative from touch history. Called every 30 seconds."""
+        """Rebuild the narrative from the running statistics. O(1)."""
         state = self._compute_state(n_pairs)
         narrative = self._template_narrative(state)
         with self._lock:
             self._cache = narrative
 
     def record_touch(self, x: float, y: float, t: float, velocity: float) -> None:
-        """Record a touch event for statistics."""
-        self._touch_history.append(TouchEvent(x=x, y=y, t=t, velocity=velocity))
-        # Keep only last 5 minutes of history
-        cutoff = time.time() - 300
-        self._touch_history = [e for e in self._touch_history if e.t > cutoff]
+        """Record a touch event for statistics. O(1); keeps the last NARRATIVE_WINDOW s."""
+        self._touch_history.append(x, y, t, velocity)
+
+    def record_touches(self, events: np.ndarray) -> None:
+        """Record a batch read from the touch bus: rows x, y, t, velocity[, ...]."""
+        append = self._touch_history.append
+        for x, y, t, velocity in zip(*events[:4].tolist()):
+            append(x, y, t, velocity)
 
     def reset(self) -> None:
-        """Clear all history, reset to initial narrative."""
-        self._touch_history.clear()
+        """Reset to the initial narrative and request a history clear.
+
+        Safe from any thread: the touch history belongs to the thread that
+        records touches, which clears it in take_reset().
+        """
+        self._reset_requested += 1
         self._session_start = time.time()
         with self._lock:
             self._cache = self._initial_narrative()
 
+    def take_reset(self) -> bool:
+        """Clear the touch history if reset() was called since the last check.
+
+        Call from the thread that records touches, before recording.
+        """
+        requested = self._reset_requested
+        if requested == self._reset_applied:
+            return False
+        self._reset_applied = requested
+        self._touch_history.clear()
+        return True
+
     def _compute_state(self, n_pairs: int) -> SessionState:
         state = SessionState(n_pairs=n_pairs)
-        if not self._touch_history:
+        history = self._touch_history
+        n = len(history)
+        if n == 0:
             return state
 
         elapsed_min = max((time.time() - self._session_start) / 60.0, 0.01)
-        state.touch_freq = len(self._touch_history) / elapsed_min
-
-        speeds = [e.velocity for e in self._touch_history]
-        state.avg_speed = sum(speeds) / len(speeds) if speeds else 0.0
-
-        # Dominant region (divide screen into quadrants)
-        xs = [e.x for e in self._touch_history]
-        ys = [e.y for e in self._touch_history]
-        avg_x = sum(xs) / len(xs)
-        avg_y = sum(ys) / len(ys)
-        if avg_x < 0.33:
-            region_x = "left"
-        elif avg_x > 0.66:
-            region_x = "right"
-        else:
-            region_x = "center"
-        if avg_y < 0.33:
-            region_y = "lower"
-        elif avg_y > 0.66:
-            region_y = "upper"
-        else:
-            region_y = "center"
-        state.dominant_region = (
-            f"{region_y}-{region_x}"
-            if region_y != "center" or region_x != "center"
-            else "center"
-        )
+        state.touch_freq = n / elapsed_min
+        state.avg_speed = history.mean_velocity
+
+        # Dominant region: the 3x3 screen cell with the most samples
+        state.dominant_region = history.dominant_region
 
-        # Circularity: detect circular patterns from position variance
-        if len(self._touch_history) >= 5:
-            dx = [
-                self._touch_history[i + 1].x - self._touch_history[i].x
-                for i in range(len(self._touch_history) - 1)
-            ]
-            dy = [
-                self._touch_history[i + 1].y - self._touch_history[i].y
-                for i in range(len(self._touch_history) - 1)
-            ]
-            if dx and dy:
-                import numpy as np
-
-                angles = np.arctan2(dy, dx)
-                angle_diffs = np.diff(angles)
-                state.circularity = float(min(abs(np.mean(angle_diffs)) * 2.0, 1.0))
-                state.linearity = 1.0 - state.circularity
+        # Circularity: a steady turn in one direction means circling
+        if n >= 5 and history.n_turns:
+            state.circularity = min(abs(history.mean_turn) * 2.0, 1.0)
+            state.linearity = 1.0 - state.circularity
 
         # Pattern type
         if state.circularity > 0.5:
             state.pattern_type = "circular"
         elif state.linearity > 0.6:
             state.pattern_type = "linear"
-        elif len(self._touch_history) > 10:
+        elif n > 10:
             state.pattern_type = "radial"
         else:
             state.pattern_type = "none"
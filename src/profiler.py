@@ -0,0 +1,122 @@
+import logging
+import resource
+import sys
+import time
+from collections.abc import Sequence
+
+import numpy as np
+
+from src.config import PROFILER_WINDOW
+
+logger = logging.getLogger(__name__)
+
+FRAME = "frame"
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+class FrameProfiler:
+    """Per-stage frame timings kept in preallocated rings.
+
+    ``start_frame()`` marks the frame start; ``lap(stage)`` records the time
+    since the previous lap (or frame start) against ``stage``, and
+    ``end_frame()`` records the whole frame under ``"frame"``. ``record()``
+    stores an externally measured duration. Only the last ``capacity``
+    samples per stage are kept; percentiles are computed on demand.
+    ``error(stage)`` counts an exception the loop swallowed in that stage.
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[str],
+        capacity: int = PROFILER_WINDOW,
+        clock=time.perf_counter,
+    ) -> None:
+        self.stages = tuple(stages) + (FRAME,)
+        self.capacity = capacity
+        self._clock = clock
+        self._index = {stage: i for i, stage in enumerate(self.stages)}
+        self._samples = np.zeros((len(self.stages), capacity), dtype=np.float64)
+        self._counts = [0] * len(self.stages)
+        self.errors = dict.fromkeys(self.stages, 0)
+        self._frame_start = clock()
+        self._last = self._frame_start
+        self.frames = 0
+
+    def start_frame(self) -> None:
+        self._frame_start = self._last = self._clock()
+
+    def lap(self, stage: str) -> None:
+        now = self._clock()
+        self.record(stage, now - self._last)
+        self._last = now
+
+    def end_frame(self) -> None:
+        now = self._clock()
+        self.record(FRAME, now - self._frame_start)
+        self._last = now
+        self.frames += 1
+
+    def record(self, stage: str, seconds: float) -> None:
+        i = self._index[stage]
+        n = self._counts[i]
+        self._samples[i, n % self.capacity] = seconds
+        self._counts[i] = n + 1
+
+    def error(self, stage: str) -> None:
+        """Count a swallowed exception; the first one per stage is logged."""
+        self.errors[stage] += 1
+        if self.errors[stage] == 1:
+            logger.debug(
+                "Frame stage %r raised (further errors counted)", stage, exc_info=True
+            )
+
+    def count(self, stage: str) -> int:
+        return self._counts[self._index[stage]]
+
+    def _window(self, stage: str) -> np.ndarray:
+        i = self._index[stage]
+        return self._samples[i, : min(self._counts[i], self.capacity)]
+
+    def percentiles(
+        self, stage: str, qs: Sequence[float] = (50, 95, 99)
+    ) -> dict[str, float]:
+        """Rolling percentiles of ``stage`` in milliseconds, keyed "p50" etc."""
+        window = self._window(stage)
+        if not len(window):
+            return {f"p{q:g}": 0.0 for q in qs}
+        values = np.percentile(window, qs) * 1000.0
+        return {f"p{q:g}": float(v) for q, v in zip(qs, values)}
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Per-stage count, mean, p50/p95/p99 and max over the window, in ms."""
+        result = {}
+        for stage in self.stages:
+            window = self._window(stage)
+            stats = {"count": self.count(stage)}
+            stats["mean_ms"] = float(window.mean() * 1000.0) if len(window) else 0.0
+            stats.update({f"{k}_ms": v for k, v in self.percentiles(stage).items()})
+            stats["max_ms"] = float(window.max() * 1000.0) if len(window) else 0.0
+            result[stage] = stats
+        return result
+
+    def status_line(self, slowest: int = 3) -> str:
+        """One-line summary: frame p50/p95/p99, slowest stages by p95, error counts."""
+        frame = self.percentiles(FRAME)
+        parts = ["frame p50 {p50:.2f} p95 {p95:.2f} p99 {p99:.2f} ms".format(**frame)]
+        p95 = {
+            stage: self.percentiles(stage, (95,))["p95"]
+            for stage in self.stages
+            if stage != FRAME
+        }
+        worst = sorted(p95, key=p95.get, reverse=True)[:slowest]
+        parts.append(", ".join(f"{stage} {p95[stage]:.2f}" for stage in worst))
+        errors = [f"{stage}={n}" for stage, n in self.errors.items() if n]
+        if errors:
+            parts.append("errors " + " ".join(errors))
+        return " | ".join(parts)
@@ -0,0 +1,122 @@
+from math import gcd
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class PolyphaseResampler:
+    """Streaming rational-ratio resampler with multichannel → mono mixdown.
+
+    A Kaiser-windowed sinc low-pass (cutoff just below the lower Nyquist) is
+    split into ``up`` polyphase branches. Each call filters one chunk of
+    interleaved int16 PCM, carrying the last ``taps_per_phase - 1`` input
+    samples and the output phase over to the next call, so consecutive chunks
+    resample exactly like one continuous signal. Work buffers are preallocated
+    for ``max_chunk_frames`` and grow only if a larger chunk arrives.
+    """
+
+    def __init__(
+        self,
+        in_rate: int,
+        out_rate: int,
+        channels: int = 1,
+        taps_per_phase: int = 48,
+        rolloff: float = 0.9,
+        kaiser_beta: float = 8.0,
+        max_chunk_frames: int = 48000,
+    ) -> None:
+        g = gcd(in_rate, out_rate)
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.up = out_rate // g
+        self.down = in_rate // g
+        self.channels = channels
+        self.taps = taps_per_phase
+
+        n = taps_per_phase * self.up
+        t = np.arange(n) - (n - 1) / 2.0
+        fc = rolloff * 0.5 / max(self.up, self.down)
+        h = 2.0 * fc * np.sinc(2.0 * fc * t) * np.kaiser(n, kaiser_beta)
+        h *= self.up / h.sum()
+        # Branch p holds h[p + k*up]; reversed so a window dot product is the convolution
+        self._phases = np.ascontiguousarray(
+            h.reshape(taps_per_phase, self.up).T[:, ::-1], dtype=np.float32
+        )
+
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._t = 0  # upsampled index of the next output, relative to chunk start
+        self._alloc(max_chunk_frames)
+
+    def _alloc(self, max_frames: int) -> None:
+        self._max_frames = max_frames
+        self._buf = np.zeros(self.taps - 1 + max_frames, dtype=np.float32)
+        max_out = (max_frames * self.up) // self.down + 2
+        self._out = np.zeros(max_out, dtype=np.float32)
+        self._out16 = np.zeros(max_out, dtype=np.int16)
+
+    def reset(self) -> None:
+        """Forget filter history, e.g. before resampling a non-contiguous window."""
+        self._history[:] = 0.0
+        self._t = 0
+
+    def process(self, pcm: bytes | memoryview) -> bytes:
+        """Resample interleaved int16 PCM to mono int16 PCM at ``out_rate``."""
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        n = len(samples) // self.channels
+        frames = samples[: n * self.channels].reshape(n, self.channels)
+        if n > self._max_frames:
+            self._alloc(n)
+
+        # Mix down straight into the work buffer after the carried-over history
+        k = self.taps - 1
+        mono = self._buf[k : k + n]
+        if self.channels == 1:
+            np.multiply(frames[:, 0], 1.0 / 32768.0, out=mono, dtype=np.float32)
+        else:
+            np.add(frames[:, 0], frames[:, 1], out=mono, dtype=np.float32)
+            for c in range(2, self.channels):
+                mono += frames[:, c]
+            mono *= 1.0 / (32768.0 * self.channels)
+
+        y = self._filter(n)
+        np.multiply(y, 32768.0, out=y)
+        np.clip(y, -32768.0, 32767.0, out=y)
+        out16 = self._out16[: len(y)]
+        out16[:] = y
+        return out16.tobytes()
+
+    def process_float(self, mono: np.ndarray) -> np.ndarray:
+        """Resample mono float samples. The result is only valid until the next call."""
+        n = len(mono)
+        if n > self._max_frames:
+            self._alloc(n)
+        k = self.taps - 1
+        self._buf[k : k + n] = mono
+        return self._filter(n)
+
+    def _filter(self, n: int) -> np.ndarray:
+        k = self.taps - 1
+        up, down = self.up, self.down
+        buf = self._buf[: k + n]
+        buf[:k] = self._history
+
+        n_up = n * up
+        n_out = 0 if self._t >= n_up else (n_up - 1 - self._t) // down + 1
+        out = self._out[:n_out]
+        if n_out:
+            windows = sliding_window_view(buf, self.taps)
+            # Outputs n0, n0 + up, n0 + 2*up, ... share one phase and step `down`
+            # input samples apart, so each branch is a single strided mat-vec.
+            for n0 in range(min(up, n_out)):
+                t0 = self._t + n0 * down
+                i0, p = divmod(t0, up)
+                count = (n_out - n0 + up - 1) // up
+                np.matmul(
+                    windows[i0 : i0 + (count - 1) * down + 1 : down],
+                    self._phases[p],
+                    out=out[n0::up],
+                )
+
+        self._history[:] = buf[n:]
+        self._t += n_out * down - n_up
+        return out
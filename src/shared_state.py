@@ -1,73 +1,184 @@
 import queue
 import threading
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
+
+from src.audio_ring import AudioRingBuffer
+from src.config import AUDIO_RING_FRAMES
+from src.touch_bus import TouchEventBus
+
+
+@dataclass(frozen=True)
+class AudioBufferStats:
+    """Output jitter-buffer statistics, published periodically by AudioBridge."""
+
+    latency_ms: float = 0.0
+    target_ms: float = 0.0
+    jitter_ms: float = 0.0
+    stretch_ratio: float = 1.0
+    underruns: int = 0
+    overruns: int = 0
+
+
+@dataclass(frozen=True)
+class ServiceStatus:
+    """Connection health of one supervised service, published by ConnectionSupervisor."""
+
+    up: bool = False
+    circuit: str = "closed"  # "closed", "open", "half_open"
+    uptime_s: float = 0.0  # since the last (re)connect
+    availability: float = 0.0  # fraction of supervised time spent connected
+    reconnects: int = 0
+    failures: int = 0
+    last_recovery_s: float = 0.0  # outage length before the last reconnect
+
+
+@dataclass(frozen=True)
+class VisualSnapshot:
+    """Organism metrics, published by the render thread."""
+
+    density: float = 0.5  # boids density
+    connectivity: float = 0.5  # physarum connectivity
+    activity: float = 0.5  # agent activity
+    version: int = 0
+
+
+@dataclass(frozen=True)
+class AudioSnapshot:
+    """Lyria output features, published by the render thread."""
+
+    rms: float = 0.0
+    centroid: float = 0.0
+    flux: float = 0.0
+    version: int = 0
+
+
+@dataclass(frozen=True)
+class GhostSnapshot:
+    """Ghost Replay state, published by the render thread."""
+
+    state: str = "IDLE"  # "IDLE", "IMMINENT", "ACTIVE"
+    active: bool = False
+    elapsed: float = 0.0
+    version: int = 0
+
+
+@dataclass(frozen=True)
+class FrameSnapshot:
+    """Latest encoded frame, published by the FrameEncoder thread."""
+
+    jpeg: bytes = b""
+    signature: object = None  # frame_signature() of the encoded pixels
+    version: int = 0
+
+
+@dataclass(frozen=True)
+class ConnectionSnapshot:
+    """Service connection flags, published by the asyncio thread."""
+
+    lyria: bool = False
+    gemini: bool = False
+    version: int = 0
 
 
 @dataclass
 class SharedState:
-    """Thread-safe state shared between main thread (GGUI) and async daemon thread."""
+    """State shared between the main thread (GGUI) and the async daemon thread.
 
-    # --- Main -> Async (written by main thread, read by async thread) ---
-    boids_density: float = 0.5
-    physarum_connectivity: float = 0.5
-    agent_activity: float = 0.5
-    latest_jpeg_frame: bytes = b""
-    touch_events: queue.Queue = field(default_factory=queue.Queue)
+    Grouped values are immutable snapshots. Each has a single producer thread
+    that builds a new snapshot with the next ``version`` and publishes it by
+    rebinding one attribute, so readers never lock, never block the frame
+    loop, and always see one consistent, versioned set of values.
+    """
 
-    # Ghost state
-    ghost_active: bool = False
-    ghost_state: str = "IDLE"  # "IDLE", "IMMINENT", "ACTIVE"
-    ghost_elapsed: float = 0.0
+    # --- Main -> Async (written by main thread, read by async thread) ---
+    visual: VisualSnapshot = field(default_factory=VisualSnapshot)
+    ghost: GhostSnapshot = field(default_factory=GhostSnapshot)
+    audio: AudioSnapshot = field(default_factory=AudioSnapshot)
+    touch_bus: TouchEventBus = field(default_factory=TouchEventBus)
+    iml_n_pairs: int = 0  # single value, single writer
 
-    # IML state
-    iml_n_pairs: int = 0
+    # Encoded frames (FrameEncoder thread -> async thread)
+    frame: FrameSnapshot = field(default_factory=FrameSnapshot)
+    _frame_request: threading.Event = field(default_factory=threading.Event)
 
     # --- Async -> Main (written by async thread, read by main thread) ---
-    audio_queue: queue.Queue = field(default_factory=lambda: queue.Queue(maxsize=50))
-    audio_rms: float = 0.0
-    audio_spectral_centroid: float = 0.0
-    audio_spectral_flux: float = 0.0
+    audio_ring: AudioRingBuffer = field(
+        default_factory=lambda: AudioRingBuffer(AUDIO_RING_FRAMES)
+    )
+    audio_buffer_stats: AudioBufferStats = field(default_factory=AudioBufferStats)
     gemini_action: queue.Queue = field(default_factory=queue.Queue)
 
     # Connection status
-    lyria_connected: bool = False
-    gemini_connected: bool = False
+    connections: ConnectionSnapshot = field(default_factory=ConnectionSnapshot)
+    service_status: dict = field(default_factory=dict)  # name -> ServiceStatus
+
+    def request_frame(self) -> int:
+        """Ask the render thread for a fresh frame. Returns the current frame version."""
+        self._frame_request.set()
+        return self.frame.version
+
+    def take_frame_request(self) -> bool:
+        """Consume a pending frame request (render thread)."""
+        if not self._frame_request.is_set():
+            return False
+        self._frame_request.clear()
+        return True
+
+    def publish_jpeg_frame(self, jpeg: bytes, signature=None) -> None:
+        self.frame = FrameSnapshot(jpeg, signature, self.frame.version + 1)
+
+    @property
+    def frame_version(self) -> int:
+        return self.frame.version
+
+    @property
+    def latest_jpeg_frame(self) -> bytes:
+        return self.frame.jpeg
+
+    def latest_frame(self) -> tuple:
+        """Latest (jpeg, signature) pair, both from the same published frame."""
+        frame = self.frame
+        return frame.jpeg, frame.signature
+
+    @property
+    def lyria_connected(self) -> bool:
+        return self.connections.lyria
+
+    @lyria_connected.setter
+    def lyria_connected(self, up: bool) -> None:
+        current = self.connections
+        self.connections = replace(current, lyria=up, version=current.version + 1)
+
+    @property
+    def gemini_connected(self) -> bool:
+        return self.connections.gemini
 
-    # Lock for grouped non-atomic field updates
-    _lock: threading.Lock = field(default_factory=threading.Lock)
+    @gemini_connected.setter
+    def gemini_connected(self, up: bool) -> None:
+        current = self.connections
+        self.connections = replace(current, gemini=up, version=current.version + 1)
 
     def update_visual_metrics(
         self, density: float, connectivity: float, activity: float
     ) -> None:
-        with self._lock:
-            self.boids_density = density
-            self.physarum_connectivity = connectivity
-            self.agent_activity = activity
+        self.visual = VisualSnapshot(
+            density, connectivity, activity, self.visual.version + 1
+        )
 
     def get_visual_metrics(self) -> tuple[float, float, float]:
-        with self._lock:
-            return self.boids_density, self.physarum_connectivity, self.agent_activity
+        visual = self.visual
+        return visual.density, visual.connectivity, visual.activity
 
     def update_audio_features(self, rms: float, centroid: float, flux: float) -> None:
-        with self._lock:
-            self.audio_rms = rms
-            self.audio_spectral_centroid = centroid
-            self.audio_spectral_flux = flux
+        self.audio = AudioSnapshot(rms, centroid, flux, self.audio.version + 1)
 
     def get_audio_features(self) -> tuple[float, float, float]:
-        with self._lock:
-            return (
-                self.audio_rms,
-                self.audio_spectral_centroid,
-                self.audio_spectral_flux,
-            )
+        audio = self.audio
+        return audio.rms, audio.centroid, audio.flux
 
     def update_ghost_state(self, state: str, active: bool, elapsed: float) -> None:
-        with self._lock:
-            self.ghost_state = state
-            self.ghost_active = active
-            self.ghost_elapsed = elapsed
+        self.ghost = GhostSnapshot(state, active, elapsed, self.ghost.version + 1)
 
     def get_ghost_info(self) -> tuple[str, bool, float]:
-        with self._lock:
-            return self.ghost_state, self.ghost_active, self.ghost_elapsed
+        ghost = self.ghost
+        return ghost.state, ghost.active, ghost.elapsed
@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import random
+import time
+
+from src.config import (
+    SUPERVISOR_BACKOFF_BASE,
+    SUPERVISOR_BACKOFF_JITTER,
+    SUPERVISOR_BACKOFF_MAX,
+    SUPERVISOR_CHECK_INTERVAL,
+    SUPERVISOR_FAILURE_THRESHOLD,
+    SUPERVISOR_MIN_UPTIME,
+    SUPERVISOR_OPEN_SECONDS,
+)
+from src.shared_state import ServiceStatus, SharedState
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Stops connection attempts after repeated failures.
+
+    Closed: attempts allowed. After ``threshold`` consecutive failures it opens
+    and refuses attempts for ``cooldown`` seconds, then goes half-open and
+    allows one trial: success closes it, failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        threshold: int = SUPERVISOR_FAILURE_THRESHOLD,
+        cooldown: float = SUPERVISOR_OPEN_SECONDS,
+    ) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = float("-inf")
+
+    @property
+    def retry_at(self) -> float:
+        """Monotonic time at which an open circuit allows its half-open trial."""
+        return self._opened_at + self.cooldown
+
+    def allow(self, now: float) -> bool:
+        if self.state == self.OPEN:
+            if now < self.retry_at:
+                return False
+            self.state = self.HALF_OPEN
+        return True
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+
+    def record_failure(self, now: float) -> None:
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.threshold:
+            self.state = self.OPEN
+            self._opened_at = now
+
+
+class _Service:
+    def __init__(self, name, start, is_healthy, breaker: CircuitBreaker) -> None:
+        self.name = name
+        self.start = start
+        self.is_healthy = is_healthy
+        self.breaker = breaker
+        self.recovery: asyncio.Future | None = None
+        self.registered_at = time.monotonic()
+        self.up_since: float | None = None
+        self.down_since: float | None = None
+        self.last_healthy = float("-inf")  # last check that found it healthy
+        self.connected_once = False
+        self.stable = False  # up for the minimum uptime since the last connect
+        self.attempt = 0  # backoff step, kept until a connection proves stable
+        self.retry_delay = 0.0
+        self.total_up = 0.0
+        self.reconnects = 0
+        self.failures = 0
+        self.last_recovery_s = 0.0
+
+
+class ConnectionSupervisor:
+    """Keeps registered services connected, with backoff and a circuit breaker.
+
+    Each service provides an async ``start`` that (re)connects it and starts
+    its worker tasks, raising on failure, and a cheap ``is_healthy`` check.
+    ``run()`` polls the checks every ``check_interval`` seconds; an unhealthy
+    service gets a recovery task that retries ``start`` with jittered
+    exponential backoff until it succeeds or its circuit opens. A connect only
+    counts as a success once the service has stayed healthy for ``min_uptime``
+    seconds; dropping before that is another failure, so a session that keeps
+    dying right after connecting backs off and eventually opens the circuit.
+    Per-service ``ServiceStatus`` records are published to
+    ``SharedState.service_status``.
+    """
+
+    def __init__(
+        self,
+        shared_state: SharedState,
+        check_interval: float = SUPERVISOR_CHECK_INTERVAL,
+        backoff_base: float = SUPERVISOR_BACKOFF_BASE,
+        backoff_max: float = SUPERVISOR_BACKOFF_MAX,
+        jitter: float = SUPERVISOR_BACKOFF_JITTER,
+        failure_threshold: int = SUPERVISOR_FAILURE_THRESHOLD,
+        open_seconds: float = SUPERVISOR_OPEN_SECONDS,
+        min_uptime: float = SUPERVISOR_MIN_UPTIME,
+        seed: int | None = None,
+    ) -> None:
+        self.shared_state = shared_state
+        self.check_interval = check_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.min_uptime = min_uptime
+        self._rng = random.Random(seed)
+        self._services: dict[str, _Service] = {}
+
+    def register(self, name: str, start, is_healthy) -> None:
+        """Supervise a service. Its first connect happens on the next check."""
+        breaker = CircuitBreaker(self.failure_threshold, self.open_seconds)
+        self._services[name] = _Service(name, start, is_healthy, breaker)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Delay before retry ``attempt`` (0-based): capped doubling, minus random jitter."""
+        delay = min(self.backoff_max, self.backoff_base * 2.0**attempt)
+        return delay * (1.0 - self.jitter * self._rng.random())
+
+    async def run(self) -> None:
+        try:
+            while True:
+                now = time.monotonic()
+                for service in self._services.values():
+                    self._check(service, now)
+                self._publish(now)
+                await asyncio.sleep(self.check_interval)
+        finally:
+            for service in self._services.values():
+                if service.recovery is not None:
+                    service.recovery.cancel()
+
+    def _check(self, service: _Service, now: float) -> None:
+        if service.recovery is not None and not service.recovery.done():
+            return
+        try:
+            healthy = service.is_healthy()
+        except Exception:
+            logger.debug("%s: health check raised", service.name, exc_info=True)
+            healthy = False
+        if healthy:
+            service.last_healthy = now
+            if (
+                not service.stable
+                and service.up_since is not None
+                and now - service.up_since >= self.min_uptime
+            ):
+                service.stable = True
+                service.attempt = 0
+                service.breaker.record_success()
+            return
+
+        if service.down_since is None:
+            # The outage began some time after the last healthy check
+            service.down_since = (
+                now
+                if service.up_since is None
+                else max(service.last_healthy, service.up_since)
+            )
+        if service.up_since is not None:
+            logger.warning("%s: connection lost — recovering", service.name)
+            if not service.stable:
+                # Dropped before proving stable: the connect did not really succeed
+                service.failures += 1
+                service.breaker.record_failure(now)
+                service.retry_delay = self.backoff_delay(service.attempt)
+                service.attempt += 1
+            service.total_up += now - service.up_since
+            service.up_since = None
+        service.recovery = asyncio.ensure_future(self._recover(service))
+
+    async def _recover(self, service: _Service) -> None:
+        breaker = service.breaker
+        attempts = 0
+        if service.retry_delay > 0:
+            await asyncio.sleep(service.retry_delay)
+            service.retry_delay = 0.0
+        while True:
+            now = time.monotonic()
+            if not breaker.allow(now):
+                await asyncio.sleep(breaker.retry_at - now)
+                continue
+            attempts += 1
+            try:
+                await service.start()
+            except Exception as e:
+                service.failures += 1
+                breaker.record_failure(time.monotonic())
+                delay = self.backoff_delay(service.attempt)
+                service.attempt += 1
+                logger.warning(
+                    "%s: connect attempt %d failed (%s); retry in %.1fs [circuit %s]",
+                    service.name,
+                    attempts,
+                    e,
+                    delay,
+                    breaker.state,
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            now = time.monotonic()
+            if service.connected_once:
+                service.reconnects += 1
+                service.last_recovery_s = now - service.down_since
+                logger.info(
+                    "%s: recovered after %.1fs (%d attempts)",
+                    service.name,
+                    service.last_recovery_s,
+                    attempts,
+                )
+            service.connected_once = True
+            service.stable = False
+            service.up_since = now
+            service.down_since = None
+            self._publish(now)
+            return
+
+    def _publish(self, now: float) -> None:
+        status = {}
+        for name, service in self._services.items():
+            uptime = now - service.up_since if service.up_since is not None else 0.0
+            supervised = now - service.registered_at
+            status[name] = ServiceStatus(
+                up=service.up_since is not None,
+                circuit=service.breaker.state,
+                uptime_s=uptime,
+                availability=(
+                    (service.total_up + uptime) / supervised if supervised > 0 else 0.0
+                ),
+                reconnects=service.reconnects,
+                failures=service.failures,
+                last_recovery_s=service.last_recovery_s,
+            )
+        # Single reference swap — readers never see a partially updated dict
+        self.shared_state.service_status = status
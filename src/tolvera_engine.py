@@ -1,23 +1,122 @@
-import io
 import logging
 import math
 import time
 
 import numpy as np
-from PIL import Image
+import taichi as ti
 
 from src.config import (
+    CAPTURE_H,
+    CAPTURE_W,
     DIST_SCALE,
     FLUX_THRESHOLD,
+    GHOST_MASK_DECAY,
+    GHOST_MASK_RADIUS,
+    GHOST_MASK_SCALE,
+    METRICS_INTERVAL,
+    METRICS_TRAIL_STRIDE,
     PARTICLES,
     SCREEN_H,
     SCREEN_W,
     SPEED_SCALE,
 )
+from src.frame_capture import encode_jpeg
 
 logger = logging.getLogger(__name__)
 
 
+@ti.kernel
+def _scale_pixels(px: ti.template(), mult: ti.f32):
+    """Multiply every pixel by ``mult`` and clamp to [0, 1], in place on the field."""
+    for I in ti.grouped(px):
+        px[I] = ti.math.clamp(px[I] * mult, 0.0, 1.0)
+
+
+@ti.kernel
+def _box_downsample(src: ti.template(), dst: ti.template(), factor: ti.i32):
+    """Average factor x factor blocks of ``src`` over its first two axes into ``dst``."""
+    for I in ti.grouped(dst):
+        acc = dst[I] * 0.0
+        for di, dj in ti.ndrange(factor, factor):
+            J = I
+            J[0] = I[0] * factor + di
+            J[1] = I[1] * factor + dj
+            acc += src[J]
+        dst[I] = acc / (factor * factor)
+
+
+@ti.kernel
+def _stride_sample(src: ti.template(), dst: ti.template(), stride: ti.i32):
+    """Copy every ``stride``-th element of ``src`` along its first two axes into ``dst``."""
+    for I in ti.grouped(dst):
+        J = I
+        J[0] = I[0] * stride
+        J[1] = I[1] * stride
+        dst[I] = src[J]
+
+
+@ti.kernel
+def _stamp_segments(
+    mask: ti.template(),
+    segs: ti.types.ndarray(),
+    n: ti.i32,
+    scale: ti.f32,
+    radius: ti.f32,
+    stamp: ti.f32,
+):
+    """Write time ``stamp`` into mask cells within ``radius`` cells of each segment.
+
+    ``segs`` rows are x0, y0, x1, y1 in screen pixels; the mask is indexed
+    [row = y / scale, col = x / scale]. One thread per segment.
+    """
+    r = ti.cast(ti.ceil(radius), ti.i32)
+    for s in range(n):
+        x0 = segs[s, 0] / scale
+        y0 = segs[s, 1] / scale
+        x1 = segs[s, 2] / scale
+        y1 = segs[s, 3] / scale
+        length = ti.sqrt((x1 - x0) ** 2 + (y1 - y0) ** 2)
+        steps = ti.max(1, ti.cast(ti.ceil(length / ti.max(radius * 0.5, 0.5)), ti.i32))
+        for k in range(steps + 1):
+            f = k / steps
+            ci = ti.cast(y0 + (y1 - y0) * f, ti.i32)
+            cj = ti.cast(x0 + (x1 - x0) * f, ti.i32)
+            for di, dj in ti.ndrange((-r, r + 1), (-r, r + 1)):
+                i = ci + di
+                j = cj + dj
+                if (
+                    di * di + dj * dj <= radius * radius
+                    and i >= 0
+                    and i < mask.shape[0]
+                    and j >= 0
+                    and j < mask.shape[1]
+                ):
+                    ti.atomic_max(mask[i, j], stamp)
+
+
+@ti.kernel
+def _scale_pixels_masked(
+    px: ti.template(), mask: ti.template(), mult: ti.f32, now: ti.f32, decay: ti.f32
+):
+    """Scale pixels by ``mult`` where the ghost mask was stamped, fading with age."""
+    for I in ti.grouped(px):
+        i = I[0] * mask.shape[0] // px.shape[0]
+        j = I[1] * mask.shape[1] // px.shape[1]
+        weight = ti.exp(ti.min(mask[i, j] - now, 0.0) / decay)
+        px[I] = ti.math.clamp(px[I] * (1.0 + (mult - 1.0) * weight), 0.0, 1.0)
+
+
+_MASK_EMPTY = -1.0e9  # stamp time of a never-touched mask cell
+
+
+def _downsampled_field_like(src, factor: int):
+    """Allocate a field shaped like ``src`` with its first two axes divided by ``factor``."""
+    shape = (src.shape[0] // factor, src.shape[1] // factor) + tuple(src.shape[2:])
+    if isinstance(src, ti.MatrixField):
+        return ti.Vector.field(src.n, dtype=src.dtype, shape=shape)
+    return ti.field(dtype=src.dtype, shape=shape)
+
+
 class TolveraEngine:
     """Wraps Tolvera for the Boids+Physarum visual simulation."""
 
@@ -43,8 +142,22 @@ class TolveraEngine:
         # Ghost Replay brightness multiplier (set externally from ghost state machine)
         self._brightness_mult: float = 1.0
 
-        # Touch positions accumulated for Physarum nutrient deposit and ghost evaporate mask
-        self._touch_positions: list[tuple[float, float]] = []
+        # Ghost mask: per cell, the time (s since _ghost_epoch) a path last crossed it.
+        # Decay is applied when the mask is used, so no per-frame decay kernel runs.
+        self._ghost_mask = None  # allocated on the first stamp
+        self._ghost_stamped = False  # any path in the mask since the last reset
+        self._ghost_epoch: float = time.monotonic()
+
+        # Downscaled copy of the pixel field for frame capture (allocated lazily)
+        self._capture_factor: int = max(
+            1, min(SCREEN_W // CAPTURE_W, SCREEN_H // CAPTURE_H)
+        )
+        self._capture_field = None
+
+        # Cached visual metrics (density, connectivity, activity), see update_metrics()
+        self._metrics: tuple[float, float, float] = (0.5, 0.5, 0.5)
+        self._metrics_time: float = float("-inf")
+        self._trail_sample_field = None
 
         # Timestamp of last frame for dt calculation
         self._last_frame_time: float = time.monotonic()
@@ -72,14 +185,21 @@ class TolveraEngine:
         self._last_frame_time = time.monotonic()
 
     def _apply_brightness(self, mult: float) -> None:
-        # VERIFY: how to access and mutate the pixel/trail buffer directly.
-        # Approach below assumes tv.px is a Taichi field of shape (H, W, 4) with float32.
+        # VERIFY: how to access the pixel/trail buffer directly.
+        # Assumes tv.px is a Taichi field (scalar (H, W, 4) or 4-vector (H, W)) so the
+        # multiply runs as a kernel on the field without a host round-trip.
+        # With ghost paths recorded, only the visitor's remembered paths brighten.
         try:
-            pixels = self.tv.px  # VERIFY: attribute name
-            # Taichi field — apply multiplier in kernel or via numpy round-trip
-            arr = pixels.to_numpy()  # VERIFY: returns ndarray
-            arr = np.clip(arr * mult, 0.0, 1.0)
-            pixels.from_numpy(arr)  # VERIFY: write-back method
+            if self._ghost_stamped:
+                _scale_pixels_masked(
+                    self.tv.px,  # VERIFY: attribute name
+                    self._ghost_mask,
+                    mult,
+                    time.monotonic() - self._ghost_epoch,
+                    GHOST_MASK_DECAY,
+                )
+                return
+            _scale_pixels(self.tv.px, mult)  # VERIFY: attribute name
         except Exception:
             logger.debug(
                 "_apply_brightness: pixel buffer access failed — skipping",
@@ -90,8 +210,41 @@ class TolveraEngine:
     # Visual metrics
     # ------------------------------------------------------------------
 
+    def update_metrics(self, now: float | None = None) -> bool:
+        """Refresh all visual metrics from one snapshot of each field.
+
+        Runs at most every METRICS_INTERVAL seconds; the boids field is read once
+        and the slime trail is read through a METRICS_TRAIL_STRIDE sample grid.
+        Returns True when the cached metrics were refreshed.
+        """
+        if now is None:
+            now = time.monotonic()
+        if now - self._metrics_time < METRICS_INTERVAL:
+            return False
+        self._metrics_time = now
+
+        density = self._read_boids_density()
+        connectivity = self._read_physarum_connectivity()
+        self._metrics = (density, connectivity, (density + connectivity) / 2.0)
+        return True
+
+    def get_visual_metrics(self) -> tuple[float, float, float]:
+        """Cached (boids_density, physarum_connectivity, agent_activity)."""
+        return self._metrics
+
     def get_boids_density(self) -> float:
-        """Boids clustering metric, 0 (dispersed) → 1 (clustered)."""
+        """Boids clustering metric, 0 (dispersed) → 1 (clustered). Cached."""
+        return self._metrics[0]
+
+    def get_physarum_connectivity(self) -> float:
+        """Physarum trail network density, 0 (sparse) → 1 (dense). Cached."""
+        return self._metrics[1]
+
+    def get_agent_activity(self) -> float:
+        """Combined activity metric: mean of boids density and physarum connectivity."""
+        return self._metrics[2]
+
+    def _read_boids_density(self) -> float:
         try:
             # VERIFY: how to access boids particle positions —
             #   may be tv.s.boids.field, tv.species[0].pos, tv.boids.pos, etc.
@@ -113,13 +266,12 @@ class TolveraEngine:
             logger.debug("get_boids_density: fallback to 0.5", exc_info=True)
             return 0.5
 
-    def get_physarum_connectivity(self) -> float:
-        """Physarum trail network density, 0 (sparse) → 1 (dense)."""
+    def _read_physarum_connectivity(self) -> float:
         try:
             # VERIFY: how to access the Physarum trail/pheromone buffer —
             #   may be tv.s.slime, tv.trail, tv.physarum.trail, tv.px, etc.
-            trail = self.tv.s.slime  # VERIFY
-            arr = trail.to_numpy()  # VERIFY: shape (H, W) or (H, W, C) float32
+            trail = self.tv.s.slime  # VERIFY: field of shape (H, W) or (H, W, C)
+            arr = self._read_trail_strided(trail)
 
             if arr.ndim == 3:
                 brightness = arr.mean(axis=2)  # flatten channels
@@ -133,29 +285,48 @@ class TolveraEngine:
             logger.debug("get_physarum_connectivity: fallback to 0.5", exc_info=True)
             return 0.5
 
-    def get_agent_activity(self) -> float:
-        """Combined activity metric: mean of boids density and physarum connectivity."""
-        return (self.get_boids_density() + self.get_physarum_connectivity()) / 2.0
+    def _read_trail_strided(self, trail) -> np.ndarray:
+        stride = METRICS_TRAIL_STRIDE
+        if stride <= 1:
+            return trail.to_numpy()
+        try:
+            if self._trail_sample_field is None:
+                self._trail_sample_field = _downsampled_field_like(trail, stride)
+            _stride_sample(trail, self._trail_sample_field, stride)
+            return self._trail_sample_field.to_numpy()
+        except Exception:
+            logger.debug(
+                "_read_trail_strided: kernel sample failed — full readback",
+                exc_info=True,
+            )
+            return trail.to_numpy()[::stride, ::stride]
 
     # ------------------------------------------------------------------
     # Frame capture for Gemini
     # ------------------------------------------------------------------
 
-    def capture_frame_jpeg(self) -> bytes:
-        pixels = (
-            self.tv.px.to_numpy()
-        )  # VERIFY: returns float32 RGBA or RGB, shape (H, W, C)
-        img_array = (np.clip(pixels, 0.0, 1.0) * 255).astype(np.uint8)
+    def capture_frame_pixels(self) -> np.ndarray:
+        """Return the frame downscaled to ~CAPTURE_W x CAPTURE_H as float (H, W, C).
 
-        # Drop alpha channel if present
-        if img_array.ndim == 3 and img_array.shape[2] == 4:
-            img_array = img_array[:, :, :3]
+        The box filter runs as a kernel, so only the small field is read back.
+        """
+        pixels = self.tv.px  # VERIFY: float32 RGBA or RGB field, shape (H, W, C)
+        factor = self._capture_factor
+        try:
+            if self._capture_field is None:
+                self._capture_field = _downsampled_field_like(pixels, factor)
+            _box_downsample(pixels, self._capture_field, factor)
+            return self._capture_field.to_numpy()
+        except Exception:
+            logger.debug(
+                "capture_frame_pixels: kernel downsample failed — strided readback",
+                exc_info=True,
+            )
+            return pixels.to_numpy()[::factor, ::factor]
 
-        img = Image.fromarray(img_array)
-        img = img.resize((480, 270), Image.LANCZOS)
-        buf = io.BytesIO()
-        img.save(buf, format="JPEG", quality=60)
-        return buf.getvalue()
+    def capture_frame_jpeg(self) -> bytes:
+        """Synchronous capture + encode. The render loop uses FrameEncoder instead."""
+        return encode_jpeg(self.capture_frame_pixels())
 
     # ------------------------------------------------------------------
     # Window accessor
@@ -170,8 +341,6 @@ class TolveraEngine:
 
     def on_touch(self, x: float, y: float) -> None:
         """x, y are normalised (0-1) from GGUI cursor position."""
-        self._touch_positions.append((x, y))
-
         # VERIFY: Tolvera API for applying an attraction force to nearby Boids.
         # Possible approaches:
         #   tv.s.boids.attract(x, y, radius=0.1, strength=0.5)
@@ -233,6 +402,27 @@ class TolveraEngine:
     def set_brightness_multiplier(self, mult: float) -> None:
         self._brightness_mult = mult
 
+    def stamp_ghost_paths(self, segments: np.ndarray) -> None:
+        """Rasterize a batch of ghost path segments (screen pixels) into the mask."""
+        if len(segments) == 0:
+            return
+        if self._ghost_mask is None:
+            # VERIFY: assumes tv.px rows follow the GGUI cursor's y axis
+            self._ghost_mask = ti.field(
+                ti.f32,
+                shape=(SCREEN_H // GHOST_MASK_SCALE, SCREEN_W // GHOST_MASK_SCALE),
+            )
+            self._ghost_mask.fill(_MASK_EMPTY)
+        _stamp_segments(
+            self._ghost_mask,
+            np.ascontiguousarray(segments, dtype=np.float32),
+            len(segments),
+            GHOST_MASK_SCALE,
+            GHOST_MASK_RADIUS / GHOST_MASK_SCALE,
+            time.monotonic() - self._ghost_epoch,
+        )
+        self._ghost_stamped = True
+
     # ------------------------------------------------------------------
     # Audio feedback
     # ------------------------------------------------------------------
@@ -307,9 +497,13 @@ class TolveraEngine:
         except Exception:
             logger.debug("reset: tv.reset() not available — skipping Tolvera reset")
 
-        self._touch_positions.clear()
+        # The field is kept for reuse; brightness is uniform until the next stamp
+        if self._ghost_stamped:
+            self._ghost_mask.fill(_MASK_EMPTY)
+            self._ghost_stamped = False
         self._brightness_mult = 1.0
         self._cursor_velocity = 0.0
         self._is_pressed = False
         self._frame_count = 0
+        self._metrics_time = float("-inf")
         logger.info("TolveraEngine reset")
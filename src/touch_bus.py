@@ -0,0 +1,112 @@
+import numpy as np
+
+from src.config import TOUCH_BUS_CAPACITY
+
+
+class TouchCursor:
+    """One consumer's read position on a TouchEventBus.
+
+    ``read()`` returns every event published since the previous read as a
+    (5, n) array of x, y, t, velocity and dwell rows. A consumer that falls
+    more than ``capacity`` events behind loses the oldest ones; they are
+    counted in ``dropped`` rather than blocking the producer.
+    """
+
+    def __init__(self, bus: "TouchEventBus", name: str, position: int) -> None:
+        self.bus = bus
+        self.name = name
+        self._position = position
+        self.delivered = 0
+        self.dropped = 0
+
+    @property
+    def lag(self) -> int:
+        """Events published but not yet read (may exceed capacity before a read)."""
+        return self.bus._write - self._position
+
+    def skip(self) -> None:
+        """Move to the end of the bus without delivering what was published."""
+        self._position = self.bus._write
+
+    def read(self, max_events: int | None = None) -> np.ndarray:
+        bus = self.bus
+        cap, slots = bus.capacity, bus._slots
+        start = self._position
+        write = bus._write
+        if write - start > cap:
+            self.dropped += write - start - cap
+            start = write - cap
+        end = write if max_events is None else min(write, start + max_events)
+        offset = start % slots
+        batch = bus._data[:, offset : offset + (end - start)].copy()
+
+        # The producer may have lapped us during the copy. The ring has one
+        # spare slot, so the slot being written now never holds a readable event
+        overwritten = bus._write - cap - start
+        if overwritten > 0:
+            overwritten = min(overwritten, end - start)
+            batch = batch[:, overwritten:]
+            self.dropped += overwritten
+
+        self._position = end
+        self.delivered += batch.shape[1]
+        return batch
+
+
+class TouchEventBus:
+    """Fixed-capacity ring of touch samples read through per-consumer cursors.
+
+    A single producer (the render thread) publishes x, y, t, velocity and
+    dwell into a preallocated structure-of-arrays ring; each sample is also
+    written one ring length further on so any window is one contiguous slice.
+    Publishing is O(1) and memory never grows. The narrative updater is the
+    only subscriber; ghost replay and IML take touches directly on the render
+    thread because they must respond within the same frame. No lock is needed:
+    the producer only advances ``_write`` after writing the sample, and a
+    cursor only ever moves itself.
+    """
+
+    X, Y, T, V, DWELL = range(5)
+
+    def __init__(self, capacity: int = TOUCH_BUS_CAPACITY) -> None:
+        self.capacity = capacity
+        self._slots = capacity + 1
+        self._data = np.zeros((5, 2 * self._slots), dtype=np.float64)
+        self._write = 0
+        self._cursors: dict[str, TouchCursor] = {}
+
+    @property
+    def published(self) -> int:
+        """Total events ever published (monotonic)."""
+        return self._write
+
+    def publish(
+        self, x: float, y: float, t: float, velocity: float, dwell: float = 0.0
+    ) -> None:
+        pos = self._write % self._slots
+        sample = (x, y, t, velocity, dwell)
+        self._data[:, pos] = sample
+        self._data[:, pos + self._slots] = sample
+        self._write += 1
+
+    def subscribe(self, name: str) -> TouchCursor:
+        """Cursor for consumer ``name``, starting at the next published event.
+
+        Subscribing again under the same name returns the existing cursor.
+        """
+        cursor = self._cursors.get(name)
+        if cursor is None:
+            cursor = TouchCursor(self, name, self._write)
+            self._cursors[name] = cursor
+        return cursor
+
+    def stats(self) -> dict:
+        """Per-consumer ``{"lag", "delivered", "dropped"}`` counters."""
+        return {
+            name: {
+                "lag": min(cursor.lag, self.capacity),
+                "delivered": cursor.delivered,
+                "dropped": cursor.dropped + max(0, cursor.lag - self.capacity),
+            }
+            for name, cursor in self._cursors.items()
+        }
@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+
+from src.mock_services import MockProfile
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine on a fresh event loop that is closed afterwards."""
+    return asyncio.run
+
+
+@pytest.fixture
+def fast_profile():
+    """Factory for a MockProfile with millisecond latencies; kwargs override."""
+
+    def make(**kwargs) -> MockProfile:
+        params = dict(
+            connect_latency_ms=1.0,
+            lyria_chunk_ms=20.0,
+            lyria_jitter_ms=0.0,
+            gemini_latency_ms=5.0,
+            gemini_jitter_ms=0.0,
+            gemini_fragment_interval_ms=1.0,
+        )
+        params.update(kwargs)
+        return MockProfile(**params)
+
+    return make
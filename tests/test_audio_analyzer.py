@@ -90,3 +90,37 @@ def test_empty_buffer_centroid():
 def test_empty_buffer_rms():
     a = AudioAnalyzer()
     assert a.get_rms() == 0.0
+
+
+def test_feed_returns_frame_count():
+    a = AudioAnalyzer()
+    stereo = np.zeros(1000 * 2, dtype=np.int16).tobytes()
+    assert a.feed(stereo) == 1000
+    assert a.pending_frames == 1000
+
+
+def test_no_new_audio_skips_update():
+    a = AudioAnalyzer()
+    noise = (np.random.randn(4800 * 2) * 10000).astype(np.int16).tobytes()
+    a.feed(noise)
+    assert a.update() is True
+    assert a.update() is False
+    # Less than a hop of new audio keeps the cached spectrum
+    a.feed(noise[: (a.hop_size // 2) * 4])
+    assert a.update() is False
+
+
+def test_ring_matches_rolled_buffer():
+    a = AudioAnalyzer(buffer_size=256, hop_size=64)
+    rng = np.random.default_rng(0)
+    reference = np.zeros(256, dtype=np.float32)
+    for n in (50, 100, 300, 7, 200):
+        mono = (rng.standard_normal(n) * 8000).astype(np.int16)
+        stereo = np.repeat(mono, 2)
+        a.feed(stereo.tobytes())
+        k = min(n, 256)
+        reference = np.roll(reference, -k)
+        reference[-k:] = mono[-k:].astype(np.float32) / 32768.0
+    a.update()
+    ordered = np.concatenate([a._ring[a._write_pos :], a._ring[: a._write_pos]])
+    np.testing.assert_allclose(ordered, reference, atol=1e-6)
@@ -0,0 +1,196 @@
+import numpy as np
+
+from src.audio_ring import (
+    AudioHistory,
+    AudioRingBuffer,
+    JitterBuffer,
+    RingCrossfader,
+)
+
+
+def _pcm(frames: np.ndarray) -> bytes:
+    return (frames * 32768.0).astype(np.int16).tobytes()
+
+
+def test_write_then_read_exact_frames():
+    r = AudioRingBuffer(capacity=16, channels=2)
+    data = np.arange(20, dtype=np.float32).reshape(10, 2) / 64.0
+    assert r.write_pcm16(_pcm(data)) == 10
+    assert r.available == 10
+
+    out = np.empty((4, 2), dtype=np.float32)
+    assert r.read_into(out) == 4
+    np.testing.assert_allclose(out, data[:4], atol=1e-4)
+    assert r.read_into(out) == 4
+    np.testing.assert_allclose(out, data[4:8], atol=1e-4)
+
+
+def test_long_chunk_is_not_truncated():
+    r = AudioRingBuffer(capacity=64, channels=2)
+    data = np.random.uniform(-0.5, 0.5, (30, 2)).astype(np.float32)
+    r.write(data)
+    out = np.empty((10, 2), dtype=np.float32)
+    collected = []
+    for _ in range(3):
+        r.read_into(out)
+        collected.append(out.copy())
+    np.testing.assert_array_equal(np.concatenate(collected), data)
+    assert r.underruns == 0
+
+
+def test_wraparound_preserves_order():
+    r = AudioRingBuffer(capacity=8, channels=1)
+    out = np.empty((5, 1), dtype=np.float32)
+    expected = []
+    got = []
+    for i in range(6):
+        chunk = np.full((5, 1), i, dtype=np.float32)
+        r.write(chunk)
+        expected.append(chunk)
+        r.read_into(out)
+        got.append(out.copy())
+    np.testing.assert_array_equal(np.concatenate(got), np.concatenate(expected))
+
+
+def test_underrun_zero_fills_and_counts():
+    r = AudioRingBuffer(capacity=8, channels=2)
+    r.write(np.ones((3, 2), dtype=np.float32))
+    out = np.full((5, 2), 7.0, dtype=np.float32)
+    assert r.read_into(out) == 3
+    np.testing.assert_array_equal(out[3:], 0.0)
+    assert r.underruns == 1
+    assert r.underrun_frames == 2
+
+
+def test_overrun_drops_excess_and_counts():
+    r = AudioRingBuffer(capacity=8, channels=1)
+    assert r.write(np.ones((6, 1), dtype=np.float32)) == 6
+    assert r.write(np.ones((5, 1), dtype=np.float32)) == 2
+    assert r.overruns == 1
+    assert r.overrun_frames == 3
+    assert r.free == 0
+
+
+def test_latency_ms():
+    r = AudioRingBuffer(capacity=48000, channels=2, sample_rate=48000)
+    r.write_silence(4800)
+    assert r.latency_ms == 100.0
+
+
+def test_jitter_buffer_passthrough_when_not_adaptive():
+    r = AudioRingBuffer(capacity=1000, channels=2)
+    data = np.random.uniform(-0.5, 0.5, (200, 2)).astype(np.float32)
+    r.write(data)
+    jb = JitterBuffer(block_size=50, target_latency_ms=None, channels=2)
+    out = np.empty((50, 2), dtype=np.float32)
+    got = []
+    for _ in range(4):
+        jb.read_into(r, out)
+        got.append(out.copy())
+    np.testing.assert_array_equal(np.concatenate(got), data)
+    assert jb.ratio == 1.0
+
+
+def test_jitter_buffer_speeds_up_when_over_target():
+    sr = 48000
+    r = AudioRingBuffer(capacity=sr * 5, channels=2, sample_rate=sr)
+    r.write_silence(sr * 2)  # 2 s buffered, far above a 100 ms target
+    jb = JitterBuffer(block_size=480, target_latency_ms=100.0, channels=2)
+    out = np.empty((480, 2), dtype=np.float32)
+    for _ in range(jb.adapt_blocks):
+        jb.read_into(r, out)
+    assert jb.ratio > 1.0
+    before = r.available
+    jb.read_into(r, out)
+    assert before - r.available > 480  # consumes more input than it plays
+
+
+def test_jitter_buffer_slows_down_when_under_target():
+    sr = 48000
+    r = AudioRingBuffer(capacity=sr * 5, channels=2, sample_rate=sr)
+    r.write_silence(sr)
+    jb = JitterBuffer(block_size=480, target_latency_ms=1500.0, channels=2)
+    out = np.empty((480, 2), dtype=np.float32)
+    for _ in range(jb.adapt_blocks):
+        jb.read_into(r, out)
+    assert jb.ratio < 1.0
+    before = r.available
+    jb.read_into(r, out)
+    assert before - r.available < 480
+
+
+def test_stretched_read_is_continuous():
+    r = AudioRingBuffer(capacity=10000, channels=1)
+    ramp = np.arange(4000, dtype=np.float32).reshape(-1, 1)
+    r.write(ramp)
+    jb = JitterBuffer(block_size=100, target_latency_ms=None, channels=1)
+    jb.ratio = 1.02
+    out = np.empty((100, 1), dtype=np.float32)
+    got = []
+    for _ in range(5):
+        jb.read_into(r, out)
+        got.append(out.copy())
+    steps = np.diff(np.concatenate(got)[:, 0])
+    assert np.all(steps > 0.9) and np.all(steps < 1.1)
+
+
+def test_history_window_is_contiguous_and_ordered():
+    h = AudioHistory(seconds=1.0, channels=2, sample_rate=100)
+    written = []
+    for i in range(7):
+        chunk = np.arange(i * 30, (i + 1) * 30, dtype=np.int16).repeat(2)
+        h.write_pcm16(chunk.tobytes())
+        written.append(chunk)
+    everything = np.concatenate(written)
+
+    view = h.window(0.5)
+    assert view.contiguous
+    got = np.frombuffer(view, dtype=np.int16)
+    np.testing.assert_array_equal(got, everything[-100:])
+
+    full = np.frombuffer(h.window(5.0), dtype=np.int16)
+    np.testing.assert_array_equal(full, everything[-200:])
+
+
+def test_history_window_before_full():
+    h = AudioHistory(seconds=1.0, channels=1, sample_rate=100)
+    assert len(h.window(1.0)) == 0
+    h.write_pcm16(np.arange(10, dtype=np.int16).tobytes())
+    got = np.frombuffer(h.window(1.0), dtype=np.int16)
+    np.testing.assert_array_equal(got, np.arange(10))
+
+
+def test_crossfade_blends_old_ring_out_over_fade():
+    old = AudioRingBuffer(1000, channels=1)
+    old.write(np.ones((1000, 1), dtype=np.float32))
+    fader = RingCrossfader(block_size=100, fade_frames=250, channels=1)
+    fader.start(old)
+
+    blocks = []
+    for _ in range(4):
+        out = np.zeros((100, 1), dtype=np.float32)  # new stream is silent
+        fader.mix_into(out)
+        blocks.append(out[:, 0].copy())
+    curve = np.concatenate(blocks)
+    # Old stream fades monotonically from ~1 to 0, then is released
+    assert curve[0] > 0.99
+    assert np.all(np.diff(curve[:250]) <= 0)
+    assert np.all(curve[250:] == 0.0)
+    assert not fader.active
+    assert old.available == 1000 - 250
+
+
+def test_crossfade_is_equal_power():
+    old = AudioRingBuffer(500, channels=1)
+    old.write(np.ones((500, 1), dtype=np.float32))
+    fader = RingCrossfader(block_size=200, fade_frames=200, channels=1)
+    fader.start(old)
+    out = np.zeros((200, 1), dtype=np.float32)
+    fader.mix_into(out)
+    gain_out = out[:, 0]
+    out = np.ones((200, 1), dtype=np.float32)
+    fader2 = RingCrossfader(block_size=200, fade_frames=200, channels=1)
+    fader2.start(AudioRingBuffer(10, channels=1))  # empty: old side is silent
+    fader2.mix_into(out)
+    gain_in = out[:, 0]
+    np.testing.assert_allclose(gain_in**2 + gain_out**2, 1.0, atol=1e-5)
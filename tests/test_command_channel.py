@@ -0,0 +1,110 @@
+import asyncio
+import threading
+
+from src.command_channel import LyriaCommandChannel
+from src.lyria_client import ConfigCoalescer
+
+
+class FakeLyria:
+    def __init__(self):
+        self.staged = []
+        self.flushes = 0
+
+    def stage_params(self, **params):
+        self.staged.append(params)
+
+    async def flush(self):
+        self.flushes += 1
+
+
+def test_last_write_wins_within_one_dispatch(run):
+    async def scenario():
+        lyria = FakeLyria()
+        channel = LyriaCommandChannel(asyncio.get_running_loop(), lyria, 20.0)
+        channel.post(mute_drums=True)
+        channel.post(mute_drums=False, density=0.4)
+        task = asyncio.ensure_future(channel.run())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        return lyria
+
+    lyria = run(scenario())
+    assert lyria.staged == [{"mute_drums": False, "density": 0.4}]
+    assert lyria.flushes == 1
+
+
+def test_flood_from_render_thread_is_rate_limited(run):
+    async def scenario():
+        lyria = FakeLyria()
+        channel = LyriaCommandChannel(asyncio.get_running_loop(), lyria, 10.0)
+        task = asyncio.ensure_future(channel.run())
+
+        def render_thread():
+            for i in range(600):
+                channel.post(density=i / 600)
+
+        t = threading.Thread(target=render_thread)
+        t.start()
+        while t.is_alive():
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.25)
+        task.cancel()
+        return lyria, channel
+
+    lyria, channel = run(scenario())
+    assert channel.posted == 600
+    assert 1 <= lyria.flushes <= 5
+    assert lyria.staged[-1] == {"density": 599 / 600}
+
+
+class CoalescingLyria:
+    """Sends through a ConfigCoalescer, like LyriaClient.flush()."""
+
+    def __init__(self):
+        self.state = ConfigCoalescer({"mute_drums": False}, [])
+        self.state.mark_config_sent({"mute_drums": False})
+        self.sent = []
+
+    def stage_params(self, **params):
+        self.state.stage(**params)
+
+    async def flush(self):
+        config = self.state.config_to_send()
+        if config is not None:
+            self.sent.append(config["mute_drums"])
+            self.state.mark_config_sent(config)
+
+
+def test_repeated_value_is_suppressed_by_the_coalescer(run):
+    async def scenario():
+        lyria = CoalescingLyria()
+        channel = LyriaCommandChannel(asyncio.get_running_loop(), lyria, 50.0)
+        task = asyncio.ensure_future(channel.run())
+        channel.post(mute_drums=True)
+        await asyncio.sleep(0.05)
+        for _ in range(60):
+            channel.post(mute_drums=True)
+        await asyncio.sleep(0.05)
+        task.cancel()
+        return lyria
+
+    lyria = run(scenario())
+    assert lyria.sent == [True]
+    assert lyria.state.config_suppressed >= 1
+
+
+def test_value_is_resent_after_another_writer_changed_it(run):
+    async def scenario():
+        lyria = CoalescingLyria()
+        channel = LyriaCommandChannel(asyncio.get_running_loop(), lyria, 50.0)
+        task = asyncio.ensure_future(channel.run())
+        channel.post(mute_drums=True)  # ghost IMMINENT
+        await asyncio.sleep(0.05)
+        lyria.stage_params(mute_drums=False)  # feedback loop, not via the channel
+        await lyria.flush()
+        channel.post(mute_drums=True)
+        await asyncio.sleep(0.05)
+        task.cancel()
+        return lyria
+
+    assert run(scenario()).sent == [True, False, True]
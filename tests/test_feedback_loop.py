@@ -0,0 +1,30 @@
+from src.feedback_loop import FeedbackLoop
+from src.lyria_client import LyriaClient
+from src.mock_services import MockGenaiClient, mock_types
+from src.shared_state import SharedState
+
+
+def test_gemini_prompts_reach_lyria_over_state_prompts(run, fast_profile):
+    gemini_prompts = [{"text": "Low drone, distant bells", "weight": 0.9}]
+
+    async def scenario():
+        shared = SharedState()
+        client = MockGenaiClient(fast_profile())
+        lyria = LyriaClient(shared, client=client, types=mock_types)
+        await lyria.connect()
+        feedback = FeedbackLoop(shared, lyria, gemini=None, narrative=None)
+        try:
+            shared.gemini_action.put_nowait(
+                {"lyria_prompts": gemini_prompts, "density": 0.3}
+            )
+            await feedback.step()
+            after_gemini = [p.text for p in client.sessions[0].prompts]
+            await feedback.step()  # no action: back to the state prompts
+            after_state = [p.text for p in client.sessions[0].prompts]
+        finally:
+            await lyria.close()
+        return after_gemini, after_state
+
+    after_gemini, after_state = run(scenario())
+    assert after_gemini == ["Low drone, distant bells"]
+    assert after_state[0] == "Ethereal Ambience"
@@ -0,0 +1,60 @@
+import time
+
+import numpy as np
+
+from src.frame_capture import (
+    FrameChangeGate,
+    FrameEncoder,
+    encode_jpeg,
+    frame_signature,
+)
+from src.shared_state import SharedState
+
+
+def test_encode_jpeg_drops_alpha():
+    pixels = np.random.rand(27, 48, 4).astype(np.float32)
+    jpeg = encode_jpeg(pixels)
+    assert jpeg[:2] == b"\xff\xd8"
+
+
+def test_encoder_publishes_frame():
+    s = SharedState()
+    enc = FrameEncoder(s)
+    enc.start()
+    try:
+        enc.submit(np.zeros((27, 48, 3), dtype=np.float32))
+        deadline = time.monotonic() + 2.0
+        while s.frame_version == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        enc.stop()
+    assert s.frame_version == 1
+    assert s.latest_jpeg_frame[:2] == b"\xff\xd8"
+
+
+def test_frame_signature_averages_luminance_blocks():
+    pixels = np.zeros((18, 32, 4), dtype=np.float32)
+    pixels[:9, :, :3] = 1.0
+    sig = frame_signature(pixels, grid=(2, 4))
+    assert sig.shape == (2, 4)
+    np.testing.assert_allclose(sig[0], 1.0, rtol=1e-5)
+    np.testing.assert_allclose(sig[1], 0.0)
+
+
+def test_change_gate_skips_similar_frames():
+    gate = FrameChangeGate(threshold=0.05, max_staleness=10.0)
+    base = np.full((9, 16), 0.5, dtype=np.float32)
+    assert gate.should_send(base, now=0.0) is True
+    assert gate.should_send(base + 0.01, now=1.0) is False
+    assert gate.should_send(base + 0.2, now=2.0) is True
+    assert gate.skip_rate == 1 / 3
+
+
+def test_change_gate_forces_send_after_max_staleness():
+    gate = FrameChangeGate(threshold=0.05, max_staleness=5.0)
+    base = np.zeros((9, 16), dtype=np.float32)
+    assert gate.should_send(base, now=0.0) is True
+    assert gate.should_send(base, now=4.0) is False
+    assert gate.should_send(base, now=5.0) is True
+    # Frames without a signature are never held back
+    assert gate.should_send(None, now=5.1) is True
@@ -0,0 +1,165 @@
+import asyncio
+import time
+
+import src.gemini_client as gemini_client
+from src.gemini_client import GeminiClient
+from src.mock_services import MockGenaiClient, MockProfile, mock_types
+from src.shared_state import SharedState
+
+
+def _client(profile: MockProfile) -> GeminiClient:
+    return GeminiClient(
+        SharedState(), client=MockGenaiClient(profile), types=mock_types
+    )
+
+
+class _FailingSession:
+    """Session whose receive stream raises (or ends) without ever suspending."""
+
+    def __init__(self, error: Exception | None):
+        self.error = error
+        self.calls = 0
+
+    async def send_client_content(self, turns):
+        pass
+
+    async def receive(self):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return
+        yield
+
+
+def _inflight(gemini: GeminiClient, count: int, sent_at: float) -> None:
+    for _ in range(count):
+        gemini._sent_seq += 1
+        gemini._inflight.append((gemini._sent_seq, sent_at))
+
+
+def test_responses_match_inflight_in_order_and_drop_stale(fast_profile):
+    gemini = _client(fast_profile())
+    now = time.monotonic()
+    _inflight(gemini, 2, now - 1.0)
+
+    gemini._complete_observation({"density": 0.1}, now)  # answers observation 1
+    assert gemini.pipeline_stats["stale"] == 1
+    assert gemini.shared_state.gemini_action.empty()
+    assert [seq for seq, _ in gemini._inflight] == [2]
+
+    gemini._complete_observation({"density": 0.2}, now)  # answers the latest
+    assert gemini.pipeline_stats["delivered"] == 1
+    assert gemini.shared_state.gemini_action.get_nowait() == {"density": 0.2}
+    assert not gemini._inflight
+    assert gemini._latency_ewma < gemini_client.GEMINI_LOOP_INTERVAL
+
+    gemini._complete_observation(None, now)
+    assert gemini.pipeline_stats["empty"] == 1
+
+
+def test_unanswered_observations_expire(fast_profile):
+    gemini = _client(fast_profile())
+    now = time.monotonic()
+    _inflight(gemini, 1, now - gemini_client.GEMINI_RESPONSE_TIMEOUT - 1.0)
+    _inflight(gemini, 1, now)
+
+    gemini._expire_inflight(now)
+    assert gemini.pipeline_stats["timed_out"] == 1
+    assert [seq for seq, _ in gemini._inflight] == [2]
+
+
+def test_receiver_delivers_latest_of_pipelined_observations(run, fast_profile):
+    async def scenario():
+        gemini = _client(fast_profile())
+        await gemini.connect("system prompt")
+        receiver = asyncio.create_task(gemini._receive_loop())
+        try:
+            for _ in range(2):
+                await gemini.send_text("Observe and respond with JSON.")
+                _inflight(gemini, 1, time.monotonic())
+            deadline = time.monotonic() + 2.0
+            while gemini._inflight and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+        finally:
+            receiver.cancel()
+            await gemini.close()
+        return gemini.pipeline_stats
+
+    stats = run(scenario())
+    assert stats == {"sent": 0, "delivered": 1, "stale": 1, "empty": 0, "timed_out": 0}
+
+
+def test_receive_errors_back_off_and_stop_when_session_closes(
+    monkeypatch, run, fast_profile
+):
+    monkeypatch.setattr(gemini_client, "GEMINI_MIN_INTERVAL", 0.01)
+    monkeypatch.setattr(gemini_client, "GEMINI_MAX_INTERVAL", 0.04)
+
+    async def scenario(session):
+        gemini = _client(fast_profile())
+        gemini.session = session
+        receiver = asyncio.create_task(gemini._receive_loop())
+        ticks = 0
+        for _ in range(10):  # the event loop keeps running while it retries
+            await asyncio.sleep(0.01)
+            ticks += 1
+        gemini.session = None
+        await asyncio.wait_for(receiver, timeout=1.0)
+        return ticks
+
+    for session in (_FailingSession(ConnectionError("closed")), _FailingSession(None)):
+        assert run(scenario(session)) == 10
+        assert 1 <= session.calls <= 6  # backed off 10, 20, 40, 40 ms...
+
+
+def test_failing_receive_stream_marks_session_down(monkeypatch, run, fast_profile):
+    monkeypatch.setattr(gemini_client, "GEMINI_MIN_INTERVAL", 0.01)
+    monkeypatch.setattr(gemini_client, "GEMINI_MAX_CONSECUTIVE_ERRORS", 3)
+
+    async def no_frame():
+        return None, None
+
+    async def scenario():
+        gemini = _client(fast_profile())
+        gemini.session = _FailingSession(ConnectionError("stream reset"))
+        gemini.connected = gemini.shared_state.gemini_connected = True
+        gemini.fetch_frame = no_frame
+        # Sends keep succeeding; only the dead receive stream can stop the loop
+        await asyncio.wait_for(
+            gemini.gemini_pipelined_loop(None, lambda seconds: b""), timeout=2.0
+        )
+        return gemini
+
+    gemini = run(scenario())
+    assert gemini.session.calls == 3
+    assert not gemini.connected and not gemini.shared_state.gemini_connected
+
+
+def test_reconnect_starts_a_fresh_pipeline(run, fast_profile):
+    async def no_frame():
+        return None, None
+
+    async def scenario():
+        gemini = _client(fast_profile())
+        await gemini.connect("system prompt")
+        # The dead session's observations, never answered
+        _inflight(gemini, gemini_client.GEMINI_MAX_INFLIGHT, time.monotonic())
+        gemini._latency_ewma = gemini_client.GEMINI_RESPONSE_TIMEOUT
+        await gemini.close()
+
+        await gemini.connect("system prompt")
+        gemini.fetch_frame = no_frame
+        loop = asyncio.create_task(
+            gemini.gemini_pipelined_loop(None, lambda seconds: b"")
+        )
+        deadline = time.monotonic() + 2.0
+        while not gemini.pipeline_stats["delivered"] and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        loop.cancel()
+        await gemini.close()
+        return gemini
+
+    gemini = run(scenario())
+    assert gemini.pipeline_stats["delivered"] == 1
+    assert gemini.pipeline_stats["stale"] == 0
+    assert gemini._latency_ewma < gemini_client.GEMINI_RESPONSE_TIMEOUT
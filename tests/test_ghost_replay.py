@@ -95,3 +95,58 @@ def test_record_touch_increments_count():
     g = GhostReplay()
     g.record_touch(50, 50)
     assert g.touch_count == 1
+
+
+def test_path_store_simplifies_and_round_trips():
+    from src.ghost_replay import GhostPathStore
+
+    store = GhostPathStore(capacity=64, keyframe_interval=4, min_distance=5)
+    kept = []
+    for i in range(30):
+        x, y = 100 + 3 * i, 200 - 2 * i
+        if store.add(x, y, now=i * 0.016):
+            kept.append((x, y))
+    # 3-4 px steps: roughly every other touch survives simplification
+    assert store.received == 30 and len(store) == len(kept) < 20
+    pts, starts = store.points()
+    assert pts.tolist() == [list(p) for p in kept]
+    assert starts.tolist() == [True] + [False] * (len(kept) - 1)
+
+
+def test_path_store_memory_is_fixed_and_drops_oldest_blocks():
+    from src.ghost_replay import GhostPathStore
+
+    store = GhostPathStore(capacity=32, keyframe_interval=8, min_distance=0)
+    nbytes = store._xy.nbytes + store._flags.nbytes
+    for i in range(1000):
+        store.add(i % 1900, (7 * i) % 1000, now=i * 0.016)
+    assert 32 - 8 < len(store) <= 32
+    assert store._xy.nbytes + store._flags.nbytes == nbytes
+    pts, _ = store.points()
+    assert pts[-1].tolist() == [999 % 1900, (7 * 999) % 1000]
+
+
+def test_take_segments_joins_points_within_strokes():
+    from src.ghost_replay import GhostPathStore
+
+    store = GhostPathStore(capacity=64, keyframe_interval=3, min_distance=0)
+    for i in range(5):
+        store.add(10 * i, 0, now=i * 0.01)
+    first = store.take_segments()
+    assert first.tolist()[0] == [0, 0, 0, 0]  # stroke start is a dot
+    assert first.tolist()[1:] == [[10 * (i - 1), 0, 10 * i, 0] for i in range(1, 5)]
+
+    store.add(50, 0, now=0.05)
+    store.add(500, 500, now=5.0)  # after a pause: a new stroke
+    assert store.take_segments().tolist() == [[40, 0, 50, 0], [500, 500, 500, 500]]
+    assert store.pending == 0 and len(store.take_segments()) == 0
+
+
+def test_take_segments_batches_until_stroke_ends():
+    g = GhostReplay()
+    g.record_touch(100, 100)
+    assert g.take_segments() is None
+    assert g.take_segments(force=True).shape == (1, 4)
+    g.record_touch(200, 100)
+    g.paths._last_time -= 1.0  # stroke ended a second ago
+    assert g.take_segments().shape == (1, 4)
@@ -0,0 +1,109 @@
+import numpy as np
+
+from src.config import TARGET_FPS
+from src.iml_manager import IMLManager
+
+
+class RecordingEngine:
+    def __init__(self):
+        self.boids = None
+        self.physarum = None
+
+    def set_boids_params(self, separation, alignment, cohesion):
+        self.boids = (separation, alignment, cohesion)
+
+    def set_physarum_params(self, sense_angle, sense_dist, move_dist):
+        self.physarum = (sense_angle, sense_dist, move_dist)
+
+
+class CountingEngine:
+    def __init__(self):
+        self.calls = 0
+
+    def set_boids_params(self, *params):
+        self.calls += 1
+
+    def set_physarum_params(self, *params):
+        pass
+
+
+def test_apply_without_pairs_leaves_engine_alone():
+    iml = IMLManager(seed=0)
+    engine = RecordingEngine()
+    iml.update([0.5, 0.5, 0.0, 0.0])
+    assert iml.get_n_pairs() == 1
+    iml.clear()
+    iml.apply(engine)
+    assert engine.boids is None and iml.get_n_pairs() == 0
+
+
+def test_update_throttles_then_apply_sets_params():
+    iml = IMLManager(seed=0)
+    engine = RecordingEngine()
+    iml.update([0.2, 0.2, 0.1, 0.0])
+    iml.update([0.9, 0.9, 0.1, 0.0])  # within IML_INTERVAL: not added
+    assert iml.get_n_pairs() == 1
+    iml.apply(engine)
+    assert len(engine.boids) == 3 and len(engine.physarum) == 3
+    assert all(0.0 <= v <= 1.0 for v in engine.boids + engine.physarum)
+
+
+def _two_pair_manager():
+    iml = IMLManager(seed=0)
+    iml.update([0.2, 0.2, 0.1, 0.0])
+    iml._last_add_time = 0.0
+    iml.update([0.8, 0.8, 0.1, 0.0])
+    return iml
+
+
+def test_lag_is_a_per_frame_exponential_smoother():
+    iml = _two_pair_manager()
+    iml._input = [0.2, 0.2, 0.1, 0.0]
+    first = iml.predict(dt=1 / TARGET_FPS)["touch2boids"].copy()
+    iml._input = [0.8, 0.8, 0.1, 0.0]
+    target = iml.targets()[:3]
+    one_frame = iml.predict(dt=1 / TARGET_FPS)["touch2boids"].copy()
+    np.testing.assert_allclose(one_frame, 0.4 * first + 0.6 * target)
+    # Two frames' time at once decays like two single frames
+    two_frames = iml.predict(dt=2 / TARGET_FPS)["touch2boids"]
+    np.testing.assert_allclose(two_frames, target + 0.4**2 * (one_frame - target))
+
+
+def test_predictions_cached_by_quantized_input_until_training_changes():
+    iml = _two_pair_manager()
+    iml._input = [0.5, 0.5, 0.1, 0.0]
+    first = iml.targets()
+    iml._input = [0.501, 0.499, 0.1, 0.0]  # same cache cell
+    assert iml.targets() is first
+    assert iml.cache_info().hits == 1 and iml.cache_info().misses == 1
+
+    iml._last_add_time = 0.0
+    iml.update([0.1, 0.9, 0.3, 0.0])  # new pair: cache invalidated
+    iml._input = [0.5, 0.5, 0.1, 0.0]
+    assert iml.targets() is not first
+    assert iml.cache_info().misses == 1
+
+
+def test_settled_outputs_are_not_resent():
+    iml = _two_pair_manager()
+    engine = CountingEngine()
+    iml.apply(engine)
+    assert engine.calls == 1
+    iml._input = [0.2, 0.2, 0.1, 0.0]  # jump: smoothed over the next frames
+    for _ in range(60):
+        iml._last_predict -= 1 / TARGET_FPS
+        iml.apply(engine)
+    # Converges within a few dozen frames, then stops pushing
+    assert 3 < engine.calls < 40
+    calls = engine.calls
+    iml.apply(engine)
+    assert engine.calls == calls
+
+
+def test_switches_to_softmax_at_twenty_pairs():
+    iml = IMLManager(seed=0)
+    for i in range(20):
+        iml._last_add_time = 0.0
+        iml.update([i / 10, 0.5, 0.0, 0.0])
+    assert iml.get_n_pairs() == 20
+    assert iml._model.interpolation == "Softmax"
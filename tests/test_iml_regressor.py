@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from src.iml_regressor import IMLRegressor
+
+
+def _filled(n=20, capacity=20, seed=0, **kwargs):
+    rng = np.random.default_rng(seed)
+    reg = IMLRegressor(4, 3, capacity=capacity, rng=rng, **kwargs)
+    for x in rng.random((n, 4)):
+        reg.add(x)
+    return reg, rng
+
+
+def _brute_force_distances(reg):
+    x = reg._inputs[: len(reg)]
+    return np.sqrt(((x[:, None] - x[None]) ** 2).sum(axis=-1))
+
+
+def test_distance_cache_tracks_adds_and_evictions():
+    reg, rng = _filled(n=10, capacity=16)
+    for step in range(200):
+        reg.add(rng.random(4))
+        if step % 5 == 0:
+            reg.remove_oldest(3)
+        dist = _brute_force_distances(reg)
+        np.testing.assert_allclose(reg._dist[: len(reg), : len(reg)], dist)
+        np.fill_diagonal(dist, np.inf)
+        assert np.isclose(reg.scale, dist.min(axis=1).mean())
+    assert len(reg) <= 16
+
+
+def test_full_regressor_evicts_oldest_pair():
+    reg = IMLRegressor(4, 3, capacity=3)
+    for i in range(5):
+        reg.add([float(i)] * 4, [i / 10] * 3)
+    assert len(reg) == 3
+    assert sorted(reg._inputs[:3, 0].tolist()) == [2.0, 3.0, 4.0]
+
+
+def test_interpolations_hit_training_outputs():
+    reg, _ = _filled()
+    inputs, outputs = reg._inputs[:20], reg._outputs[:20]
+    reg.interpolation = "Ripple"
+    np.testing.assert_allclose(reg.predict(inputs), outputs, atol=1e-6)
+    reg.interpolation = "RBF"
+    np.testing.assert_allclose(reg.predict(inputs), outputs, atol=0.02)
+    reg.interpolation = "Softmax"
+    out = reg.predict(inputs)
+    assert out.shape == (20, 3) and ((out >= 0) & (out <= 1)).all()
+
+
+def test_batch_predict_matches_single_calls():
+    reg, rng = _filled()
+    queries = rng.random((7, 4))
+    for name in ("Ripple", "Softmax", "RBF"):
+        reg.interpolation = name
+        batch = reg.predict(queries)
+        single = np.array([reg.predict(q) for q in queries])
+        np.testing.assert_allclose(batch, single)
+
+
+def test_version_changes_with_training_set():
+    reg = IMLRegressor(4, 3)
+    assert reg.predict([0.5] * 4) is None
+    v = reg.version
+    reg.add([0.5] * 4)
+    assert reg.version > v
+    v = reg.version
+    reg.clear()
+    assert reg.version > v and len(reg) == 0
+
+
+def test_unknown_interpolation_rejected():
+    with pytest.raises(ValueError):
+        IMLRegressor(4, 3, interpolation="Nearest")
@@ -0,0 +1,75 @@
+import json
+
+from src.json_stream import StreamingJSONParser, validate_schema
+from src.prompts import RESPONSE_SCHEMA
+
+ACTION = {
+    "lyria_prompts": [{"text": "warm pads {soft}", "weight": 1.0}],
+    "density": 0.4,
+    "brightness": 0.6,
+    "reasoning": 'calm "quiet" scene \\ slow',
+}
+
+
+def test_whole_object_in_one_fragment():
+    parser = StreamingJSONParser()
+    assert parser.feed(json.dumps(ACTION)) == ACTION
+    assert parser.fragments == 1
+
+
+def test_object_split_at_every_character():
+    text = "Here you go:\n```json\n" + json.dumps(ACTION) + "\n```"
+    parser = StreamingJSONParser()
+    results = [parser.feed(ch) for ch in text]
+    emitted = [r for r in results if r is not None]
+    assert emitted == [ACTION]
+    # Emitted the moment the closing brace arrived, not at the end of the text
+    assert results.index(ACTION) == text.index("\n```", 20) - 1
+
+
+def test_braces_and_escapes_inside_strings_are_ignored():
+    action = dict(ACTION, reasoning='ends with \\" and } and {')
+    text = json.dumps(action)
+    parser = StreamingJSONParser()
+    split = text.index("\\")
+    assert parser.feed(text[: split + 1]) is None
+    assert parser.feed(text[split + 1 :]) == action
+
+
+def test_invalid_candidates_are_rejected_and_scanning_continues():
+    bad_range = dict(ACTION, density=1.5)
+    missing = {k: v for k, v in ACTION.items() if k != "reasoning"}
+    text = json.dumps(bad_range) + json.dumps(missing) + json.dumps(ACTION)
+    parser = StreamingJSONParser()
+    assert parser.feed(text) == ACTION
+    assert parser.turn_rejections == ["range:$.density", "missing:$.reasoning"]
+    assert parser.rejections == {"range:$.density": 1, "missing:$.reasoning": 1}
+
+
+def test_malformed_json_is_reported():
+    parser = StreamingJSONParser()
+    assert parser.feed("{density: 0.4}") is None
+    assert parser.turn_rejections == ["json_error"]
+
+
+def test_only_first_valid_object_per_turn():
+    parser = StreamingJSONParser()
+    assert parser.feed(json.dumps(ACTION)) == ACTION
+    assert parser.feed(json.dumps(ACTION)) is None
+    parser.reset()
+    assert parser.feed(json.dumps(ACTION)) == ACTION
+    assert parser.accepted == 2
+    assert parser.total_fragments == 3
+
+
+def test_validate_schema_types():
+    assert validate_schema(ACTION, RESPONSE_SCHEMA) is None
+    assert validate_schema(dict(ACTION, density=True), RESPONSE_SCHEMA) == (
+        "type:$.density"
+    )
+    too_many = dict(ACTION, lyria_prompts=ACTION["lyria_prompts"] * 4)
+    assert validate_schema(too_many, RESPONSE_SCHEMA) == "max_items:$.lyria_prompts"
+    bad_item = dict(ACTION, lyria_prompts=[{"text": 3}])
+    assert validate_schema(bad_item, RESPONSE_SCHEMA) == (
+        "type:$.lyria_prompts[0].text"
+    )
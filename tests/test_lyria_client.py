@@ -0,0 +1,107 @@
+from src.lyria_client import ConfigCoalescer
+
+
+def _coalescer():
+    return ConfigCoalescer(
+        config={"density": 0.2, "brightness": 0.3, "mute_drums": True},
+        prompts=[{"text": "Ethereal Ambience", "weight": 1.0}],
+        epsilon=0.01,
+    )
+
+
+def _send_all(c):
+    config = c.config_to_send()
+    if config is not None:
+        c.mark_config_sent(config)
+    prompts = c.prompts_to_send()
+    if prompts is not None:
+        c.mark_prompts_sent(prompts)
+    return config, prompts
+
+
+def test_first_flush_sends_everything():
+    c = _coalescer()
+    config, prompts = _send_all(c)
+    assert config == {"density": 0.2, "brightness": 0.3, "mute_drums": True}
+    assert prompts == [{"text": "Ethereal Ambience", "weight": 1.0}]
+
+
+def test_staged_updates_merge_into_one_write():
+    c = _coalescer()
+    _send_all(c)
+    c.stage(density=0.5)
+    c.stage(brightness=0.6)
+    c.stage(mute_drums=False)
+    config, _ = _send_all(c)
+    assert config == {"density": 0.5, "brightness": 0.6, "mute_drums": False}
+    assert c.config_sent == 2
+
+
+def test_changes_within_epsilon_are_suppressed():
+    c = _coalescer()
+    _send_all(c)
+    c.stage(density=0.205)
+    config, _ = _send_all(c)
+    assert config is None
+    assert c.config_suppressed == 1
+    # Drift accumulates against the last *sent* value
+    c.stage(density=0.215)
+    config, _ = _send_all(c)
+    assert config["density"] == 0.215
+
+
+def test_flag_change_is_never_suppressed():
+    c = _coalescer()
+    _send_all(c)
+    c.stage(mute_drums=False)
+    config, _ = _send_all(c)
+    assert config is not None
+
+
+def test_identical_prompts_are_deduped():
+    c = _coalescer()
+    _send_all(c)
+    c.stage_prompts([{"text": "Ethereal Ambience", "weight": 1.0}])
+    _, prompts = _send_all(c)
+    assert prompts is None
+    assert c.prompts_suppressed == 1
+    c.stage_prompts([{"text": "Scattered rain", "weight": 0.7}])
+    _, prompts = _send_all(c)
+    assert prompts == [{"text": "Scattered rain", "weight": 0.7}]
+
+
+def test_nothing_staged_sends_nothing():
+    c = _coalescer()
+    _send_all(c)
+    assert _send_all(c) == (None, None)
+    assert c.config_suppressed == 0
+
+
+def test_invalidate_resends_after_reconnect():
+    c = _coalescer()
+    _send_all(c)
+    c.invalidate()
+    config, prompts = _send_all(c)
+    assert config is not None and prompts is not None
+
+
+def test_failed_write_is_retried_on_next_flush():
+    c = _coalescer()
+    _send_all(c)
+    c.stage(density=0.8)
+    assert c.config_to_send() is not None
+    c.mark_config_unsent()  # set_music_generation_config raised
+    config, _ = _send_all(c)
+    assert config["density"] == 0.8
+    assert _send_all(c) == (None, None)
+
+
+def test_change_staged_during_a_write_is_kept():
+    c = _coalescer()
+    _send_all(c)
+    c.stage(density=0.5)
+    config = c.config_to_send()
+    c.stage(brightness=0.9)  # staged while the write is in flight
+    c.mark_config_sent(config)
+    config, _ = _send_all(c)
+    assert config["brightness"] == 0.9
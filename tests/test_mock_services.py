@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from src.gemini_client import GeminiClient
+from src.lyria_client import LyriaClient
+from src.mock_services import MockGenaiClient, MockLyriaSession, mock_types
+from src.shared_state import SharedState
+
+
+def test_lyria_client_streams_mock_audio_into_ring(run, fast_profile):
+    async def scenario():
+        shared = SharedState()
+        client = MockGenaiClient(fast_profile())
+        lyria = LyriaClient(shared, client=client, types=mock_types)
+        await lyria.connect()
+        try:
+            await asyncio.sleep(0.15)
+            session = client.sessions[0]
+            assert session.playing
+            assert session.config["density"] == lyria._state.config["density"]
+            assert session.prompts[0].text == "Ethereal Ambience"
+            assert shared.audio_ring.available > 0
+            assert len(lyria.get_audio_window(0.05)) > 0
+            assert lyria.is_healthy()
+        finally:
+            await lyria.close()
+        assert session.closed
+        assert not lyria.is_healthy()
+
+    run(scenario())
+
+
+def test_lyria_rotation_swaps_rings_and_closes_old_session(run, fast_profile):
+    async def scenario():
+        shared = SharedState()
+        client = MockGenaiClient(fast_profile(lyria_realtime=False))
+        lyria = LyriaClient(shared, client=client, types=mock_types)
+        await lyria.connect()
+        old_ring = shared.audio_ring
+        try:
+            assert await lyria.rotate()
+            assert shared.audio_ring is not old_ring
+            assert client.sessions[0].closed
+            assert lyria.session is client.sessions[1]
+            assert lyria.rotation_stats["rotations"] == 1
+        finally:
+            await lyria.close()
+
+    run(scenario())
+
+
+def test_connect_failure_injection(run, fast_profile):
+    async def scenario():
+        client = MockGenaiClient(fast_profile(connect_failure_rate=1.0))
+        lyria = LyriaClient(SharedState(), client=client, types=mock_types)
+        with pytest.raises(ConnectionError):
+            await lyria.connect()
+        assert not lyria.connected
+
+    run(scenario())
+
+
+def test_failed_priming_closes_the_opened_session(monkeypatch, run, fast_profile):
+    async def refuse_play(self):
+        raise ConnectionError("play refused")
+
+    monkeypatch.setattr(MockLyriaSession, "play", refuse_play)
+
+    async def scenario():
+        client = MockGenaiClient(fast_profile())
+        lyria = LyriaClient(SharedState(), client=client, types=mock_types)
+        for _ in range(2):  # as the supervisor retries restart()
+            with pytest.raises(ConnectionError):
+                await lyria.restart()
+        return client.sessions
+
+    sessions = run(scenario())
+    assert len(sessions) == 2 and all(s.closed for s in sessions)
+
+
+def test_gemini_receives_fragmented_action(run, fast_profile):
+    async def scenario():
+        shared = SharedState()
+        profile = fast_profile(gemini_fragments=6, gemini_invalid_rate=1.0)
+        gemini = GeminiClient(shared, client=MockGenaiClient(profile), types=mock_types)
+        await gemini.connect("system prompt")
+        await gemini.send_text("Observe and respond with JSON.")
+        delivered = []
+        action = await gemini.receive_action(on_action=delivered.append)
+        assert delivered == [action]
+        assert 0.0 <= action["density"] <= 1.0
+        assert gemini._parser.turn_rejections == ["range:$.density"]
+        await gemini.close()
+
+    run(scenario())
+
+
+def test_mock_responses_are_reproducible(run, fast_profile):
+    async def responses(seed):
+        gemini = GeminiClient(
+            SharedState(),
+            client=MockGenaiClient(fast_profile(seed=seed)),
+            types=mock_types,
+        )
+        await gemini.connect("system prompt")
+        actions = []
+        for _ in range(3):
+            await gemini.send_text("Observe and respond with JSON.")
+            actions.append(await gemini.receive_action())
+        return actions
+
+    assert run(responses(7)) == run(responses(7))
+    assert run(responses(7)) != run(responses(8))
@@ -1,5 +1,9 @@
+import math
 import time
-from src.narrative_manager import SessionNarrativeManager
+
+import numpy as np
+
+from src.narrative_manager import SessionNarrativeManager, TouchHistory
 
 
 def test_initial_narrative():
@@ -66,6 +70,8 @@ def test_reset_clears_touch_history():
     for i in range(5):
         m.record_touch(float(i) / 10, float(i) / 10, time.time(), 0.3)
     m.reset()
+    assert m.take_reset() and not m.take_reset()
+    assert len(m._touch_history) == 0
     # After reset, update with n_pairs=0 should still show virgin
     m.update(n_pairs=0)
     assert "virgin" in m.get()
@@ -100,3 +106,84 @@ def test_adaptation_boundary_evolved():
     m = SessionNarrativeManager()
     m.update(n_pairs=30)
     assert "evolved" in m.get()
+
+
+def test_touch_history_evicts_by_time():
+    h = TouchHistory(window=10.0, capacity=100)
+    for t in range(30):
+        h.append(0.1 * (t % 10), 0.5, float(t), 1.0)
+    t = h.columns()[TouchHistory.T]
+    # Samples with t <= 29 - 10 are gone
+    np.testing.assert_array_equal(t, np.arange(20.0, 30.0))
+    assert len(h) == 10
+
+
+def test_touch_history_wraps_contiguously_and_drops_oldest_when_full():
+    h = TouchHistory(window=1e9, capacity=8)
+    for i in range(21):
+        h.append(float(i), 0.0, float(i), 0.0)
+    x = h.columns()[TouchHistory.X]
+    np.testing.assert_array_equal(x, np.arange(13.0, 21.0))
+    h.clear()
+    assert len(h) == 0 and h.columns().shape == (5, 0)
+
+
+def test_dominant_region_and_speed_from_history():
+    m = SessionNarrativeManager()
+    now = time.time()
+    for i in range(20):
+        m.record_touch(0.1, 0.9, now + i * 0.01, 0.4)
+    state = m._compute_state(n_pairs=0)
+    assert state.dominant_region == "upper-left"
+    assert abs(state.avg_speed - 0.4) < 1e-9
+    assert state.pattern_type in ("linear", "radial", "circular")
+
+
+def test_running_aggregates_match_window_after_eviction():
+    rng = np.random.default_rng(0)
+    h = TouchHistory(window=2.0, capacity=64)
+    for i in range(500):
+        x, y = rng.random(2)
+        h.append(x, y, i * 0.05, rng.random())
+        if i % 37 == 0:
+            xs, ys, _, speeds, turns = h.columns()
+            moving = ~np.isnan(turns)
+            assert math.isclose(h.sum_velocity, speeds.sum(), abs_tol=1e-9)
+            assert math.isclose(h.sum_turn, turns[moving].sum(), abs_tol=1e-9)
+            assert h.n_turns == moving.sum()
+            assert sum(h.region_counts) == len(h)
+
+
+def test_heading_change_is_wrapped_and_skips_stationary_samples():
+    h = TouchHistory(window=1e9, capacity=128)
+    # Counter-clockwise circle, each point repeated once (a finger at rest)
+    for i in range(40):
+        angle = i * math.tau / 20
+        x, y = 0.5 + 0.3 * math.cos(angle), 0.5 + 0.3 * math.sin(angle)
+        h.append(x, y, 2 * i, 0.1)
+        h.append(x, y, 2 * i + 1, 0.1)
+    assert h.n_turns == 38
+    assert math.isclose(h.mean_turn, math.tau / 20, rel_tol=1e-6)
+
+
+def test_circular_motion_reads_as_circular():
+    m = SessionNarrativeManager()
+    now = time.time()
+    for i in range(60):
+        angle = i * math.tau / 8
+        m.record_touch(
+            0.5 + 0.2 * math.cos(angle), 0.5 + 0.2 * math.sin(angle), now + i, 0.2
+        )
+    state = m._compute_state(n_pairs=0)
+    assert state.pattern_type == "circular"
+
+
+def test_dominant_region_is_most_visited_cell():
+    h = TouchHistory(window=1e9, capacity=64)
+    for i in range(6):
+        h.append(0.9, 0.1, float(i), 0.0)  # lower-right
+    for i in range(4):
+        h.append(0.1, 0.9, float(6 + i), 0.0)  # upper-left
+    # The mean position would land in the centre cell
+    assert h.dominant_region == "lower-right"
+    assert TouchHistory(capacity=4).dominant_region == "none"
@@ -0,0 +1,68 @@
+import pytest
+
+from src.profiler import FrameProfiler, peak_rss_mb
+
+
+class FakeClock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_laps_attribute_time_to_stages():
+    clock = FakeClock()
+    prof = FrameProfiler(["input", "sim"], capacity=8, clock=clock)
+    prof.start_frame()
+    clock.t += 0.001
+    prof.lap("input")
+    clock.t += 0.004
+    prof.lap("sim")
+    prof.end_frame()
+    assert prof.percentiles("input")["p50"] == pytest.approx(1.0)
+    assert prof.percentiles("sim")["p50"] == pytest.approx(4.0)
+    assert prof.percentiles("frame")["p50"] == pytest.approx(5.0)
+    assert prof.frames == 1
+
+
+def test_ring_keeps_only_recent_samples():
+    prof = FrameProfiler(["sim"], capacity=4)
+    for ms in range(1, 11):
+        prof.record("sim", ms / 1000.0)
+    assert prof.count("sim") == 10
+    summary = prof.summary()["sim"]
+    assert summary["max_ms"] == pytest.approx(10.0)
+    assert summary["mean_ms"] == pytest.approx(8.5)  # samples 7..10
+
+
+def test_percentiles_and_empty_stage():
+    prof = FrameProfiler(["sim", "capture"], capacity=100)
+    for ms in range(1, 101):
+        prof.record("sim", ms / 1000.0)
+    pct = prof.percentiles("sim")
+    assert pct["p50"] == pytest.approx(50.5)
+    assert pct["p99"] == pytest.approx(99.01)
+    assert prof.percentiles("capture") == {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    assert prof.summary()["capture"]["count"] == 0
+
+
+def test_peak_rss_is_positive():
+    assert peak_rss_mb() > 0.0
+
+
+def test_errors_are_counted_per_stage_and_reported():
+    prof = FrameProfiler(["mouse", "audio", "render"], capacity=8)
+    for _ in range(3):
+        try:
+            raise RuntimeError("GGUI API differs")
+        except RuntimeError:
+            prof.error("mouse")
+    prof.record("render", 0.008)
+    prof.record("audio", 0.001)
+    prof.record("frame", 0.010)
+    assert prof.errors == {"mouse": 3, "audio": 0, "render": 0, "frame": 0}
+    line = prof.status_line(slowest=1)
+    assert line.startswith("frame p50 10.00")
+    assert "render 8.00" in line and "audio" not in line
+    assert line.endswith("errors mouse=3")
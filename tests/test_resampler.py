@@ -0,0 +1,62 @@
+import numpy as np
+
+from src.resampler import PolyphaseResampler
+
+
+def _stereo_pcm(left: np.ndarray, right: np.ndarray) -> bytes:
+    stereo = np.empty(len(left) * 2, dtype=np.int16)
+    stereo[0::2] = (left * 32767).astype(np.int16)
+    stereo[1::2] = (right * 32767).astype(np.int16)
+    return stereo.tobytes()
+
+
+def _tone(freq: float, seconds: float = 1.0, rate: int = 48000) -> np.ndarray:
+    t = np.arange(int(rate * seconds)) / rate
+    return 0.5 * np.sin(2 * np.pi * freq * t)
+
+
+def test_output_length_and_rate():
+    r = PolyphaseResampler(48000, 16000, channels=2)
+    tone = _tone(1000)
+    out = np.frombuffer(r.process(_stereo_pcm(tone, tone)), dtype=np.int16)
+    assert len(out) == 16000
+    spectrum = np.abs(np.fft.rfft(out[1000:].astype(np.float64)))
+    freqs = np.fft.rfftfreq(len(out) - 1000, 1 / 16000)
+    assert abs(freqs[np.argmax(spectrum)] - 1000) < 5
+
+
+def test_alias_band_is_attenuated():
+    r = PolyphaseResampler(48000, 16000, channels=2)
+    tone = _tone(11000)  # above the 8 kHz output Nyquist
+    out = np.frombuffer(r.process(_stereo_pcm(tone, tone)), dtype=np.int16)
+    rms = np.sqrt(np.mean(out[1000:].astype(np.float64) ** 2)) / 32768
+    assert rms < 0.005  # input rms is ~0.35
+
+
+def test_stereo_mixdown_uses_both_channels():
+    r = PolyphaseResampler(48000, 16000, channels=2)
+    tone = _tone(1000)
+    out = np.frombuffer(r.process(_stereo_pcm(tone, -tone)), dtype=np.int16)
+    assert np.abs(out).max() <= 1
+
+
+def test_chunked_matches_one_shot():
+    rng = np.random.default_rng(1)
+    left = rng.uniform(-0.5, 0.5, 9600)
+    right = rng.uniform(-0.5, 0.5, 9600)
+    pcm = _stereo_pcm(left, right)
+
+    whole = PolyphaseResampler(48000, 16000, channels=2).process(pcm)
+
+    streaming = PolyphaseResampler(48000, 16000, channels=2)
+    parts = []
+    for start, stop in ((0, 1001), (1001, 4000), (4000, 4003), (4003, 9600)):
+        parts.append(streaming.process(pcm[start * 4 : stop * 4]))
+    assert b"".join(parts) == whole
+
+
+def test_rational_upsampling_ratio():
+    r = PolyphaseResampler(16000, 24000, channels=1)
+    assert (r.up, r.down) == (3, 2)
+    out = r.process_float(_tone(500, rate=16000).astype(np.float32))
+    assert len(out) == 24000
@@ -1,10 +1,14 @@
+import dataclasses
 import threading
-from src.shared_state import SharedState
+
+import pytest
+
+from src.shared_state import ConnectionSnapshot, SharedState
 
 
 def test_create():
     s = SharedState()
-    assert s.boids_density == 0.5
+    assert s.visual.density == 0.5
 
 
 def test_update_visual_metrics():
@@ -57,11 +61,12 @@ def test_thread_safety():
     assert len(errors) == 0
 
 
-def test_queues():
+def test_touch_bus():
     s = SharedState()
-    s.touch_events.put((0.5, 0.5, 0.1, 0.2))
-    event = s.touch_events.get()
-    assert event == (0.5, 0.5, 0.1, 0.2)
+    cursor = s.touch_bus.subscribe("test")
+    s.touch_bus.publish(0.5, 0.5, 1.0, 0.1, 0.2)
+    events = cursor.read()
+    assert events[:, 0].tolist() == [0.5, 0.5, 1.0, 0.1, 0.2]
 
 
 def test_default_ghost_state():
@@ -80,3 +85,64 @@ def test_visual_metrics_multiple_updates():
     assert d == 0.9
     assert c == 0.8
     assert a == 0.7
+
+
+def test_frame_request_roundtrip():
+    s = SharedState()
+    assert s.take_frame_request() is False
+    version = s.request_frame()
+    assert s.take_frame_request() is True
+    assert s.take_frame_request() is False
+    s.publish_jpeg_frame(b"jpeg-1")
+    assert s.frame_version == version + 1
+    assert s.latest_jpeg_frame == b"jpeg-1"
+    s.publish_jpeg_frame(b"jpeg-2")
+    assert s.latest_jpeg_frame == b"jpeg-2"
+
+
+def test_latest_frame_pairs_jpeg_with_signature():
+    s = SharedState()
+    assert s.latest_frame() == (b"", None)
+    s.publish_jpeg_frame(b"jpeg-1", "sig-1")
+    s.publish_jpeg_frame(b"jpeg-2", "sig-2")
+    assert s.latest_frame() == (b"jpeg-2", "sig-2")
+
+
+def test_snapshots_are_frozen_and_versioned():
+    s = SharedState()
+    before = s.visual
+    s.update_visual_metrics(0.1, 0.2, 0.3)
+    assert s.visual is not before and before.density == 0.5
+    assert s.visual.version == before.version + 1
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        s.visual.density = 0.9
+
+    s.lyria_connected = True
+    s.gemini_connected = True
+    s.lyria_connected = False
+    assert s.connections == ConnectionSnapshot(lyria=False, gemini=True, version=3)
+
+
+def test_readers_see_consistent_snapshots():
+    s = SharedState()
+    torn = []
+    done = threading.Event()
+
+    def writer():
+        for i in range(20000):
+            s.update_ghost_state("ACTIVE", True, float(i))
+        done.set()
+
+    def reader():
+        while not done.is_set():
+            ghost = s.ghost
+            if ghost.version and ghost.elapsed != ghost.version - 1:
+                torn.append(ghost)
+
+    threads = [threading.Thread(target=writer), threading.Thread(target=reader)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert torn == []
+    assert s.get_ghost_info() == ("ACTIVE", True, 19999.0)
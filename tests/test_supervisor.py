@@ -0,0 +1,192 @@
+import asyncio
+
+from src.shared_state import SharedState
+from src.supervisor import CircuitBreaker, ConnectionSupervisor
+
+
+class FlakyService:
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.attempts = 0
+        self.up = False
+
+    async def start(self):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise ConnectionError("refused")
+        self.up = True
+
+    def is_healthy(self):
+        return self.up
+
+
+class DroppingService(FlakyService):
+    """Connects every time, then loses the session after ``lifetime`` seconds."""
+
+    def __init__(self, lifetime: float):
+        super().__init__(failures=0)
+        self.lifetime = lifetime
+
+    async def start(self):
+        await super().start()
+        asyncio.get_running_loop().call_later(self.lifetime, self._drop)
+
+    def _drop(self):
+        self.up = False
+
+
+def _supervisor(shared, **kwargs):
+    params = dict(
+        check_interval=0.01,
+        backoff_base=0.01,
+        backoff_max=0.05,
+        failure_threshold=10,
+        open_seconds=0.2,
+        min_uptime=0.05,
+        seed=1,
+    )
+    params.update(kwargs)
+    return ConnectionSupervisor(shared, **params)
+
+
+async def _wait_for(predicate, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate() and loop.time() < deadline:
+        await asyncio.sleep(0.005)
+    return predicate()
+
+
+def test_backoff_doubles_is_capped_and_jittered():
+    sup = ConnectionSupervisor(
+        SharedState(), backoff_base=1.0, backoff_max=8.0, jitter=0.5, seed=0
+    )
+    for attempt, nominal in enumerate([1.0, 2.0, 4.0, 8.0, 8.0, 8.0]):
+        delay = sup.backoff_delay(attempt)
+        assert nominal * 0.5 <= delay <= nominal
+
+
+def test_circuit_breaker_opens_then_half_opens():
+    breaker = CircuitBreaker(threshold=3, cooldown=10.0)
+    for t in range(3):
+        assert breaker.allow(float(t))
+        breaker.record_failure(float(t))
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow(5.0)
+    assert breaker.allow(12.0)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # A failed trial re-opens immediately
+    breaker.record_failure(12.0)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow(13.0)
+    assert breaker.allow(22.0)
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_supervisor_starts_and_recovers_service(run):
+    async def scenario():
+        shared = SharedState()
+        service = FlakyService(failures=2)
+        sup = _supervisor(shared)
+        sup.register("lyria", service.start, service.is_healthy)
+        task = asyncio.ensure_future(sup.run())
+        try:
+            assert await _wait_for(lambda: service.up)
+            assert service.attempts == 3
+            await asyncio.sleep(0.03)
+            status = shared.service_status["lyria"]
+            assert status.up and status.failures == 2 and status.reconnects == 0
+
+            # Drop the connection: the supervisor reconnects it
+            service.up = False
+            assert await _wait_for(lambda: service.up)
+            await asyncio.sleep(0.03)
+            status = shared.service_status["lyria"]
+            assert status.reconnects == 1
+            assert status.last_recovery_s > 0.0
+            assert status.circuit == "closed"
+        finally:
+            task.cancel()
+
+    run(scenario())
+
+
+def test_open_circuit_stops_hammering(run):
+    async def scenario():
+        shared = SharedState()
+        service = FlakyService(failures=1000)
+        sup = _supervisor(shared, failure_threshold=3, open_seconds=10.0)
+        sup.register("gemini", service.start, service.is_healthy)
+        task = asyncio.ensure_future(sup.run())
+        try:
+            await asyncio.sleep(0.3)
+            assert service.attempts == 3
+            status = shared.service_status["gemini"]
+            assert status.circuit == "open" and not status.up
+        finally:
+            task.cancel()
+
+    run(scenario())
+
+
+def test_session_dropping_right_after_connect_opens_circuit(run):
+    async def scenario():
+        shared = SharedState()
+        service = DroppingService(lifetime=0.02)
+        sup = _supervisor(shared, failure_threshold=3, open_seconds=10.0)
+        sup.register("gemini", service.start, service.is_healthy)
+        task = asyncio.ensure_future(sup.run())
+        try:
+            await asyncio.sleep(0.5)
+            assert service.attempts == 3
+            status = shared.service_status["gemini"]
+            assert status.circuit == "open" and status.failures == 3
+        finally:
+            task.cancel()
+
+    run(scenario())
+
+
+def test_stable_connection_resets_failures(run):
+    async def scenario():
+        shared = SharedState()
+        service = DroppingService(lifetime=0.02)
+        sup = _supervisor(shared, failure_threshold=3)
+        sup.register("lyria", service.start, service.is_healthy)
+        task = asyncio.ensure_future(sup.run())
+        try:
+            assert await _wait_for(lambda: service.attempts == 2)
+            service.lifetime = 10.0  # the next session holds
+            assert await _wait_for(lambda: sup._services["lyria"].stable)
+            breaker = sup._services["lyria"].breaker
+            assert breaker.state == "closed" and breaker.consecutive_failures == 0
+            assert sup._services["lyria"].attempt == 0
+        finally:
+            task.cancel()
+
+    run(scenario())
+
+
+def test_recovery_time_includes_detection_delay(run):
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        shared = SharedState()
+        service = FlakyService(failures=0)
+        sup = _supervisor(shared, check_interval=0.1)
+        sup.register("lyria", service.start, service.is_healthy)
+        task = asyncio.ensure_future(sup.run())
+        try:
+            assert await _wait_for(lambda: service.up)
+            await asyncio.sleep(0.25)
+            service.up = False
+            dropped_at = loop.time()
+            assert await _wait_for(lambda: service.up)
+            outage = loop.time() - dropped_at
+            await asyncio.sleep(0.15)
+            return outage, shared.service_status["lyria"].last_recovery_s
+        finally:
+            task.cancel()
+
+    outage, recovery = run(scenario())
+    assert recovery >= outage
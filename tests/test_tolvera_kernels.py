@@ -0,0 +1,72 @@
+import numpy as np
+import taichi as ti
+
+from src.tolvera_engine import (
+    _MASK_EMPTY,
+    _box_downsample,
+    _downsampled_field_like,
+    _scale_pixels,
+    _scale_pixels_masked,
+    _stamp_segments,
+    _stride_sample,
+)
+
+ti.init(arch=ti.cpu, log_level=ti.ERROR)
+
+
+def test_scale_pixels_scalar_field():
+    px = ti.field(ti.f32, shape=(8, 6, 4))
+    px.fill(0.3)
+    _scale_pixels(px, 2.5)
+    np.testing.assert_allclose(px.to_numpy(), 0.75, atol=1e-6)
+
+
+def test_scale_pixels_clamps_vector_field():
+    px = ti.Vector.field(4, ti.f32, shape=(8, 6))
+    px.fill(0.6)
+    _scale_pixels(px, 2.5)
+    np.testing.assert_allclose(px.to_numpy(), 1.0)
+
+
+def test_box_downsample_matches_block_mean():
+    src_np = np.random.rand(16, 24, 4).astype(np.float32)
+    src = ti.field(ti.f32, shape=src_np.shape)
+    src.from_numpy(src_np)
+    dst = _downsampled_field_like(src, 4)
+    _box_downsample(src, dst, 4)
+    expected = src_np.reshape(4, 4, 6, 4, 4).mean(axis=(1, 3))
+    np.testing.assert_allclose(dst.to_numpy(), expected, atol=1e-5)
+
+
+def test_stride_sample_matches_numpy_slice():
+    src_np = np.random.rand(16, 24).astype(np.float32)
+    src = ti.field(ti.f32, shape=src_np.shape)
+    src.from_numpy(src_np)
+    dst = _downsampled_field_like(src, 4)
+    _stride_sample(src, dst, 4)
+    np.testing.assert_array_equal(dst.to_numpy(), src_np[::4, ::4])
+
+
+def test_stamp_segments_marks_disk_along_segment():
+    mask = ti.field(ti.f32, shape=(20, 40))
+    mask.fill(_MASK_EMPTY)
+    segs = np.array([[8, 40, 88, 40]], dtype=np.float32)  # screen px, scale 4
+    _stamp_segments(mask, segs, 1, 4.0, 2.0, 7.0)
+    m = mask.to_numpy()
+    assert (m[10, 2:23] == 7.0).all()  # row y=40/4, columns x=2..22
+    assert m[12, 12] == 7.0 and m[13, 12] == _MASK_EMPTY
+    assert m[10, 26] == _MASK_EMPTY
+
+
+def test_scale_pixels_masked_fades_with_age():
+    px = ti.field(ti.f32, shape=(8, 8, 4))
+    px.fill(0.2)
+    mask = ti.field(ti.f32, shape=(4, 4))
+    mask.fill(_MASK_EMPTY)
+    mask[0, 0] = 10.0  # stamped now
+    mask[3, 3] = 10.0 - 60.0  # one decay constant ago
+    _scale_pixels_masked(px, mask, 3.0, 10.0, 60.0)
+    out = px.to_numpy()
+    np.testing.assert_allclose(out[0:2, 0:2], 0.6, atol=1e-6)
+    np.testing.assert_allclose(out[6:8, 6:8], 0.2 * (1 + 2 * np.exp(-1)), atol=1e-6)
+    np.testing.assert_allclose(out[0:2, 6:8], 0.2, atol=1e-6)
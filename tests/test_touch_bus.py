@@ -0,0 +1,69 @@
+import numpy as np
+
+from src.feedback_loop import FeedbackLoop
+from src.narrative_manager import SessionNarrativeManager
+from src.shared_state import SharedState
+from src.touch_bus import TouchEventBus
+
+
+def test_consumers_read_independently_in_batches():
+    bus = TouchEventBus(capacity=16)
+    narrative = bus.subscribe("narrative")
+    for i in range(5):
+        bus.publish(0.1 * i, 0.5, float(i), 0.2, 0.0)
+    gemini = bus.subscribe("gemini")  # only sees events after subscribing
+    bus.publish(0.9, 0.5, 5.0, 0.2, 1.5)
+
+    batch = narrative.read(max_events=4)
+    np.testing.assert_array_equal(batch[TouchEventBus.T], [0.0, 1.0, 2.0, 3.0])
+    assert narrative.lag == 2
+    np.testing.assert_array_equal(narrative.read()[TouchEventBus.T], [4.0, 5.0])
+    assert narrative.read().shape == (5, 0)
+
+    batch = gemini.read()
+    assert batch[:, 0].tolist() == [0.9, 0.5, 5.0, 0.2, 1.5]
+    assert bus.subscribe("gemini") is gemini
+
+
+def test_slow_consumer_drops_oldest_and_memory_is_fixed():
+    bus = TouchEventBus(capacity=8)
+    cursor = bus.subscribe("slow")
+    nbytes = bus._data.nbytes
+    for i in range(29):
+        bus.publish(0.0, 0.0, float(i), 0.0)
+    assert bus.stats()["slow"] == {"lag": 8, "delivered": 0, "dropped": 21}
+
+    batch = cursor.read()
+    np.testing.assert_array_equal(batch[TouchEventBus.T], np.arange(21.0, 29.0))
+    assert cursor.dropped == 21 and cursor.delivered == 8 and cursor.lag == 0
+    assert bus._data.nbytes == nbytes
+
+
+def test_narrative_consumes_bus_batches():
+    bus = TouchEventBus(capacity=64)
+    cursor = bus.subscribe("narrative")
+    for i in range(20):
+        bus.publish(0.9, 0.1, 1000.0 + i * 0.1, 0.6, 0.0)
+    m = SessionNarrativeManager()
+    m.record_touches(cursor.read())
+    state = m._compute_state(n_pairs=0)
+    assert state.dominant_region == "lower-right"
+    assert abs(state.avg_speed - 0.6) < 1e-9
+
+
+def test_narrative_reset_skips_touches_published_before_it():
+    shared = SharedState()
+    m = SessionNarrativeManager()
+    feedback = FeedbackLoop(shared, lyria=None, gemini=None, narrative=m)
+    cursor = shared.touch_bus.subscribe("narrative")
+    for i in range(50):
+        shared.touch_bus.publish(0.9, 0.1, 1000.0 + i * 0.1, 0.6)
+    m.reset()  # render thread (R key)
+
+    feedback.update_narrative(cursor)
+    assert len(m._touch_history) == 0 and cursor.lag == 0
+    assert cursor.dropped == 0
+
+    shared.touch_bus.publish(0.1, 0.1, 1010.0, 0.2)
+    feedback.update_narrative(cursor)
+    assert len(m._touch_history) == 1